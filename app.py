@@ -3,8 +3,19 @@ import os
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import filedialog
-from db_connection import DatabaseConnection
+from db_connection import DatabaseConnection, Page
+from initialize_db import DatabaseInitializer
+from loaders import tenants_by_property
+from db_worker import DatabaseWorker
+from observer import NotificationBus, mark_read, mark_all_read
+from retention import NotificationCompactor
+from notification_feed import NotificationFeed
+from widgets import VirtualList, fixed_rows, show_toast
+from screen_manager import ScreenManager, cached_screen
+from search import match_expression, substring_expression, fuzzy_expression, similarity, FUZZY_THRESHOLD, FUZZY_CANDIDATES
+import queries
 import re  # Importing the regex module for validation
+from itertools import islice
 
 # Base Screen Class
 class Screen:
@@ -14,39 +25,86 @@ class Screen:
     def display(self):
         raise NotImplementedError("Subclasses must implement the 'display' method.")
 
+    @property
+    def screens(self):
+        return ScreenManager.for_root(self.root)
 
-# Notification Manager (Observer Pattern)
-class NotificationManager:
-    def __init__(self):
-        self.subscribers = {}
+    @property
+    def view(self):
+        """Frame of the screen currently shown; widgets are built into it rather than into the root."""
+        return self.screens.current
 
-    def subscribe(self, user_id, callback):
-        if user_id not in self.subscribers:
-            self.subscribers[user_id] = []
-        self.subscribers[user_id].append(callback)
+    def clear_screen(self):
+        """Switch to a fresh frame for a screen that is not cached (forms, one-off results)."""
+        self.screens.transient()
+
+    def run_async(self, work, on_done, owner=None, tag=None, on_error=None):
+        """Run work(db) on the database worker thread, then on_done(result) back on the Tk thread.
+
+        Writes go through here too, so a transaction waiting on the write lock never freezes the window.
+        Errors are shown as a database error unless on_error handles them.
+        """
+        worker = DatabaseWorker.for_root(self.root)
+        return worker.submit(work, on_done, on_error=on_error or self.show_database_error, owner=owner, tag=tag)
+
+    def load_async(self, work, render):
+        """Pack a frame that shows "Loading..." until work(db) finishes, then fill it with render(frame, result).
+
+        The result is dropped if the frame is destroyed first (the user navigated away). On a cached
+        screen the frame is emptied and loaded again when the screen is shown stale.
+        """
+        frame = tk.Frame(self.view)
+        frame.pack()
+
+        def load():
+            for child in frame.winfo_children():
+                child.destroy()
+            loading = tk.Label(frame, text="Loading...")
+            loading.pack()
+
+            def deliver(result):
+                loading.destroy()
+                render(frame, result)
+
+            self.run_async(work, deliver, owner=frame, tag=frame)     # Tagged, so a reload supersedes a load still running
+
+        self.screens.on_refresh(frame, load)
+        load()
+        return frame
 
-    def notify(self, user_id, message):
-        db = DatabaseConnection()
-        db.query("INSERT INTO notifications (user_id, message) VALUES (?, ?)", (user_id, message))
-        if user_id in self.subscribers:
-            for callback in self.subscribers[user_id]:
-                callback(message)
+    def show_database_error(self, error):
+        messagebox.showerror("Error", f"Database error: {error}")
 
 
-notification_manager = NotificationManager()
+# Notification bus (Observer Pattern): every screen and observer sends through this one queue
+notification_manager = NotificationBus()
+
+
+# Session (identity of the logged-in user, loaded once at login)
+class Session:
+    def __init__(self, user_id, username, role, email, phone_number):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.email = email
+        self.phone_number = phone_number
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a session from a users record."""
+        return cls(row.user_id, row.username, row.role, row.email, row.phone_number)
+
 
 # Welcome Screen
 class WelcomeScreen(Screen):
     def display(self):
+        self.screens.clear()     # Logged out: drop every screen cached for the previous user
         self.clear_screen()
-        tk.Label(self.root, text="Welcome to Housing Management App", font=("Arial", 16)).pack(pady=10)
-        tk.Button(self.root, text="Login", width=20, command=self.show_login_screen).pack(pady=5)
-        tk.Button(self.root, text="Register", width=20, command=self.show_register_screen).pack(pady=5)
-        tk.Button(self.root, text="Exit", width=20, command=self.root.quit).pack(pady=5)
+        tk.Label(self.view, text="Welcome to Housing Management App", font=("Arial", 16)).pack(pady=10)
+        tk.Button(self.view, text="Login", width=20, command=self.show_login_screen).pack(pady=5)
+        tk.Button(self.view, text="Register", width=20, command=self.show_register_screen).pack(pady=5)
+        tk.Button(self.view, text="Exit", width=20, command=self.root.quit).pack(pady=5)
 
-    def clear_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
 
     def show_login_screen(self):
         LoginScreen(self.root).display()
@@ -58,36 +116,34 @@ class WelcomeScreen(Screen):
 class LoginScreen(Screen):
     def display(self):
         self.clear_screen()
-        tk.Label(self.root, text="Login", font=("Arial", 16)).pack(pady=10)
-        tk.Label(self.root, text="Username:").pack()
-        self.username_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Login", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Username:").pack()
+        self.username_entry = tk.Entry(self.view)
         self.username_entry.pack()
 
-        tk.Label(self.root, text="Password:").pack()
-        self.password_entry = tk.Entry(self.root, show="*")
+        tk.Label(self.view, text="Password:").pack()
+        self.password_entry = tk.Entry(self.view, show="*")
         self.password_entry.pack()
 
-        tk.Button(self.root, text="Login", command=self.login).pack(pady=10)
-        tk.Button(self.root, text="Back", command=lambda: WelcomeScreen(self.root).display()).pack()
+        tk.Button(self.view, text="Login", command=self.login).pack(pady=10)
+        tk.Button(self.view, text="Back", command=lambda: WelcomeScreen(self.root).display()).pack()
 
-    def clear_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
 
     def login(self):
         username = self.username_entry.get()
         password = self.password_entry.get()
 
-        db = DatabaseConnection()
-        user = db.fetch("SELECT * FROM users WHERE username = ? AND password = ?", (username, password))
-        if user:
-            role = user[0][4]
-            if role == "student":
-                StudentDashboard(self.root, username).display()
-            elif role == "homeowner":
-                HomeownerDashboard(self.root, username).display()
-        else:
-            messagebox.showerror("Login Failed", "Invalid credentials.")
+        def logged_in(user):
+            if user:
+                session = Session.from_row(user[0])
+                if session.role == "student":
+                    StudentDashboard(self.root, session).display()
+                elif session.role == "homeowner":
+                    HomeownerDashboard(self.root, session).display()
+            else:
+                messagebox.showerror("Login Failed", "Invalid credentials.")
+
+        self.run_async(lambda db: db.fetch(queries.LOGIN, (username, password), records=True), logged_in, owner=self.view)
 
 # Validation Functions
 def validate_phone(phone):
@@ -99,28 +155,38 @@ def validate_password(password):
 def validate_email(email):
     return bool(re.match(r"^[\w._%+-]+@[\w.-]+\.[a-zA-Z]{2,}$", email))
 
+def normalize_time(text):
+    """A time typed as H:MM or HH:MM as zero-padded HH:MM, so stored times compare correctly as text; None if invalid."""
+    match = re.match(r"^(\d{1,2}):(\d{2})$", text)
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        return None
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
 
 
 
 #CHAT BOT 
 class ChatBotScreen(Screen):
-    def __init__(self, root, username):
+    CHAT_LIMIT = 20     # Lines per answer; a chat log is no place for every listing
+
+    def __init__(self, root, session):
         self.root = root
-        self.username = username
+        self.session = session
+        self.username = session.username
 
     def display(self):
         self.clear_screen()
-        tk.Label(self.root, text="Chatbot", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Chatbot", font=("Arial", 16)).pack(pady=10)
 
-        self.chat_log = tk.Text(self.root, height=15, width=50, state="disabled")
+        self.chat_log = tk.Text(self.view, height=15, width=50, state="disabled")
         self.chat_log.pack(pady=10)
 
-        self.user_input = tk.Entry(self.root, width=50)
+        self.user_input = tk.Entry(self.view, width=50)
         self.user_input.pack(pady=5)
         self.user_input.bind("<Return>", self.process_input)
 
-        tk.Button(self.root, text="Send", command=self.process_input).pack(pady=5)
-        tk.Button(self.root, text="Return", command=self.return_to_previous_screen).pack(pady=5)  
+        tk.Button(self.view, text="Send", command=self.process_input).pack(pady=5)
+        tk.Button(self.view, text="Return", command=self.return_to_previous_screen).pack(pady=5)  
 
         # Display options
         self.display_options()
@@ -137,32 +203,25 @@ class ChatBotScreen(Screen):
 
     def handle_selection(self, selection):
         if selection == "1":
-            properties = self.fetch_properties()  # Fetch properties from the database
-            if properties:
-                self.display_message("Available Properties:\n" + "\n".join(properties))
-            else:
-                self.display_message("No properties posted now.")
+            self.answer(self.fetch_properties, "Available Properties:", "No properties posted now.")
         elif selection == "2":
-            events = self.fetch_events()  # Fetch events from the database
-            if events:
-                self.display_message("Upcoming Events:\n" + "\n".join(events))
-            else:
-                self.display_message("No events posted now.")
+            self.answer(self.fetch_events, "Upcoming Events:", "No events posted now.")
         elif selection == "3":
-            carpools = self.fetch_carpools()  # Fetch carpools from the database
-            if carpools:
-                self.display_message("Available Carpools:\n" + "\n".join(carpools))
-            else:
-                self.display_message("No carpools posted now.")
+            self.answer(self.fetch_carpools, "Available Carpools:", "No carpools posted now.")
         elif selection == "4":
-            roommates = self.fetch_roommates()  # Fetch available students from the database
-            if roommates:
-                self.display_message("Available Students:\n" + "\n".join(roommates))
-            else:
-                self.display_message("No available students at the moment.")
+            self.answer(self.fetch_roommates, "Available Students:", "No available students at the moment.")
         else:
             self.display_message("Invalid selection. Please choose a valid option.")
 
+    def answer(self, fetch, heading, empty):
+        """Run fetch(db) on the database worker and show its lines under heading when they arrive."""
+        def show(items):
+            if items:
+                self.display_message(heading + "\n" + "\n".join(items))
+            else:
+                self.display_message(empty)
+        self.run_async(fetch, show, owner=self.chat_log)
+
     def display_message(self, message):
         self.chat_log.config(state="normal")
         self.chat_log.insert(tk.END, message + "\n")
@@ -170,52 +229,42 @@ class ChatBotScreen(Screen):
         self.chat_log.see(tk.END)
 
     def return_to_previous_screen(self):
-        # to return to the appropriate dashboard based on user role
-        db = DatabaseConnection()
-        user = db.fetch("SELECT role FROM users WHERE username = ?", (self.username,))  # Fetch user role
-        if user:
-            role = user[0][0]
-            if role == "student":
-                StudentDashboard(self.root, self.username).display()  # Return to Student Dashboard
-            elif role == "homeowner":
-                HomeownerDashboard(self.root, self.username).display()  # Return to Homeowner Dashboard
-
-    def fetch_properties(self):
+        # to return to the appropriate dashboard based on the session's role
+        if self.session.role == "student":
+            StudentDashboard(self.root, self.session).display()  # Return to Student Dashboard
+        elif self.session.role == "homeowner":
+            HomeownerDashboard(self.root, self.session).display()  # Return to Homeowner Dashboard
+
+    def fetch_properties(self, db):
         # Logic to fetch properties from the database
-        db = DatabaseConnection()
-        properties = db.fetch("SELECT address FROM properties WHERE visible = 1")  # Example query
-        return [property[0] for property in properties]  # Return a list of property addresses
+        properties = db.stream(queries.CHAT_PROPERTIES, batch_size=self.CHAT_LIMIT + 1, records=True)  # Example query
+        return self.first_lines(properties, lambda property: property.address, "properties")  # Property addresses
 
-    def fetch_carpools(self):
+    def fetch_carpools(self, db):
         # Logic to fetch carpools from the database
-        db = DatabaseConnection()
-        carpools = db.fetch("SELECT start_point, destination FROM carpools WHERE seats > 0")  # Example query
-        return [f"{carpool[0]} to {carpool[1]}" for carpool in carpools]  # Return formatted carpool info
+        carpools = db.stream(queries.CHAT_CARPOOLS, batch_size=self.CHAT_LIMIT + 1, records=True)  # Example query
+        return self.first_lines(carpools, lambda carpool: f"{carpool.start_point} to {carpool.destination}", "carpools")  # Formatted carpool info
 
-    def fetch_events(self):
+    def fetch_events(self, db):
         # Logic to fetch events from the database
-        db = DatabaseConnection()
-        events = db.fetch("SELECT name, date, time FROM community_events WHERE date >= DATE('now')")  # Example query
-        return [f"{event[0]} on {event[1]} at {event[2]}" for event in events]  # Return formatted event info
+        events = db.stream(queries.CHAT_EVENTS, batch_size=self.CHAT_LIMIT + 1, records=True)  # Example query
+        return self.first_lines(events, lambda event: f"{event.name} on {event.date} at {event.time}", "events")  # Formatted event info
 
-    def fetch_roommates(self):
+    def fetch_roommates(self, db):
         # Logic to fetch available students who are not currently tenants
-        db = DatabaseConnection()
-        available_students = db.fetch("""
-            SELECT username 
-            FROM users 
-            WHERE role = 'student' 
-            AND user_id NOT IN (
-                SELECT tenant_id 
-                FROM leases 
-                WHERE status = 'active'
-            )
-        """)  # Example query to fetch available students
-        return [student[0] for student in available_students]  # Return a list of available student usernames
+        available_students = db.stream(queries.CHAT_ROOMMATES, batch_size=self.CHAT_LIMIT + 1, records=True)  # Example query to fetch available students
+        return self.first_lines(available_students, lambda student: student.username, "students")  # Available student usernames
+
+    def first_lines(self, rows, format_row, kind):
+        """Format the first CHAT_LIMIT rows of a stream, then close it so the rest is never read."""
+        try:
+            shown = [format_row(row) for row in islice(rows, self.CHAT_LIMIT + 1)]
+        finally:
+            rows.close()
+        if len(shown) > self.CHAT_LIMIT:
+            shown[-1] = f"... and more {kind} (showing the first {self.CHAT_LIMIT})"
+        return shown
 
-    def clear_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
 
 
 
@@ -224,41 +273,38 @@ class ChatBotScreen(Screen):
 class RegisterScreen(Screen):
     def display(self):
         self.clear_screen()
-        tk.Label(self.root, text="Register", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Register", font=("Arial", 16)).pack(pady=10)
 
         # Username field
-        tk.Label(self.root, text="Username:").pack()
-        self.username_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Username:").pack()
+        self.username_entry = tk.Entry(self.view)
         self.username_entry.pack()
 
         # Password field
-        tk.Label(self.root, text="Password:").pack()
-        self.password_entry = tk.Entry(self.root, show="*")
+        tk.Label(self.view, text="Password:").pack()
+        self.password_entry = tk.Entry(self.view, show="*")
         self.password_entry.pack()
 
         # Email field
-        tk.Label(self.root, text="Email:").pack()
-        self.email_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Email:").pack()
+        self.email_entry = tk.Entry(self.view)
         self.email_entry.pack()
 
         # Phone number field
-        tk.Label(self.root, text="Phone Number:").pack()
-        self.phone_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Phone Number:").pack()
+        self.phone_entry = tk.Entry(self.view)
         self.phone_entry.pack()
 
         # Role selection with radio buttons
-        tk.Label(self.root, text="Role:").pack()
+        tk.Label(self.view, text="Role:").pack()
         self.role_var = tk.StringVar(value="student")  # Default value
-        tk.Radiobutton(self.root, text="Student", variable=self.role_var, value="student").pack(anchor=tk.W)
-        tk.Radiobutton(self.root, text="Homeowner", variable=self.role_var, value="homeowner").pack(anchor=tk.W)
+        tk.Radiobutton(self.view, text="Student", variable=self.role_var, value="student").pack(anchor=tk.W)
+        tk.Radiobutton(self.view, text="Homeowner", variable=self.role_var, value="homeowner").pack(anchor=tk.W)
 
         # Register and Back buttons
-        tk.Button(self.root, text="Register", command=self.register).pack(pady=10)
-        tk.Button(self.root, text="Back", command=lambda: WelcomeScreen(self.root).display()).pack()
+        tk.Button(self.view, text="Register", command=self.register).pack(pady=10)
+        tk.Button(self.view, text="Back", command=lambda: WelcomeScreen(self.root).display()).pack()
 
-    def clear_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
 
     def register(self):
         username = self.username_entry.get().strip()
@@ -284,220 +330,191 @@ class RegisterScreen(Screen):
             return
 
         # Database insertion
-        db = DatabaseConnection()
-        try:
-            db.query(
-                "INSERT INTO users (username, password, email, phone_number, role) VALUES (?, ?, ?, ?, ?)",
-                (username, password, email, phone, role),
-            )
+        def registered(_):
             messagebox.showinfo("Success", "Registered successfully!")
             WelcomeScreen(self.root).display()
-        except Exception as e:
-            messagebox.showerror("Error", f"Registration failed: {e}")
+
+        self.run_async(
+            lambda db: db.query(
+                "INSERT INTO users (username, password, email, phone_number, role) VALUES (?, ?, ?, ?, ?)",
+                (username, password, email, phone, role),
+            ),
+            registered,
+            on_error=lambda e: messagebox.showerror("Error", f"Registration failed: {e}"),
+        )
 
 
 
 # Homeowner Dashboard
 class HomeownerDashboard(Screen):
-    def __init__(self, root, username):
+    def __init__(self, root, session):
         self.root = root
-        self.username = username
+        self.session = session
+        self.username = session.username
         
         
         
     def add_tenant_to_lease(self, property_id):
         self.clear_screen()
-        tk.Label(self.root, text="Add Tenant to Lease", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-
-        # Calculate rooms available dynamically
-        rooms_available = db.fetch("""
-            SELECT bedrooms - (
-                SELECT COUNT(*) 
-                FROM leases 
-                WHERE property_id = ?
-            ) AS rooms_available
-            FROM properties
-            WHERE property_id = ?
-        """, (property_id, property_id))
-
-        if not rooms_available or rooms_available[0][0] <= 0:
-            messagebox.showerror("Error", "No rooms available for this property.")
-            self.view_properties()
-            return
-
-        # Fetch students who have scheduled visits for this property
-        students = db.fetch("""
-            SELECT DISTINCT u.user_id, u.username
-            FROM property_visits pv
-            JOIN users u ON pv.student_id = u.user_id
-            WHERE pv.property_id = ? AND pv.status = 'accepted'
-        """, (property_id,))
-
-        if not students:
-            tk.Label(self.root, text="No students have scheduled visits for this property.").pack()
-            tk.Button(self.root, text="Back", command=self.display).pack()
-            return
-
-        # Create dropdown for selecting a student
-        tk.Label(self.root, text="Select Tenant:").pack()
-        tenant_var = tk.StringVar(value="Select a student")
-        student_dropdown = tk.OptionMenu(self.root, tenant_var, *[f"{s[1]} (ID: {s[0]})" for s in students])
-        student_dropdown.pack()
-
-        tk.Label(self.root, text="Start Date (YYYY-MM-DD):").pack()
-        start_date_entry = tk.Entry(self.root)
-        start_date_entry.pack()
+        tk.Label(self.view, text="Add Tenant to Lease", font=("Arial", 16)).pack(pady=10)
 
-        tk.Label(self.root, text="End Date (YYYY-MM-DD):").pack()
-        end_date_entry = tk.Entry(self.root)
-        end_date_entry.pack()
+        def load(db):
+            # rooms_available is kept current by triggers on leases and properties
+            rooms_available = db.fetch(queries.ROOMS_AVAILABLE, (property_id,))
+            if not rooms_available or rooms_available[0][0] <= 0:
+                return None     # No room left
 
-        tk.Label(self.root, text="Rent Amount:").pack()
-        rent_entry = tk.Entry(self.root)
-        rent_entry.pack()
+            # Fetch students who have scheduled visits for this property
+            return db.fetch(queries.VISITED_STUDENTS, (property_id,), records=True)
 
-        def submit_lease():
-            selected_student = tenant_var.get()
-            if selected_student == "Select a student":
-                messagebox.showerror("Error", "Please select a student.")
+        def render(frame, students):
+            if students is None:
+                messagebox.showerror("Error", "No rooms available for this property.")
+                self.view_properties()
                 return
 
-            tenant_id = int(selected_student.split("ID: ")[1].rstrip(")"))
-            start_date = start_date_entry.get().strip()
-            end_date = end_date_entry.get().strip()
-            rent_amount = rent_entry.get().strip()
-
-            if not start_date or not end_date or not rent_amount:
-                messagebox.showerror("Error", "All fields are mandatory.")
+            if not students:
+                tk.Label(frame, text="No students have scheduled visits for this property.").pack()
                 return
 
-            # Insert lease details into the database
-            db.query("""
-                INSERT INTO leases (property_id, tenant_id, start_date, end_date, rent_amount)
-                VALUES (?, ?, ?, ?, ?)
-            """, (property_id, tenant_id, start_date, end_date, float(rent_amount)))
+            # Create dropdown for selecting a student
+            tk.Label(frame, text="Select Tenant:").pack()
+            tenant_var = tk.StringVar(value="Select a student")
+            student_dropdown = tk.OptionMenu(frame, tenant_var, *[f"{s.username} (ID: {s.user_id})" for s in students])
+            student_dropdown.pack()
+
+            tk.Label(frame, text="Start Date (YYYY-MM-DD):").pack()
+            start_date_entry = tk.Entry(frame)
+            start_date_entry.pack()
+
+            tk.Label(frame, text="End Date (YYYY-MM-DD):").pack()
+            end_date_entry = tk.Entry(frame)
+            end_date_entry.pack()
+
+            tk.Label(frame, text="Rent Amount:").pack()
+            rent_entry = tk.Entry(frame)
+            rent_entry.pack()
+
+            def submit_lease():
+                selected_student = tenant_var.get()
+                if selected_student == "Select a student":
+                    messagebox.showerror("Error", "Please select a student.")
+                    return
+
+                tenant_id = int(selected_student.split("ID: ")[1].rstrip(")"))
+                start_date = start_date_entry.get().strip()
+                end_date = end_date_entry.get().strip()
+                rent_amount = rent_entry.get().strip()
+
+                if not start_date or not end_date or not rent_amount:
+                    messagebox.showerror("Error", "All fields are mandatory.")
+                    return
+
+                def add_lease(db):
+                    with db.transaction():
+                        # Insert lease details into the database
+                        db.query("""
+                            INSERT INTO leases (property_id, tenant_id, start_date, end_date, rent_amount)
+                            VALUES (?, ?, ?, ?, ?)
+                        """, (property_id, tenant_id, start_date, end_date, float(rent_amount)))
+                        # The lease triggers update rooms_available and visibility
 
-            # Dynamically update property visibility
-            db.query("""
-                UPDATE properties
-                SET visible = CASE 
-                    WHEN bedrooms - (
-                        SELECT COUNT(*) 
-                        FROM leases 
-                        WHERE leases.property_id = properties.property_id
-                    ) > 0 THEN 1 
-                    ELSE 0 
-                END
-                WHERE property_id = ?
-            """, (property_id,))
+                        # Notify the homeowner about the update
+                        homeowner_id = db.fetch("SELECT homeowner_id FROM properties WHERE property_id = ?", (property_id,))[0][0]
+                        notification_manager.notify(homeowner_id, f"Property {property_id} visibility updated after adding a tenant.",
+                                                    subject=f"property:{property_id}:tenants")
 
-            # Notify the homeowner about the update
-            homeowner_id = db.fetch("SELECT homeowner_id FROM properties WHERE property_id = ?", (property_id,))[0][0]
-            notification_manager.notify(homeowner_id, f"Property {property_id} visibility updated after adding a tenant.")
+                def added(_):
+                    messagebox.showinfo("Success", "Tenant added to lease.")
+                    self.view_properties()
 
-            messagebox.showinfo("Success", "Tenant added to lease.")
-            self.view_properties()
+                self.run_async(add_lease, added)
 
-        tk.Button(self.root, text="Submit", command=submit_lease).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.display).pack()
+            tk.Button(frame, text="Submit", command=submit_lease).pack(pady=10)
+
+        self.load_async(load, render)
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
     def select_property_for_lease(self):
         self.clear_screen()
-        tk.Label(self.root, text="Select a Property for Lease", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        homeowner_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        properties = db.fetch("""
-            SELECT property_id, address
-            FROM properties
-            WHERE homeowner_id = ?
-        """, (homeowner_id,))
-
-        if properties:
-            for property in properties:
-                tk.Button(self.root, text=property[1], command=lambda p=property[0]: self.add_tenant_to_lease(p)).pack(pady=5)
-        else:
-            tk.Label(self.root, text="No properties available for lease.").pack()
+        tk.Label(self.view, text="Select a Property for Lease", font=("Arial", 16)).pack(pady=10)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        homeowner_id = self.session.user_id
 
+        def load(db):
+            return db.fetch(queries.LEASE_PROPERTIES, (homeowner_id,), records=True)
+
+        def render(frame, properties):
+            if properties:
+                for property in properties:
+                    tk.Button(frame, text=property.address, command=lambda p=property.property_id: self.add_tenant_to_lease(p)).pack(pady=5)
+            else:
+                tk.Label(frame, text="No properties available for lease.").pack()
+
+        self.load_async(load, render)
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
 
+
+    @cached_screen()
     def display(self):
         """Display the Homeowner Dashboard."""
-        self.clear_screen()
-        tk.Label(self.root, text="Homeowner Dashboard", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Homeowner Dashboard", font=("Arial", 16)).pack(pady=10)
 
         # Buttons for Homeowner Dashboard
-        tk.Button(self.root, text="Upcoming Visits", width=20, command=self.view_upcoming_visits).pack(pady=5)
-        tk.Button(self.root, text="Post Property", width=20, command=self.post_property).pack(pady=5)
-        tk.Button(self.root, text="Manage Listings", width=20, command=self.manage_listings).pack(pady=5)
-        tk.Button(self.root, text="View Visit Requests", width=20, command=self.view_visit_requests).pack(pady=5)
-        tk.Button(self.root, text="Add Tenant to Lease", width=20, command=self.select_property_for_lease).pack(pady=5)
-        tk.Button(self.root, text="My Properties", width=20, command=self.view_properties).pack(pady=5)
-        tk.Button(self.root, text="Logout", width=20, command=lambda: WelcomeScreen(self.root).display()).pack(pady=5)
+        tk.Button(self.view, text="Upcoming Visits", width=20, command=self.view_upcoming_visits).pack(pady=5)
+        tk.Button(self.view, text="Post Property", width=20, command=self.post_property).pack(pady=5)
+        tk.Button(self.view, text="Manage Listings", width=20, command=self.manage_listings).pack(pady=5)
+        tk.Button(self.view, text="View Visit Requests", width=20, command=self.view_visit_requests).pack(pady=5)
+        tk.Button(self.view, text="Add Tenant to Lease", width=20, command=self.select_property_for_lease).pack(pady=5)
+        tk.Button(self.view, text="My Properties", width=20, command=self.view_properties).pack(pady=5)
+        tk.Button(self.view, text="Logout", width=20, command=lambda: WelcomeScreen(self.root).display()).pack(pady=5)
         
 
+    @cached_screen("property_visits", "properties")
     def view_upcoming_visits(self):
         """View upcoming visits for the homeowner's properties."""
-        self.clear_screen()
-        tk.Label(self.root, text="Upcoming Property Visits", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        homeowner_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-
-        # Fetch upcoming visits
-        visits = db.fetch("""
-            SELECT pv.visit_id, p.address, u.username AS visitor, pv.visit_type, pv.date, pv.time, pv.status
-            FROM property_visits pv
-            JOIN properties p ON pv.property_id = p.property_id
-            JOIN users u ON pv.student_id = u.user_id
-            WHERE p.homeowner_id = ? AND pv.status = 'accepted' AND pv.date >= DATE('now')
-            ORDER BY pv.date, pv.time
-        """, (homeowner_id,))
-
-        if visits:
-            for visit in visits:
-                tk.Label(self.root, text=f"Property Address: {visit[1]}").pack()
-                tk.Label(self.root, text=f"Visitor: {visit[2]}").pack()
-                tk.Label(self.root, text=f"Visit Type: {visit[3].capitalize()}").pack()
-                tk.Label(self.root, text=f"Date: {visit[4]}").pack()
-                tk.Label(self.root, text=f"Time: {visit[5]}").pack()
-                tk.Label(self.root, text=f"Status: {visit[6].capitalize()}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No upcoming visits found.").pack()
+        tk.Label(self.view, text="Upcoming Property Visits", font=("Arial", 16)).pack(pady=10)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        homeowner_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            return queries.HOMEOWNER_UPCOMING_VISITS.fetch_page(db, (homeowner_id,), after, page_size)
+
+        VirtualList(self.view, self, [
+            ("Property Address", 180, lambda v: v.address),
+            ("Visitor", 100, lambda v: v.visitor),
+            ("Visit Type", 80, lambda v: v.visit_type.capitalize()),
+            ("Date", 90, lambda v: v.date),
+            ("Time", 60, lambda v: v.time),
+            ("Status", 70, lambda v: v.status.capitalize()),
+        ], fetch_page, empty_text="No upcoming visits found.").pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
-    def clear_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
 
     def post_property(self):
         self.clear_screen()
-        tk.Label(self.root, text="Post Property", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Post Property", font=("Arial", 16)).pack(pady=10)
 
         # Input fields
         fields = {
-            "Address": tk.Entry(self.root),
-            "State": tk.Entry(self.root),
-            "City": tk.Entry(self.root),
-            "Zipcode": tk.Entry(self.root),
-            "Bedrooms": tk.Entry(self.root),
-            "Kitchens": tk.Entry(self.root),
-            "Bathrooms": tk.Entry(self.root),
-            "Description": tk.Text(self.root, height=5, width=40),
+            "Address": tk.Entry(self.view),
+            "State": tk.Entry(self.view),
+            "City": tk.Entry(self.view),
+            "Zipcode": tk.Entry(self.view),
+            "Bedrooms": tk.Entry(self.view),
+            "Kitchens": tk.Entry(self.view),
+            "Bathrooms": tk.Entry(self.view),
+            "Description": tk.Text(self.view, height=5, width=40),
         }
         photo_path = tk.StringVar()
 
         for label, widget in fields.items():
-            tk.Label(self.root, text=f"{label}:").pack()
+            tk.Label(self.view, text=f"{label}:").pack()
             widget.pack()
 
         def upload_photo():
@@ -506,7 +523,7 @@ class HomeownerDashboard(Screen):
                 photo_path.set(file_path)
                 messagebox.showinfo("Photo Uploaded", f"Photo successfully uploaded: {os.path.basename(file_path)}")
 
-        tk.Button(self.root, text="Upload Photo", command=upload_photo).pack(pady=5)
+        tk.Button(self.view, text="Upload Photo", command=upload_photo).pack(pady=5)
 
         def submit():
             data = {key: (widget.get("1.0", tk.END).strip() if isinstance(widget, tk.Text) else widget.get().strip()) for key, widget in fields.items()}
@@ -514,82 +531,82 @@ class HomeownerDashboard(Screen):
                 messagebox.showerror("Error", "All fields except City and Zipcode are mandatory.")
                 return
 
-            db = DatabaseConnection()
-            homeowner_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-            db.query("""
+            homeowner_id = self.session.user_id
+            photo = photo_path.get()
+
+            def posted(_):
+                messagebox.showinfo("Success", "Property posted successfully!")
+                self.display()
+
+            self.run_async(lambda db: db.query("""
                 INSERT INTO properties (homeowner_id, address, state, city, zipcode, bedrooms, kitchens, bathrooms, description, photo_path)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (homeowner_id, data["Address"], data["State"], data["City"], data["Zipcode"], data["Bedrooms"], data["Kitchens"], data["Bathrooms"], data["Description"], photo_path.get()))
-            messagebox.showinfo("Success", "Property posted successfully!")
-            self.display()
+            """, (homeowner_id, data["Address"], data["State"], data["City"], data["Zipcode"], data["Bedrooms"], data["Kitchens"], data["Bathrooms"], data["Description"], photo)), posted)
 
-        tk.Button(self.root, text="Submit", command=submit).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        tk.Button(self.view, text="Submit", command=submit).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
+    @cached_screen("properties")
     def manage_listings(self):
         """Manage property listings."""
-        self.clear_screen()
-        tk.Label(self.root, text="Manage Listings", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        homeowner_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        listings = db.fetch("""
-            SELECT property_id, address, state, city, zipcode, bedrooms, kitchens, bathrooms, description, photo_path
-            FROM properties
-            WHERE homeowner_id = ?
-        """, (homeowner_id,))
-
-        if listings:
-            for listing in listings:
-                tk.Label(self.root, text=f"Address: {listing[1]}").pack()
-                tk.Label(self.root, text=f"State: {listing[2]}, City: {listing[3]}, Zipcode: {listing[4]}").pack()
-                tk.Label(self.root, text=f"Bedrooms: {listing[5]}, Kitchens: {listing[6]}, Bathrooms: {listing[7]}").pack()
-                tk.Label(self.root, text=f"Description: {listing[8]}").pack()
-                tk.Label(self.root, text=f"Photo: {listing[9]}").pack()
-
-                tk.Button(self.root, text="Edit", command=lambda l=listing: self.edit_property(l)).pack()
-                tk.Button(self.root, text="Take Down", command=lambda l=listing: self.take_down_property(l[0])).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No listings found.").pack()
+        tk.Label(self.view, text="Manage Listings", font=("Arial", 16)).pack(pady=10)
+
+        homeowner_id = self.session.user_id
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        def fetch_page(db, after, page_size):
+            return queries.LISTINGS.fetch_page(db, (homeowner_id,), after, page_size)
+
+        listings = VirtualList(self.view, self, [
+            ("Address", 160, lambda l: l.address),
+            ("State", 50, lambda l: l.state),
+            ("City", 90, lambda l: l.city),
+            ("Zipcode", 60, lambda l: l.zipcode),
+            ("Bed/Kit/Bath", 80, lambda l: f"{l.bedrooms}/{l.kitchens}/{l.bathrooms}"),
+            ("Description", 180, lambda l: l.description),
+            ("Photo", 100, lambda l: os.path.basename(l.photo_path) if l.photo_path else ""),
+        ], fetch_page, empty_text="No listings found.")
+        listings.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Edit", command=listings.command(self.edit_property, "Select a listing first.")).pack()
+        tk.Button(self.view, text="Take Down", command=listings.command(lambda l: self.take_down_property(l.property_id), "Select a listing first.")).pack()
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
     def take_down_property(self, property_id):
-        db = DatabaseConnection()
-        db.query("DELETE FROM properties WHERE property_id = ?", (property_id,))
-        messagebox.showinfo("Success", "Property removed.")
-        self.manage_listings()
+        def removed(_):
+            messagebox.showinfo("Success", "Property removed.")
+            self.manage_listings()
+
+        self.run_async(lambda db: db.query("DELETE FROM properties WHERE property_id = ?", (property_id,)), removed)
 
     def edit_property(self, listing):
         """Edit property details."""
         self.clear_screen()
-        tk.Label(self.root, text="Edit Property", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Edit Property", font=("Arial", 16)).pack(pady=10)
 
         fields = {
-            "Address": tk.Entry(self.root),
-            "State": tk.Entry(self.root),
-            "City": tk.Entry(self.root),
-            "Zipcode": tk.Entry(self.root),
-            "Bedrooms": tk.Entry(self.root),
-            "Kitchens": tk.Entry(self.root),
-            "Bathrooms": tk.Entry(self.root),
-            "Description": tk.Text(self.root, height=5, width=40),
+            "Address": tk.Entry(self.view),
+            "State": tk.Entry(self.view),
+            "City": tk.Entry(self.view),
+            "Zipcode": tk.Entry(self.view),
+            "Bedrooms": tk.Entry(self.view),
+            "Kitchens": tk.Entry(self.view),
+            "Bathrooms": tk.Entry(self.view),
+            "Description": tk.Text(self.view, height=5, width=40),
         }
-        photo_path = tk.StringVar(value=listing[9])  # Pre-fill photo path upcomming feature
+        photo_path = tk.StringVar(value=listing.photo_path)  # Pre-fill photo path upcomming feature
 
         # Populate fields with current property values
-        fields["Address"].insert(0, listing[1])
-        fields["State"].insert(0, listing[2])
-        fields["City"].insert(0, listing[3])
-        fields["Zipcode"].insert(0, listing[4])
-        fields["Bedrooms"].insert(0, listing[5])
-        fields["Kitchens"].insert(0, listing[6])
-        fields["Bathrooms"].insert(0, listing[7])
-        fields["Description"].insert("1.0", listing[8])
+        fields["Address"].insert(0, listing.address)
+        fields["State"].insert(0, listing.state)
+        fields["City"].insert(0, listing.city)
+        fields["Zipcode"].insert(0, listing.zipcode)
+        fields["Bedrooms"].insert(0, listing.bedrooms)
+        fields["Kitchens"].insert(0, listing.kitchens)
+        fields["Bathrooms"].insert(0, listing.bathrooms)
+        fields["Description"].insert("1.0", listing.description)
 
         for label, widget in fields.items():
-            tk.Label(self.root, text=f"{label}:").pack()
+            tk.Label(self.view, text=f"{label}:").pack()
             widget.pack()
 
         def upload_photo():
@@ -598,7 +615,7 @@ class HomeownerDashboard(Screen):
                 photo_path.set(file_path)
                 messagebox.showinfo("Photo Uploaded", f"Photo successfully uploaded: {os.path.basename(file_path)}")
 
-        tk.Button(self.root, text="Upload Photo", command=upload_photo).pack(pady=5)
+        tk.Button(self.view, text="Upload Photo", command=upload_photo).pack(pady=5)
 
         def save_changes():
             data = {key: (widget.get("1.0", tk.END).strip() if isinstance(widget, tk.Text) else widget.get().strip()) for key, widget in fields.items()}
@@ -606,369 +623,330 @@ class HomeownerDashboard(Screen):
                 messagebox.showerror("Error", "All mandatory fields must be filled.")
                 return
 
-            db = DatabaseConnection()
-            db.query("""
+            photo = photo_path.get()
+
+            def saved(_):
+                messagebox.showinfo("Success", "Property updated successfully!")
+                self.manage_listings()
+
+            self.run_async(lambda db: db.query("""
                 UPDATE properties
-                SET bedrooms = ?, kitchens = ?, bathrooms = ?, description = ?, photo_path = ?,
-                    visible = CASE 
-                        WHEN bedrooms - (
-                            SELECT COUNT(*) 
-                            FROM leases 
-                            WHERE leases.property_id = properties.property_id
-                        ) > 0 THEN 1 
-                        ELSE 0 
-                    END
+                SET bedrooms = ?, kitchens = ?, bathrooms = ?, description = ?, photo_path = ?
                 WHERE property_id = ?
-            """, (data["Bedrooms"], data["Kitchens"], data["Bathrooms"], data["Description"], photo_path.get(), listing[0]))
-
-            messagebox.showinfo("Success", "Property updated successfully!")
-            self.manage_listings()
+            """, (data["Bedrooms"], data["Kitchens"], data["Bathrooms"], data["Description"], photo, listing.property_id)), saved)
 
-        tk.Button(self.root, text="Save Changes", command=save_changes).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.manage_listings).pack()
+        tk.Button(self.view, text="Save Changes", command=save_changes).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.manage_listings).pack()
         
+    @cached_screen("property_visits")
     def view_visit_requests(self):
-        self.clear_screen()
-        tk.Label(self.root, text="Visit Requests", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        homeowner_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        requests = db.fetch("""
-            SELECT pv.visit_id, p.address, pv.visit_type, pv.date, pv.time, pv.status, pv.note, u.username
-            FROM property_visits pv
-            JOIN properties p ON pv.property_id = p.property_id
-            JOIN users u ON pv.student_id = u.user_id
-            WHERE pv.homeowner_id = ?
-        """, (homeowner_id,))
-
-        if requests:
-            for req in requests:
-                tk.Label(self.root, text=f"Property: {req[1]}").pack()
-                tk.Label(self.root, text=f"Visit Type: {req[2]}, Date: {req[3]}, Time: {req[4]}").pack()
-                tk.Label(self.root, text=f"Status: {req[5]}").pack()
-                tk.Label(self.root, text=f"Note: {req[6] if req[6] else 'None'}").pack()
-                tk.Label(self.root, text=f"Requested by: {req[7]}").pack()
-
-                if req[5] == "pending":
-                    tk.Button(self.root, text="Accept", command=lambda r=req: self.respond_to_request(r[0], "accepted")).pack()
-                    tk.Button(self.root, text="Reject", command=lambda r=req: self.respond_to_request(r[0], "rejected")).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No visit requests.").pack()
-
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        tk.Label(self.view, text="Visit Requests", font=("Arial", 16)).pack(pady=10)
+
+        homeowner_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            return queries.VISIT_REQUESTS.fetch_page(db, (homeowner_id,), after, page_size)
+
+        requests = VirtualList(self.view, self, [
+            ("Property", 180, lambda r: r.address),
+            ("Requested by", 100, lambda r: r.username),
+            ("Visit Type", 80, lambda r: r.visit_type),
+            ("Date", 90, lambda r: r.date),
+            ("Time", 60, lambda r: r.time),
+            ("Status", 70, lambda r: r.status),
+            ("Note", 160, lambda r: r.note if r.note else "None"),
+        ], fetch_page, empty_text="No visit requests.")
+        requests.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        def respond(status):
+            def run(req):
+                if req.status != "pending":
+                    messagebox.showerror("Error", f"This request has already been {req.status}.")
+                    return
+                self.respond_to_request(req.visit_id, status)
+            return requests.command(run, "Select a visit request first.")
+
+        tk.Button(self.view, text="Accept", command=respond("accepted")).pack()
+        tk.Button(self.view, text="Reject", command=respond("rejected")).pack()
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
     def respond_to_request(self, visit_id, status):
-        db = DatabaseConnection()
-        db.query("UPDATE property_visits SET status = ? WHERE visit_id = ?", (status, visit_id))
-
-        # Fetch student ID and send notification
-        student_id = db.fetch("SELECT student_id FROM property_visits WHERE visit_id = ?", (visit_id,))[0][0]
-        if status == "accepted":
-            message = "Your visit request has been accepted."
-        elif status == "rejected":
-            message = "Your visit request has been rejected."
-        else:
-            message = "Your visit request status has been updated."
+        def respond(db):
+            with db.transaction():
+                db.query("UPDATE property_visits SET status = ? WHERE visit_id = ?", (status, visit_id))
+
+                # Fetch student ID and send notification
+                student_id = db.fetch("SELECT student_id FROM property_visits WHERE visit_id = ?", (visit_id,))[0][0]
+                if status == "accepted":
+                    message = "Your visit request has been accepted."
+                elif status == "rejected":
+                    message = "Your visit request has been rejected."
+                else:
+                    message = "Your visit request status has been updated."
+
+                # Notify student
+                notification_manager.notify(student_id, message)
 
-        # Notify student
-        notification_manager.notify(student_id, message)
-        messagebox.showinfo("Success", f"Request {status}.")
-        self.view_visit_requests()  
+        def responded(_):
+            messagebox.showinfo("Success", f"Request {status}.")
+            self.view_visit_requests()
+
+        self.run_async(respond, responded)
         
+    @cached_screen("properties", "leases", "users")
     def view_properties(self):
-        self.clear_screen()
-        tk.Label(self.root, text="My Properties", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        homeowner_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        properties = db.fetch("""
-            SELECT property_id, address, bedrooms - (
-                SELECT COUNT(*) 
-                FROM leases 
-                WHERE leases.property_id = properties.property_id
-            ) AS rooms_available, bedrooms
-            FROM properties
-            WHERE homeowner_id = ?
-        """, (homeowner_id,))
-
-        if properties:
-            for property in properties:
-                tk.Label(self.root, text=f"Address: {property[1]}").pack()
-                tk.Label(self.root, text=f"Rooms Available: {property[2]} / {property[3]}").pack()
-
-                tenants = db.fetch("""
-                    SELECT u.username, u.email
-                    FROM leases l
-                    JOIN users u ON l.tenant_id = u.user_id
-                    WHERE l.property_id = ?
-                """, (property[0],))
-
-                if tenants:
-                    tk.Label(self.root, text="Tenants:").pack()
-                    for tenant in tenants:
-                        tk.Label(self.root, text=f"   Name: {tenant[0]}, Email: {tenant[1]}").pack()
-                else:
-                    tk.Label(self.root, text="No tenants yet.").pack()
+        tk.Label(self.view, text="My Properties", font=("Arial", 16)).pack(pady=10)
 
-                tk.Button(self.root, text="Manage Maintenance Requests", 
-                        command=lambda p=property[0]: self.manage_maintenance_requests(p)).pack(pady=5)
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No properties found.").pack()
+        homeowner_id = self.session.user_id
+
+        tenants = {}     # property_id -> tenant records, filled in a page at a time with the rows
+
+        def fetch_page(db, after, page_size):
+            page = queries.MY_PROPERTIES.fetch_page(db, (homeowner_id,), after, page_size)
+            # One query for the tenants of every property on the page
+            tenants.update(tenants_by_property(db).load_many(property.property_id for property in page.rows))
+            return page
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        properties = VirtualList(self.view, self, [
+            ("Address", 180, lambda p: p.address),
+            ("Rooms Available", 100, lambda p: f"{p.rooms_available} / {p.bedrooms}"),
+            ("Tenants", 300, lambda p: ", ".join(f"{tenant.username} ({tenant.email})" for tenant in tenants[p.property_id])
+                                        or "No tenants yet."),
+        ], fetch_page, empty_text="No properties found.")
+        properties.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Manage Maintenance Requests",
+                  command=properties.command(lambda p: self.manage_maintenance_requests(p.property_id), "Select a property first.")).pack(pady=5)
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
 #manage_maintenance_requests
+    @cached_screen("maintenance_requests", "leases")
     def manage_maintenance_requests(self, property_id):
-        self.clear_screen()
-        tk.Label(self.root, text="Maintenance Requests", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        requests = db.fetch("""
-            SELECT request_id, description, location, date, status, resolution_date 
-            FROM maintenance_requests 
-            WHERE property_id = ?
-        """, (property_id,))
-
-        if requests:
-            for request in requests:
-                tk.Label(self.root, text=f"Issue: {request[1]}").pack()
-                tk.Label(self.root, text=f"Location: {request[2] if request[2] else 'Not specified'}").pack()
-                tk.Label(self.root, text=f"Date: {request[3]}").pack()
-                tk.Label(self.root, text=f"Status: {request[4].capitalize()}").pack()
-                if request[4] == "pending":
-                    tk.Label(self.root, text="Set Resolution Date:").pack()
-                    resolution_date_entry = tk.Entry(self.root)
-                    resolution_date_entry.pack()
-
-                    def resolve_request():
-                        resolution_date = resolution_date_entry.get().strip()
-                        if not resolution_date:
-                            messagebox.showerror("Error", "Resolution date is mandatory.")
-                            return
+        tk.Label(self.view, text="Maintenance Requests", font=("Arial", 16)).pack(pady=10)
+
+        def fetch_page(db, after, page_size):
+            return queries.MAINTENANCE_REQUESTS.fetch_page(db, (property_id,), after, page_size)
+
+        requests = VirtualList(self.view, self, [
+            ("Issue", 200, lambda r: r.description),
+            ("Location", 100, lambda r: r.location if r.location else "Not specified"),
+            ("Date", 90, lambda r: r.date),
+            ("Status", 70, lambda r: r.status.capitalize()),
+            ("Resolved on", 90, lambda r: r.resolution_date if r.status == "resolved" else ""),
+        ], fetch_page, empty_text="No maintenance requests found.")
+        requests.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Label(self.view, text="Set Resolution Date:").pack()
+        resolution_date_entry = tk.Entry(self.view)
+        resolution_date_entry.pack()
+
+        def resolve_request(request):
+            if request.status != "pending":
+                messagebox.showerror("Error", "This request has already been resolved.")
+                return
+            resolution_date = resolution_date_entry.get().strip()
+            if not resolution_date:
+                messagebox.showerror("Error", "Resolution date is mandatory.")
+                return
 
-                        db.query("""
-                            UPDATE maintenance_requests 
-                            SET status = 'resolved', resolution_date = ?
-                            WHERE request_id = ?
-                        """, (resolution_date, request[0]))
-
-                        # Notify all tenants
-                        tenant_ids = db.fetch("""
-                            SELECT tenant_id 
-                            FROM leases 
-                            WHERE property_id = ?
-                        """, (property_id,))
-                        for tenant in tenant_ids:
-                            notification_manager.notify(tenant[0], f"Maintenance issue resolved on {resolution_date}.")
-
-                        messagebox.showinfo("Success", "Issue resolved and tenants notified.")
-                        self.manage_maintenance_requests(property_id)
-
-                    tk.Button(self.root, text="Resolve", command=resolve_request).pack(pady=5)
-                elif request[4] == "resolved":
-                    tk.Label(self.root, text=f"Resolved on: {request[5]}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No maintenance requests found.").pack()
+            def resolve(db):
+                with db.transaction():
+                    db.query("""
+                        UPDATE maintenance_requests 
+                        SET status = 'resolved', resolution_date = ?
+                        WHERE request_id = ?
+                    """, (resolution_date, request.request_id))
+
+                    # Notify all tenants
+                    tenants = tenants_by_property(db).load(property_id)
+                    notification_manager.notify_many([tenant.user_id for tenant in tenants], f"Maintenance issue resolved on {resolution_date}.",
+                                                     subject=f"maintenance:{property_id}:resolved")
+
+            def resolved(_):
+                messagebox.showinfo("Success", "Issue resolved and tenants notified.")
+                self.manage_maintenance_requests(property_id)
 
-        tk.Button(self.root, text="Back", command=self.view_properties).pack()
+            self.run_async(resolve, resolved)
+
+        tk.Button(self.view, text="Resolve", command=requests.command(resolve_request, "Select a maintenance request first.")).pack(pady=5)
+        tk.Button(self.view, text="Back", command=self.view_properties).pack()
 
 
 #STUDNET DASHBOARD
 class StudentDashboard(Screen):
-    def __init__(self, root, username):
+    def __init__(self, root, session):
         self.root = root
-        self.username = username
+        self.session = session
+        self.username = session.username
         
+    @cached_screen()     # The unread count is kept current by the NotificationFeed, not by reloading
     def display(self):
         """Display the Student Dashboard."""
-        self.clear_screen()
-        tk.Label(self.root, text="Student Dashboard", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Student Dashboard", font=("Arial", 16)).pack(pady=10)
 
         # Add all the buttons
-        tk.Button(self.root, text="Chat with Assistant", command=lambda: ChatBotScreen(self.root, self.username).display()).pack(pady=5)
-        tk.Button(self.root, text="View My Lease", width=20, command=self.view_my_lease).pack(pady=5)
-        tk.Button(self.root, text="Search Properties", width=20, command=self.search_properties).pack(pady=5)
-        tk.Button(self.root, text="View Bookmarked Properties", width=20, command=self.view_bookmarked_properties).pack(pady=5)
-        tk.Button(self.root, text="View Notifications", width=20, command=self.view_notifications).pack(pady=5)
-        tk.Button(self.root, text="Upcoming Visits", width=20, command=self.view_upcoming_visits).pack(pady=5)
-        tk.Button(self.root, text="Community Events", width=20, command=self.community_events_menu).pack(pady=5)
-        tk.Button(self.root, text="Carpooling", width=20, command=self.carpooling_menu).pack(pady=5)
-        tk.Button(self.root, text="Upcoming Carpools", width=20, command=self.view_upcoming_carpools).pack(pady=5)  
-        tk.Button(self.root, text="View Roommates", width=20, command=self.view_roommates).pack(pady=5)
-        tk.Button(self.root, text="Logout", width=20, command=lambda: WelcomeScreen(self.root).display()).pack(pady=5)
+        tk.Button(self.view, text="Chat with Assistant", command=lambda: ChatBotScreen(self.root, self.session).display()).pack(pady=5)
+        tk.Button(self.view, text="View My Lease", width=20, command=self.view_my_lease).pack(pady=5)
+        tk.Button(self.view, text="Search Properties", width=20, command=self.search_properties).pack(pady=5)
+        tk.Button(self.view, text="View Bookmarked Properties", width=20, command=self.view_bookmarked_properties).pack(pady=5)
+        # The unread badge is filled in by the feed's first check, on the database worker
+        inbox = tk.Button(self.view, text="View Notifications", width=20, command=self.view_notifications)
+        inbox.pack(pady=5)
+
+        def show_unread(count):
+            inbox.config(text=f"View Notifications ({count})" if count else "View Notifications")
+
+        def show_new(notifications):
+            latest = notifications[-1]
+            text = f"{latest.message} (x{latest.count})" if latest.count > 1 else latest.message
+            if len(notifications) > 1:
+                text = f"{len(notifications)} new notifications. Latest: {text}"
+            show_toast(self.root, text)
+
+        # New notifications are pushed here while the dashboard exists, even when another screen is on top
+        NotificationFeed(self.root, notification_manager, self.session.user_id, inbox, show_new, show_unread)
+        tk.Button(self.view, text="Upcoming Visits", width=20, command=self.view_upcoming_visits).pack(pady=5)
+        tk.Button(self.view, text="Community Events", width=20, command=self.community_events_menu).pack(pady=5)
+        tk.Button(self.view, text="Carpooling", width=20, command=self.carpooling_menu).pack(pady=5)
+        tk.Button(self.view, text="Upcoming Carpools", width=20, command=self.view_upcoming_carpools).pack(pady=5)  
+        tk.Button(self.view, text="View Roommates", width=20, command=self.view_roommates).pack(pady=5)
+        tk.Button(self.view, text="Logout", width=20, command=lambda: WelcomeScreen(self.root).display()).pack(pady=5)
         
+    @cached_screen("leases", "users")
     def view_roommates(self):
-        self.clear_screen()
-        tk.Label(self.root, text="My Roommates", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        property_id = db.fetch("""
-            SELECT property_id
-            FROM leases
-            WHERE tenant_id = ? AND status = 'active'
-        """, (student_id,))
-        
-        if not property_id:
-            tk.Label(self.root, text="You are not currently on any lease.").pack()
-            tk.Button(self.root, text="Back", command=self.display).pack()
-            return
+        tk.Label(self.view, text="My Roommates", font=("Arial", 16)).pack(pady=10)
 
-        roommates = db.fetch("""
-            SELECT u.username, u.email
-            FROM leases l
-            JOIN users u ON l.tenant_id = u.user_id
-            WHERE l.property_id = ? AND l.tenant_id != ?
-        """, (property_id[0][0], student_id))
-
-        if roommates:
-            for roommate in roommates:
-                tk.Label(self.root, text=f"Name: {roommate[0]}").pack()
-                tk.Label(self.root, text=f"Email: {roommate[1]}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No roommates found.").pack()
+        student_id = self.session.user_id
+
+        def load(db):
+            property_id = db.fetch(queries.LEASE_PROPERTY, (student_id,))
+            return property_id[0][0] if property_id else None     # None: not on a lease
+
+        def render(frame, property_id):
+            if property_id is None:
+                tk.Label(frame, text="You are not currently on any lease.").pack()
+                return
+
+            def fetch_page(db, after, page_size):
+                return queries.ROOMMATES.fetch_page(db, (property_id, student_id), after, page_size)
+
+            VirtualList(frame, self, [
+                ("Name", 150, lambda r: r.username),
+                ("Email", 220, lambda r: r.email),
+            ], fetch_page, height=8, empty_text="No roommates found.").pack(fill=tk.BOTH, expand=True, padx=10)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        self.load_async(load, render)
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
 
+    @cached_screen("leases")
     def view_my_lease(self):    #view_my_lease
-        self.clear_screen()
-        tk.Label(self.root, text="My Lease", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        leases = db.fetch("""
-            SELECT l.lease_id, p.address, l.start_date, l.end_date, l.rent_amount, l.status
-            FROM leases l
-            JOIN properties p ON l.property_id = p.property_id
-            WHERE l.tenant_id = ? AND l.status = 'active'
-        """, (student_id,))
-
-        if leases:
-            for lease in leases:
-                tk.Label(self.root, text=f"Property Address: {lease[1]}").pack()
-                tk.Label(self.root, text=f"Start Date: {lease[2]}").pack()
-                tk.Label(self.root, text=f"End Date: {lease[3]}").pack()
-                tk.Label(self.root, text=f"Rent Amount: ${lease[4]:.2f}").pack()
-                tk.Label(self.root, text=f"Status: {lease[5].capitalize()}").pack()
-
-                tk.Button(self.root, text="Submit Maintenance Request", 
-                        command=self.submit_maintenance_request).pack(pady=5)
-                tk.Button(self.root, text="View Maintenance Requests", 
-                        command=self.view_maintenance_requests).pack(pady=5)
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="You have no active leases.").pack()
+        tk.Label(self.view, text="My Lease", font=("Arial", 16)).pack(pady=10)
+
+        student_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            return queries.MY_LEASE.fetch_page(db, (student_id,), after, page_size)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        leases = VirtualList(self.view, self, [
+            ("Property Address", 180, lambda l: l.address),
+            ("Start Date", 90, lambda l: l.start_date),
+            ("End Date", 90, lambda l: l.end_date),
+            ("Rent Amount", 90, lambda l: f"${l.rent_amount:.2f}"),
+            ("Status", 70, lambda l: l.status.capitalize()),
+        ], fetch_page, height=5, empty_text="You have no active leases.")
+        leases.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Submit Maintenance Request",
+                  command=leases.command(lambda l: self.submit_maintenance_request(), "Select a lease first.")).pack(pady=5)
+        tk.Button(self.view, text="View Maintenance Requests", command=self.view_maintenance_requests).pack(pady=5)
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
     #view_maintenance_requests
+    @cached_screen("maintenance_requests", "leases")
     def view_maintenance_requests(self):
-        self.clear_screen()
-        tk.Label(self.root, text="My Maintenance Requests", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        requests = db.fetch("""
-            SELECT mr.description, mr.location, mr.date, mr.status, mr.resolution_date
-            FROM maintenance_requests mr
-            JOIN leases l ON mr.property_id = l.property_id
-            WHERE l.tenant_id = ? AND l.status = 'active'
-        """, (student_id,))
-
-        if requests:
-            for request in requests:
-                tk.Label(self.root, text=f"Issue: {request[0]}").pack()
-                tk.Label(self.root, text=f"Location: {request[1] if request[1] else 'Not specified'}").pack()
-                tk.Label(self.root, text=f"Date: {request[2]}").pack()
-                tk.Label(self.root, text=f"Status: {request[3].capitalize()}").pack()
-                if request[3] == "resolved":
-                    tk.Label(self.root, text=f"Resolved on: {request[4]}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No maintenance requests found.").pack()
+        tk.Label(self.view, text="My Maintenance Requests", font=("Arial", 16)).pack(pady=10)
+
+        student_id = self.session.user_id
 
-        tk.Button(self.root, text="Back", command=self.view_my_lease).pack()
+        def fetch_page(db, after, page_size):
+            return queries.MY_MAINTENANCE_REQUESTS.fetch_page(db, (student_id,), after, page_size)
+
+        VirtualList(self.view, self, [
+            ("Issue", 200, lambda r: r.description),
+            ("Location", 100, lambda r: r.location if r.location else "Not specified"),
+            ("Date", 90, lambda r: r.date),
+            ("Status", 70, lambda r: r.status.capitalize()),
+            ("Resolved on", 90, lambda r: r.resolution_date if r.status == "resolved" else ""),
+        ], fetch_page, empty_text="No maintenance requests found.").pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Back", command=self.view_my_lease).pack()
 
 
 
 
 
 #view_upcoming_visits
+    @cached_screen("property_visits")
     def view_upcoming_visits(self):
         """View all upcoming visits for the student."""
-        self.clear_screen()
-        tk.Label(self.root, text="Upcoming Visits", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-
-        visits = db.fetch("""
-            SELECT pv.visit_type, pv.date, pv.time, p.address
-            FROM property_visits pv
-            JOIN properties p ON pv.property_id = p.property_id
-            WHERE pv.student_id = ? AND pv.status = 'accepted'
-            ORDER BY pv.date, pv.time
-        """, (student_id,))
-
-        if visits:
-            for idx, visit in enumerate(visits, start=1):
-                tk.Label(self.root, text=f"Visit #{idx}").pack()
-                tk.Label(self.root, text=f"   Type: {visit[0]}").pack()
-                tk.Label(self.root, text=f"   Date: {visit[1]}").pack()
-                tk.Label(self.root, text=f"   Time: {visit[2]}").pack()
-                tk.Label(self.root, text=f"   Address: {visit[3]}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No upcoming visits found.").pack()
+        tk.Label(self.view, text="Upcoming Visits", font=("Arial", 16)).pack(pady=10)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        student_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            return queries.STUDENT_UPCOMING_VISITS.fetch_page(db, (student_id,), after, page_size)
+
+        VirtualList(self.view, self, [
+            ("Type", 80, lambda v: v.visit_type),
+            ("Date", 90, lambda v: v.date),
+            ("Time", 60, lambda v: v.time),
+            ("Address", 220, lambda v: v.address),
+        ], fetch_page, empty_text="No upcoming visits found.").pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
     #community_events_menu
+    @cached_screen()
     def community_events_menu(self):
         """Community Events main menu."""
-        self.clear_screen()
-        tk.Label(self.root, text="Community Events", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Community Events", font=("Arial", 16)).pack(pady=10)
 
-        tk.Button(self.root, text="View Available Events", width=20, command=self.view_available_events).pack(pady=5)
-        tk.Button(self.root, text="Post an Event", width=20, command=self.post_event).pack(pady=5)
-        tk.Button(self.root, text="Manage Events", width=20, command=self.manage_events).pack(pady=5)
-        tk.Button(self.root, text="Manage Requests", width=20, command=self.manage_event_requests).pack(pady=5)  # New option
-        tk.Button(self.root, text="View Upcoming Events", width=20, command=self.view_upcoming_events).pack(pady=5)  # New button for upcoming events
-        tk.Button(self.root, text="Back", width=20, command=self.display).pack(pady=5)
+        tk.Button(self.view, text="View Available Events", width=20, command=self.view_available_events).pack(pady=5)
+        tk.Button(self.view, text="Post an Event", width=20, command=self.post_event).pack(pady=5)
+        tk.Button(self.view, text="Manage Events", width=20, command=self.manage_events).pack(pady=5)
+        tk.Button(self.view, text="Manage Requests", width=20, command=self.manage_event_requests).pack(pady=5)  # New option
+        tk.Button(self.view, text="View Upcoming Events", width=20, command=self.view_upcoming_events).pack(pady=5)  # New button for upcoming events
+        tk.Button(self.view, text="Back", width=20, command=self.display).pack(pady=5)
 
 
     def post_event(self):
         """Allow the user to post a new event."""
         self.clear_screen()
-        tk.Label(self.root, text="Post a Community Event", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Post a Community Event", font=("Arial", 16)).pack(pady=10)
 
         # Input fields for event details
         fields = {
-            "Name": tk.Entry(self.root),
-            "Location": tk.Entry(self.root),
-            "Date (YYYY-MM-DD)": tk.Entry(self.root),
-            "Time": tk.Entry(self.root),  # Corrected key to match the logic
-            "Max Participants": tk.Entry(self.root),
-            "Description": tk.Text(self.root, height=5, width=40),
+            "Name": tk.Entry(self.view),
+            "Location": tk.Entry(self.view),
+            "Date (YYYY-MM-DD)": tk.Entry(self.view),
+            "Time": tk.Entry(self.view),  # Corrected key to match the logic
+            "Max Participants": tk.Entry(self.view),
+            "Description": tk.Text(self.view, height=5, width=40),
         }
         event_type_var = tk.StringVar(value="social")  # Default event type
 
         for label, widget in fields.items():
-            tk.Label(self.root, text=f"{label}:").pack()
+            tk.Label(self.view, text=f"{label}:").pack()
             widget.pack()
 
-        tk.Label(self.root, text="Event Type:").pack()
+        tk.Label(self.view, text="Event Type:").pack()
         for event_type in ["social", "academic", "sports", "potluck", "other"]:
-            tk.Radiobutton(self.root, text=event_type.capitalize(), variable=event_type_var, value=event_type).pack(anchor=tk.W)
+            tk.Radiobutton(self.view, text=event_type.capitalize(), variable=event_type_var, value=event_type).pack(anchor=tk.W)
 
         def submit_event():
             """Submit the new event to the database."""
@@ -977,46 +955,49 @@ class StudentDashboard(Screen):
                 messagebox.showerror("Error", "All fields except Description are mandatory.")
                 return
 
-            db = DatabaseConnection()
-            student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-            db.query("""
+            student_id = self.session.user_id
+            event_type = event_type_var.get()
+
+            def posted(_):
+                messagebox.showinfo("Success", "Event posted successfully!")
+                self.community_events_menu()
+
+            self.run_async(lambda db: db.query("""
                 INSERT INTO community_events (organizer_id, name, location, date, time, max_participants, description, event_type)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (student_id, data["Name"], data["Location"], data["Date (YYYY-MM-DD)"], data["Time"], data["Max Participants"], data["Description"], event_type_var.get()))
-            messagebox.showinfo("Success", "Event posted successfully!")
-            self.community_events_menu()
+            """, (student_id, data["Name"], data["Location"], data["Date (YYYY-MM-DD)"], data["Time"], data["Max Participants"], data["Description"], event_type)), posted)
 
-        tk.Button(self.root, text="Submit", command=submit_event).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.community_events_menu).pack()
+        tk.Button(self.view, text="Submit", command=submit_event).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.community_events_menu).pack()
 
     
     
     def create_event(self):
         """Create a new community event."""
         self.clear_screen()
-        tk.Label(self.root, text="Create Event", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Create Event", font=("Arial", 16)).pack(pady=10)
 
         # Define input fields
         fields = {
-            "Name": tk.Entry(self.root),
-            "Location": tk.Entry(self.root),
-            "Date (YYYY-MM-DD)": tk.Entry(self.root),
-            "Time": tk.Entry(self.root),
-            "Max Participants": tk.Entry(self.root),
-            "Description": tk.Text(self.root, height=5, width=40),
+            "Name": tk.Entry(self.view),
+            "Location": tk.Entry(self.view),
+            "Date (YYYY-MM-DD)": tk.Entry(self.view),
+            "Time": tk.Entry(self.view),
+            "Max Participants": tk.Entry(self.view),
+            "Description": tk.Text(self.view, height=5, width=40),
         }
 
         # Create input widgets for each field
         for label, widget in fields.items():
-            tk.Label(self.root, text=f"{label}:").pack()
+            tk.Label(self.view, text=f"{label}:").pack()
             widget.pack()
 
         # Radio buttons for event type
         event_type_var = tk.StringVar(value="social")
-        tk.Label(self.root, text="Event Type:").pack()
+        tk.Label(self.view, text="Event Type:").pack()
         event_types = ["Social", "Academic", "Sports", "Potluck", "Other"]
         for event_type in event_types:
-            tk.Radiobutton(self.root, text=event_type, variable=event_type_var, value=event_type.lower()).pack()
+            tk.Radiobutton(self.view, text=event_type, variable=event_type_var, value=event_type.lower()).pack()
 
         def submit():
             # Collect data from input fields
@@ -1031,85 +1012,69 @@ class StudentDashboard(Screen):
                 return
 
             # Insert event into database
-            db = DatabaseConnection()
-            student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-            db.query("""
+            student_id = self.session.user_id
+            event_type = event_type_var.get()
+
+            def created(_):
+                messagebox.showinfo("Success", "Event created successfully!")
+                self.community_events_menu()
+
+            self.run_async(lambda db: db.query("""
                 INSERT INTO community_events (organizer_id, name, location, date, time, max_participants, description, event_type)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (student_id, data["Name"], data["Location"], data["Date (YYYY-MM-DD)"], data["Time"], data["Max Participants"], data["Description"], event_type_var.get()))
-            messagebox.showinfo("Success", "Event created successfully!")
-            self.community_events_menu()
+            """, (student_id, data["Name"], data["Location"], data["Date (YYYY-MM-DD)"], data["Time"], data["Max Participants"], data["Description"], event_type)), created)
 
         # Add Submit and Back buttons
-        tk.Button(self.root, text="Submit", command=submit).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.community_events_menu).pack()
+        tk.Button(self.view, text="Submit", command=submit).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.community_events_menu).pack()
         
+    @cached_screen("community_events", "event_participants")
     def view_available_events(self):
         """Display a list of all available events."""
-        self.clear_screen()
-        tk.Label(self.root, text="Available Events", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-
-        # Fetch all events that have space left for participants and exclude events organized by the student
-        events = db.fetch("""
-            SELECT e.event_id, e.name, e.location, e.date, e.time, e.max_participants, 
-                SUM(CASE WHEN ep.status = 'accepted' THEN 1 ELSE 0 END) AS current_participants,
-                e.description, e.event_type, e.organizer_id
-            FROM community_events e
-            LEFT JOIN event_participants ep ON e.event_id = ep.event_id
-            GROUP BY e.event_id, e.name, e.location, e.date, e.time, e.max_participants, e.description, e.event_type, e.organizer_id
-            HAVING current_participants < e.max_participants AND e.organizer_id != ?
-        """, (student_id,))
-
-        if events:
-            for event in events:
-                tk.Label(self.root, text=f"Event Name: {event[1]}").pack()
-                tk.Label(self.root, text=f"Location: {event[2]}").pack()
-                tk.Label(self.root, text=f"Date: {event[3]} Time: {event[4]}").pack()
-                tk.Label(self.root, text=f"Max Participants: {event[5]}").pack()
-                tk.Label(self.root, text=f"Current Participants: {event[6]}").pack()
-                tk.Label(self.root, text=f"Description: {event[7]}").pack()
-                tk.Label(self.root, text=f"Event Type: {event[8].capitalize()}").pack()
-
-                # Exclude the organizer from seeing the "Request to Join" button
-                if event[9] != student_id:
-                    response = db.fetch("""
-                        SELECT status FROM event_participants
-                        WHERE event_id = ? AND student_id = ?
-                    """, (event[0], student_id))
-
-                    if response:
-                        status = response[0][0]
-                        if status == "pending":
-                            tk.Button(self.root, text="Pending", state=tk.DISABLED).pack()
-                        elif status == "accepted":
-                            tk.Button(self.root, text="Accepted", state=tk.DISABLED).pack()
-                        elif status == "rejected":
-                            tk.Button(self.root, text="Rejected", state=tk.DISABLED).pack()
-                    else:
-                        tk.Button(self.root, text="Request to Join", command=lambda e=event: self.request_to_join_event(e)).pack()
-
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No available events.").pack()
+        tk.Label(self.view, text="Available Events", font=("Arial", 16)).pack(pady=10)
+
+        student_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            # Fetch upcoming events that have space left for participants and exclude events organized by the student,
+            # along with the student's own request status. Participant counts are maintained by triggers.
+            return queries.AVAILABLE_EVENTS.fetch_page(db, (student_id, student_id), after, page_size)
+
+        events = VirtualList(self.view, self, [
+            ("Event Name", 140, lambda e: e.name),
+            ("Location", 120, lambda e: e.location),
+            ("Date", 90, lambda e: e.date),
+            ("Time", 60, lambda e: e.time),
+            ("Participants", 80, lambda e: f"{e.current_participants}/{e.max_participants}"),
+            ("Type", 70, lambda e: e.event_type.capitalize()),
+            ("Description", 180, lambda e: e.description),
+            ("My Request", 80, lambda e: e.my_status.capitalize() if e.my_status else ""),
+        ], fetch_page, empty_text="No available events.")
+        events.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        def request_to_join(event):
+            if event.my_status:
+                messagebox.showinfo("Request to Join", f"Your request for this event is {event.my_status}.")
+                return
+            self.request_to_join_event(event)
 
-        tk.Button(self.root, text="Back", command=self.community_events_menu).pack()
+        tk.Button(self.view, text="Request to Join", command=events.command(request_to_join, "Select an event first.")).pack()
+        tk.Button(self.view, text="Back", command=self.community_events_menu).pack()
 
     
     def request_to_join_event(self, event):
         """Send a request to join an event."""
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
+        student_id = self.session.user_id
+
+        def sent(_):
+            messagebox.showinfo("Success", f"Request sent for event: {event.name}")
+            self.view_available_events()  # Refresh the event list
 
         # Insert request into event_participants table with 'pending' status
-        db.query("""
+        self.run_async(lambda db: db.query("""
             INSERT INTO event_participants (event_id, student_id, status)
             VALUES (?, ?, 'pending')
-        """, (event[0], student_id))
-        messagebox.showinfo("Success", f"Request sent for event: {event[1]}")
-        self.view_available_events()  # Refresh the event list
+        """, (event.event_id, student_id)), sent)
 
 
     
@@ -1117,99 +1082,103 @@ class StudentDashboard(Screen):
         #to display_event_results
     def display_event_results(self, events):
         self.clear_screen()
-        tk.Label(self.root, text="Event Results", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Event Results", font=("Arial", 16)).pack(pady=10)
 
         if events:
             for event in events:
-                tk.Label(self.root, text=f"Name: {event[1]}").pack()
-                tk.Label(self.root, text=f"Location: {event[2]}").pack()
-                tk.Label(self.root, text=f"Date: {event[3]}, Time: {event[4]}").pack()
-                tk.Label(self.root, text=f"Participants: {event[6]}/{event[5]}").pack()
-                tk.Label(self.root, text=f"Description: {event[7]}").pack()
-                tk.Button(self.root, text="Join", command=lambda e=event: self.join_event(e)).pack()
-                tk.Label(self.root, text="").pack()
+                tk.Label(self.view, text=f"Name: {event.name}").pack()
+                tk.Label(self.view, text=f"Location: {event.location}").pack()
+                tk.Label(self.view, text=f"Date: {event.date}, Time: {event.time}").pack()
+                tk.Label(self.view, text=f"Participants: {event.current_participants}/{event.max_participants}").pack()
+                tk.Label(self.view, text=f"Description: {event.description}").pack()
+                tk.Button(self.view, text="Join", command=lambda e=event: self.join_event(e)).pack()
+                tk.Label(self.view, text="").pack()
         else:
-            tk.Label(self.root, text="No events found.").pack()
+            tk.Label(self.view, text="No events found.").pack()
 
-        tk.Button(self.root, text="Back", command=self.search_events).pack()
+        tk.Button(self.view, text="Back", command=self.search_events).pack()
         
+    @cached_screen("event_participants", "community_events")
     def manage_event_requests(self):
         """View and manage requests for events organized by the user."""
-        self.clear_screen()
-        tk.Label(self.root, text="Manage Event Requests", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        organizer_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-
-        # Fetch all requests for events organized by the user
-        requests = db.fetch("""
-            SELECT ep.participant_id, ep.event_id, ep.student_id, ep.status, e.name, u.username
-            FROM event_participants ep
-            JOIN community_events e ON ep.event_id = e.event_id
-            JOIN users u ON ep.student_id = u.user_id
-            WHERE e.organizer_id = ?
-        """, (organizer_id,))
-
-        if requests:
-            for request in requests:
-                tk.Label(self.root, text=f"Event: {request[4]}").pack()
-                tk.Label(self.root, text=f"Requested by: {request[5]}").pack()
-                tk.Label(self.root, text=f"Status: {request[3]}").pack()
-
-                if request[3] == "pending":
-                    tk.Button(self.root, text="Accept", command=lambda r=request: self.accept_event_request(r)).pack()
-                    tk.Button(self.root, text="Reject", command=lambda r=request: self.reject_event_request(r)).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No requests found.").pack()
+        tk.Label(self.view, text="Manage Event Requests", font=("Arial", 16)).pack(pady=10)
+
+        organizer_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            # All requests for events organized by the user
+            return queries.EVENT_REQUESTS.fetch_page(db, (organizer_id,), after, page_size)
+
+        requests = VirtualList(self.view, self, [
+            ("Event", 180, lambda r: r.name),
+            ("Requested by", 120, lambda r: r.username),
+            ("Status", 80, lambda r: r.status),
+        ], fetch_page, empty_text="No requests found.")
+        requests.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        def respond(action):
+            def run(request):
+                if request.status != "pending":
+                    messagebox.showerror("Error", f"This request has already been {request.status}.")
+                    return
+                action(request)
+            return requests.command(run, "Select a request first.")
 
-        tk.Button(self.root, text="Back", command=self.community_events_menu).pack()
+        tk.Button(self.view, text="Accept", command=respond(self.accept_event_request)).pack()
+        tk.Button(self.view, text="Reject", command=respond(self.reject_event_request)).pack()
+        tk.Button(self.view, text="Back", command=self.community_events_menu).pack()
 
         
     def accept_event_request(self, request):
         """Accept a request to join an event."""
-        db = DatabaseConnection()
-        db.query("UPDATE event_participants SET status = 'accepted' WHERE participant_id = ?", (request[0],))
-        
-        # Notify the student
-        db.query("""
-            INSERT INTO notifications (user_id, message)
-            VALUES (?, ?)
-        """, (request[2], f"Your request to join the event '{request[4]}' has been accepted."))
-        messagebox.showinfo("Success", f"Request accepted for {request[5]}.")
-        self.manage_event_requests()
+        def accept(db):
+            with db.transaction():
+                db.query("UPDATE event_participants SET status = 'accepted' WHERE participant_id = ?", (request.participant_id,))
+
+                # Notify the student
+                notification_manager.notify(request.student_id, f"Your request to join the event '{request.name}' has been accepted.",
+                                            subject=f"event_request:{request.participant_id}")
+
+        def accepted(_):
+            messagebox.showinfo("Success", f"Request accepted for {request.username}.")
+            self.manage_event_requests()
+
+        self.run_async(accept, accepted)
 
         
     def reject_event_request(self, request):
         """Reject a request to join an event."""
-        db = DatabaseConnection()
-        db.query("UPDATE event_participants SET status = 'rejected' WHERE participant_id = ?", (request[0],))
-        
-        # Notify the student
-        db.query("""
-            INSERT INTO notifications (user_id, message)
-            VALUES (?, ?)
-        """, (request[2], f"Your request to join the event '{request[4]}' has been rejected."))
-        messagebox.showinfo("Success", f"Request rejected for {request[5]}.")
-        self.manage_event_requests()
+        def reject(db):
+            with db.transaction():
+                db.query("UPDATE event_participants SET status = 'rejected' WHERE participant_id = ?", (request.participant_id,))
+
+                # Notify the student
+                notification_manager.notify(request.student_id, f"Your request to join the event '{request.name}' has been rejected.",
+                                            subject=f"event_request:{request.participant_id}")
+
+        def rejected(_):
+            messagebox.showinfo("Success", f"Request rejected for {request.username}.")
+            self.manage_event_requests()
+
+        self.run_async(reject, rejected)
 
 
 
     def submit_maintenance_request(self):
         self.clear_screen()
-        tk.Label(self.root, text="Submit Maintenance Request", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Submit Maintenance Request", font=("Arial", 16)).pack(pady=10)
 
         # Maintenance request fields
-        tk.Label(self.root, text="Description of the Issue:").pack()
-        description_entry = tk.Entry(self.root, width=40)
+        tk.Label(self.view, text="Description of the Issue:").pack()
+        description_entry = tk.Entry(self.view, width=40)
         description_entry.pack()
 
-        tk.Label(self.root, text="Location of the Issue (Optional):").pack()
-        location_entry = tk.Entry(self.root, width=40)
+        tk.Label(self.view, text="Location of the Issue (Optional):").pack()
+        location_entry = tk.Entry(self.view, width=40)
         location_entry.pack()
 
-        tk.Label(self.root, text="Date (YYYY-MM-DD):").pack()
-        date_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Date (YYYY-MM-DD):").pack()
+        date_entry = tk.Entry(self.view)
         date_entry.pack()
 
         def submit_request():
@@ -1221,52 +1190,58 @@ class StudentDashboard(Screen):
                 messagebox.showerror("Error", "Description and Date are mandatory.")
                 return
 
-            db = DatabaseConnection()
-            student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-            property_id = db.fetch("""
-                SELECT property_id 
-                FROM leases 
-                WHERE tenant_id = ? AND status = 'active'
-            """, (student_id,))[0][0]
-
-            # Insert maintenance request into the database
-            db.query("""
-                INSERT INTO maintenance_requests (property_id, tenant_id, description, location, date, status) 
-                VALUES (?, ?, ?, ?, ?, 'pending')
-            """, (property_id, student_id, description, location, date))
-
-            # Notify the homeowner and other tenants
-            homeowner_id = db.fetch("SELECT homeowner_id FROM properties WHERE property_id = ?", (property_id,))[0][0]
-            notification_manager.notify(homeowner_id, f"New maintenance request from Tenant {self.username}: {description} (Date: {date}).")
-
-            tenant_ids = db.fetch("""
-                SELECT tenant_id 
-                FROM leases 
-                WHERE property_id = ?
-            """, (property_id,))
-            for tenant in tenant_ids:
-                if tenant[0] != student_id:  # Avoid notifying the requester
-                    notification_manager.notify(tenant[0], f"A new maintenance request was submitted: {description}.")
+            student_id = self.session.user_id
+            username = self.username
+
+            def submit(db):
+                property_id = db.fetch(queries.LEASE_PROPERTY, (student_id,))[0][0]
+
+                with db.transaction():
+                    # Insert maintenance request into the database
+                    db.query("""
+                        INSERT INTO maintenance_requests (property_id, tenant_id, description, location, date, status) 
+                        VALUES (?, ?, ?, ?, ?, 'pending')
+                    """, (property_id, student_id, description, location, date))
+
+                    # Notify the homeowner and other tenants
+                    homeowner_id = db.fetch("SELECT homeowner_id FROM properties WHERE property_id = ?", (property_id,))[0][0]
+                    notification_manager.notify(homeowner_id, f"New maintenance request from Tenant {username}: {description} (Date: {date}).")
 
-            messagebox.showinfo("Success", "Maintenance request submitted and notifications sent.")
-            self.view_my_lease()
+                    tenant_ids = db.fetch("""
+                        SELECT tenant_id 
+                        FROM leases 
+                        WHERE property_id = ?
+                    """, (property_id,))
+                    notification_manager.notify_many(
+                        [tenant[0] for tenant in tenant_ids if tenant[0] != student_id],  # Avoid notifying the requester
+                        f"A new maintenance request was submitted: {description}.")
+
+            def submitted(_):
+                messagebox.showinfo("Success", "Maintenance request submitted and notifications sent.")
+                self.view_my_lease()
 
-        tk.Button(self.root, text="Submit", command=submit_request).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.view_my_lease).pack()
+            self.run_async(submit, submitted)
+
+        tk.Button(self.view, text="Submit", command=submit_request).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.view_my_lease).pack()
 
 
     def respond_to_request(self, request, status):
         """Respond to a student's request for an event."""
-        db = DatabaseConnection()
-        db.query("UPDATE event_responses SET status = ? WHERE response_id = ?", (status, request[0]))
+        def respond(db):
+            with db.transaction():
+                db.query("UPDATE event_responses SET status = ? WHERE response_id = ?", (status, request[0]))
+
+                # Notify the student
+                student_id = db.fetch("SELECT student_id FROM event_responses WHERE response_id = ?", (request[0],))[0][0]
+                notification_manager.notify(student_id, f"Your request for the event has been {status}.",
+                                            subject=f"event_response:{request[0]}")
 
-        # Notify the student
-        student_id = db.fetch("SELECT student_id FROM event_responses WHERE response_id = ?", (request[0],))[0][0]
-        notification = f"Your request for the event has been {status}."
-        db.query("INSERT INTO notifications (user_id, message) VALUES (?, ?)", (student_id, notification))
+        def responded(_):
+            messagebox.showinfo("Success", f"Request {status.capitalize()}.")
+            self.manage_event_requests()
 
-        messagebox.showinfo("Success", f"Request {status.capitalize()}.")
-        self.manage_event_requests(request)
+        self.run_async(respond, responded)
 
 
 #  to edit_event
@@ -1274,36 +1249,36 @@ class StudentDashboard(Screen):
     def edit_event(self, event):
         """Edit an existing event."""
         self.clear_screen()
-        tk.Label(self.root, text="Edit Event", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Edit Event", font=("Arial", 16)).pack(pady=10)
 
         # Define input fields
         fields = {
-            "Name": tk.Entry(self.root),
-            "Location": tk.Entry(self.root),
-            "Date (YYYY-MM-DD)": tk.Entry(self.root),
-            "Time": tk.Entry(self.root),
-            "Max Participants": tk.Entry(self.root),
-            "Description": tk.Text(self.root, height=5, width=40),
+            "Name": tk.Entry(self.view),
+            "Location": tk.Entry(self.view),
+            "Date (YYYY-MM-DD)": tk.Entry(self.view),
+            "Time": tk.Entry(self.view),
+            "Max Participants": tk.Entry(self.view),
+            "Description": tk.Text(self.view, height=5, width=40),
         }
 
         # Pre-fill fields with current event data
-        fields["Name"].insert(0, event[1])  # Name
-        fields["Location"].insert(0, event[2])  # Location
-        fields["Date (YYYY-MM-DD)"].insert(0, event[3])  # Date
-        fields["Time"].insert(0, event[4])  # Time
-        fields["Max Participants"].insert(0, event[5])  # Max Participants
-        fields["Description"].insert("1.0", event[6])  # Description
+        fields["Name"].insert(0, event.name)  # Name
+        fields["Location"].insert(0, event.location)  # Location
+        fields["Date (YYYY-MM-DD)"].insert(0, event.date)  # Date
+        fields["Time"].insert(0, event.time)  # Time
+        fields["Max Participants"].insert(0, event.max_participants)  # Max Participants
+        fields["Description"].insert("1.0", event.description)  # Description
 
         for label, widget in fields.items():
-            tk.Label(self.root, text=f"{label}:").pack()
+            tk.Label(self.view, text=f"{label}:").pack()
             widget.pack()
 
         # Radio buttons for event type
-        event_type_var = tk.StringVar(value=event[7].lower())  # Pre-fill with the current event type
-        tk.Label(self.root, text="Event Type:").pack()
+        event_type_var = tk.StringVar(value=event.event_type.lower())  # Pre-fill with the current event type
+        tk.Label(self.view, text="Event Type:").pack()
         event_types = ["Social", "Academic", "Sports", "Potluck", "Other"]
         for event_type in event_types:
-            tk.Radiobutton(self.root, text=event_type, variable=event_type_var, value=event_type.lower()).pack()
+            tk.Radiobutton(self.view, text=event_type, variable=event_type_var, value=event_type.lower()).pack()
 
         def save_changes():
             # Collect updated data from input fields
@@ -1317,203 +1292,238 @@ class StudentDashboard(Screen):
                 messagebox.showerror("Error", "All fields except Description are mandatory.")
                 return
 
+            event_type = event_type_var.get()
+
             # Update the event in the database
-            db = DatabaseConnection()
-            db.query("""
-                UPDATE community_events
-                SET name = ?, location = ?, date = ?, time = ?, max_participants = ?, description = ?, event_type = ?
-                WHERE event_id = ?
-            """, (updated_data["Name"], updated_data["Location"], updated_data["Date (YYYY-MM-DD)"], updated_data["Time"], updated_data["Max Participants"], updated_data["Description"], event_type_var.get(), event[0]))
-
-            # Notify participants about the update
-            participants = db.fetch("""
-                SELECT participant_id FROM event_participants WHERE event_id = ?
-            """, (event[0],))
-            for participant in participants:
-                notification_manager.notify(participant[0], f"The event '{event[1]}' has been updated.")
-
-            messagebox.showinfo("Success", "Event updated successfully!")
-            self.manage_events()
+            def save(db):
+                with db.transaction():
+                    db.query("""
+                        UPDATE community_events
+                        SET name = ?, location = ?, date = ?, time = ?, max_participants = ?, description = ?, event_type = ?
+                        WHERE event_id = ?
+                    """, (updated_data["Name"], updated_data["Location"], updated_data["Date (YYYY-MM-DD)"], updated_data["Time"], updated_data["Max Participants"], updated_data["Description"], event_type, event.event_id))
+
+                    # Notify participants about the update
+                    EventObserver(db).notify_participants(event.event_id, f"The event '{event.name}' has been updated.")
+
+            def saved(_):
+                messagebox.showinfo("Success", "Event updated successfully!")
+                self.manage_events()
+
+            self.run_async(save, saved)
 
         # Add Save Changes and Back buttons
-        tk.Button(self.root, text="Save Changes", command=save_changes).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.manage_events).pack()
+        tk.Button(self.view, text="Save Changes", command=save_changes).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.manage_events).pack()
 
     
     
     def remove_event(self, event_id):
         """Remove an event."""
-        db = DatabaseConnection()
-        db.query("DELETE FROM community_events WHERE event_id = ?", (event_id,))
-        messagebox.showinfo("Success", "Event removed successfully.")
-        self.manage_events()
+        def removed(_):
+            messagebox.showinfo("Success", "Event removed successfully.")
+            self.manage_events()
 
+        self.run_async(lambda db: db.query("DELETE FROM community_events WHERE event_id = ?", (event_id,)), removed)
+
+    @cached_screen("community_events")
     def manage_events(self):
         """Manage events created by the student."""
-        self.clear_screen()
-        tk.Label(self.root, text="Manage Your Events", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Manage Your Events", font=("Arial", 16)).pack(pady=10)
 
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        events = db.fetch("""
-            SELECT event_id, name, location, date, time, max_participants, description, event_type
-            FROM community_events
-            WHERE organizer_id = ?
-        """, (student_id,))
+        student_id = self.session.user_id
 
-        if events:
-            for event in events:
-                tk.Label(self.root, text=f"Event: {event[1]}").pack()
-                tk.Label(self.root, text=f"Location: {event[2]}").pack()
-                tk.Label(self.root, text=f"Date: {event[3]}, Time: {event[4]}").pack()
-                tk.Label(self.root, text=f"Max Participants: {event[5]}").pack()
-                tk.Label(self.root, text=f"Description: {event[6]}").pack()
-                tk.Label(self.root, text=f"Type: {event[7]}").pack()
-
-                tk.Button(self.root, text="Edit", command=lambda e=event: self.edit_event(e)).pack()
-                tk.Button(self.root, text="Remove", command=lambda e=event: self.remove_event(e[0])).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="You have no active events.").pack()
+        def fetch_page(db, after, page_size):
+            return queries.MY_EVENTS.fetch_page(db, (student_id,), after, page_size)
+
+        events = VirtualList(self.view, self, [
+            ("Event", 140, lambda e: e.name),
+            ("Location", 120, lambda e: e.location),
+            ("Date", 90, lambda e: e.date),
+            ("Time", 60, lambda e: e.time),
+            ("Max Participants", 100, lambda e: e.max_participants),
+            ("Type", 70, lambda e: e.event_type),
+            ("Description", 180, lambda e: e.description),
+        ], fetch_page, empty_text="You have no active events.")
+        events.pack(fill=tk.BOTH, expand=True, padx=10)
 
-        tk.Button(self.root, text="Back", width=20, command=self.community_events_menu).pack()
+        tk.Button(self.view, text="Edit", command=events.command(self.edit_event, "Select an event first.")).pack()
+        tk.Button(self.view, text="Remove", command=events.command(lambda e: self.remove_event(e.event_id), "Select an event first.")).pack()
+        tk.Button(self.view, text="Back", width=20, command=self.community_events_menu).pack()
 
+    @cached_screen("community_events", "event_participants")
     def view_upcoming_events(self):
         """View events the user is participating in or owns."""
-        self.clear_screen()
-        tk.Label(self.root, text="Upcoming Events", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Upcoming Events", font=("Arial", 16)).pack(pady=10)
 
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
+        student_id = self.session.user_id
 
-        # Fetch events the user is participating in or owns
-        events = db.fetch("""
-            SELECT e.event_id, e.name, e.location, e.date, e.time, e.max_participants, e.description, e.event_type, u.username AS organizer
-            FROM community_events e
-            LEFT JOIN event_participants ep ON e.event_id = ep.event_id
-            LEFT JOIN users u ON e.organizer_id = u.user_id
-            WHERE (ep.student_id = ? AND ep.status = 'accepted') OR e.organizer_id = ?
-            GROUP BY e.event_id
-        """, (student_id, student_id))
+        def fetch_page(db, after, page_size):
+            # Fetch events the user is participating in or owns, soonest first
+            return queries.UPCOMING_EVENTS.fetch_page(db, (student_id, student_id), after, page_size)
 
-        if events:
-            for event in events:
-                tk.Label(self.root, text=f"Event: {event[1]}").pack()
-                tk.Label(self.root, text=f"Location: {event[2]}").pack()
-                tk.Label(self.root, text=f"Date: {event[3]}, Time: {event[4]}").pack()
-                tk.Label(self.root, text=f"Max Participants: {event[5]}").pack()
-                tk.Label(self.root, text=f"Description: {event[6]}").pack()
-                tk.Label(self.root, text=f"Event Type: {event[7].capitalize()}").pack()  # Correct index for event_type
-                tk.Label(self.root, text=f"Organizer: {event[8]}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No upcoming events found.").pack()
+        VirtualList(self.view, self, [
+            ("Event", 140, lambda e: e.name),
+            ("Location", 120, lambda e: e.location),
+            ("Date", 90, lambda e: e.date),
+            ("Time", 60, lambda e: e.time),
+            ("Max Participants", 100, lambda e: e.max_participants),
+            ("Type", 70, lambda e: e.event_type.capitalize()),
+            ("Organizer", 100, lambda e: e.organizer),
+            ("Description", 180, lambda e: e.description),
+        ], fetch_page, empty_text="No upcoming events found.").pack(fill=tk.BOTH, expand=True, padx=10)
 
-        tk.Button(self.root, text="Back", command=self.community_events_menu).pack()
+        tk.Button(self.view, text="Back", command=self.community_events_menu).pack()
 
 
     #carpooling_menu
+    @cached_screen()
     def carpooling_menu(self):
         """Carpooling main menu."""
-        self.clear_screen()
-        tk.Label(self.root, text="Carpooling", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Carpooling", font=("Arial", 16)).pack(pady=10)
 
-        tk.Button(self.root, text="Search Carpools", width=20, command=self.search_carpools).pack(pady=5)
-        tk.Button(self.root, text="Post Carpool", width=20, command=self.post_carpool).pack(pady=5)
-        tk.Button(self.root, text="Manage Carpools", width=20, command=self.manage_carpools).pack(pady=5)
-        tk.Button(self.root, text="View Carpool Requests", width=20, command=self.view_carpool_requests).pack(pady=5)
-        tk.Button(self.root, text="Back", width=20, command=self.display).pack(pady=5)
+        tk.Button(self.view, text="Search Carpools", width=20, command=self.search_carpools).pack(pady=5)
+        tk.Button(self.view, text="Post Carpool", width=20, command=self.post_carpool).pack(pady=5)
+        tk.Button(self.view, text="Manage Carpools", width=20, command=self.manage_carpools).pack(pady=5)
+        tk.Button(self.view, text="View Carpool Requests", width=20, command=self.view_carpool_requests).pack(pady=5)
+        tk.Button(self.view, text="Back", width=20, command=self.display).pack(pady=5)
 
 
 #search_carpools
+    @cached_screen()
     def search_carpools(self):
         """Search available carpools."""
-        self.clear_screen()
-        tk.Label(self.root, text="Search Carpools", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Search Carpools", font=("Arial", 16)).pack(pady=10)
 
-        tk.Label(self.root, text="Starting Point:").pack()
-        start_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Starting Point:").pack()
+        start_entry = tk.Entry(self.view)
         start_entry.pack()
 
-        tk.Label(self.root, text="Destination:").pack()
-        dest_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Destination:").pack()
+        dest_entry = tk.Entry(self.view)
         dest_entry.pack()
 
+        tk.Label(self.view, text="Pickup between (HH:MM, optional):").pack()
+        window_frame = tk.Frame(self.view)
+        window_frame.pack()
+        earliest_entry = tk.Entry(window_frame, width=8)
+        earliest_entry.pack(side=tk.LEFT)
+        tk.Label(window_frame, text="and").pack(side=tk.LEFT, padx=5)
+        latest_entry = tk.Entry(window_frame, width=8)
+        latest_entry.pack(side=tk.LEFT)
+
         def submit_search():
             start = start_entry.get().strip()
             destination = dest_entry.get().strip()
+            earliest = earliest_entry.get().strip()
+            latest = latest_entry.get().strip()
 
             if not start or not destination:
                 messagebox.showerror("Error", "Starting point and destination are required.")
                 return
-
-            db = DatabaseConnection()
-            carpools = db.fetch("""
-                SELECT c.carpool_id, c.start_point, c.destination, c.price, c.seats, c.date, c.time, c.stops, u.username
-                FROM carpools c
-                LEFT JOIN users u ON c.student_id = u.user_id
-                WHERE (c.start_point LIKE ? OR c.stops LIKE ?) AND c.destination LIKE ? AND c.seats > 0
-            """, (f"%{start}%", f"%{start}%", f"%{destination}%"))
-
-            self.display_carpool_results(carpools)
-
-        tk.Button(self.root, text="Search", command=submit_search).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.carpooling_menu).pack()
-
-    def display_carpool_results(self, results):
-        """Display search results for carpools."""
+            # Times are compared as text, so "9:00" has to become "09:00" to sort before "10:00"
+            if (earliest and not normalize_time(earliest)) or (latest and not normalize_time(latest)):
+                messagebox.showerror("Error", "Pickup times must be in HH:MM format.")
+                return
+            earliest = normalize_time(earliest) if earliest else ""
+            latest = normalize_time(latest) if latest else ""
+
+            start_match = substring_expression(("start_point",), start)
+            destination_match = substring_expression(("destination",), destination)
+            pickup_stop_match = substring_expression(("place",), start)
+            dropoff_stop_match = substring_expression(("place",), destination)
+
+            def like_page(db, after, page_size):
+                # Names shorter than a trigram can't use the index, so fall back to LIKE (without stop order)
+                return queries.LIKE_CARPOOLS.fetch_page(
+                    db, (f"%{start}%", f"%{start}%", f"%{destination}%", earliest, earliest, latest, latest), after, page_size)
+
+            def fetch_page(db, after, page_size):
+                # Route match on the trigram indexes: the rider is picked up at the start point or a stop
+                # and dropped off at a later stop or the destination, with the pickup ETA inside the window
+                page = queries.SEARCH_CARPOOLS.fetch_page(
+                    db, (start_match, pickup_stop_match, destination_match, dropoff_stop_match, earliest, earliest, latest, latest),
+                    after, page_size)
+                if page.rows or after is not None:
+                    return page
+                return closest_carpools(db)
+
+            def closest_carpools(db):
+                # No route contains the places as typed: take the carpools whose start point (or a stop) and destination
+                # share the most trigrams with them and keep those close enough to be a misspelling, closest first
+                destination_fuzzy = fuzzy_expression(("destination",), destination)
+                candidates = db.fetch(queries.FUZZY_CARPOOLS, (
+                    f"{fuzzy_expression(('start_point',), start)} AND {destination_fuzzy}",
+                    fuzzy_expression(("place",), start), destination_fuzzy,
+                    earliest, earliest, latest, latest, FUZZY_CANDIDATES), records=True)
+                scored = []
+                for carpool in candidates:
+                    start_score = max(similarity(start, carpool.start_point), similarity(start, carpool.stops))
+                    destination_score = similarity(destination, carpool.destination)
+                    if start_score >= FUZZY_THRESHOLD and destination_score >= FUZZY_THRESHOLD:
+                        scored.append((start_score + destination_score, carpool))
+                scored.sort(key=lambda match: -match[0])
+                return Page([carpool for _, carpool in scored], False, None)
+
+            self.display_carpool_results(fetch_page if start_match and destination_match else like_page)
+
+        tk.Button(self.view, text="Search", command=submit_search).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.carpooling_menu).pack()
+
+    def display_carpool_results(self, fetch_page):
+        """Display search results for carpools, loaded a page at a time by fetch_page(db, after, page_size)."""
         self.clear_screen()
-        tk.Label(self.root, text="Available Carpools", font=("Arial", 16)).pack(pady=10)
-
-        if results:
-            for idx, carpool in enumerate(results, start=1):
-                tk.Label(self.root, text=f"Carpool #{idx}").pack()
-                tk.Label(self.root, text=f"Driver: {carpool[8]}").pack()
-                tk.Label(self.root, text=f"   From: {carpool[1]} to {carpool[2]}").pack()
-                tk.Label(self.root, text=f"   Price: ${carpool[3]}").pack()
-                tk.Label(self.root, text=f"   Seats Available: {carpool[4]}").pack()
-                tk.Label(self.root, text=f"   Date: {carpool[5]}").pack()
-                tk.Label(self.root, text=f"   Time: {carpool[6]}").pack()
-                tk.Label(self.root, text=f"   Stops: {carpool[7] if carpool[7] else 'None'}").pack()
-                tk.Button(self.root, text="Request to Join", command=lambda c=carpool: self.request_to_join_carpool(c)).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No carpools found.").pack()
-
-        tk.Button(self.root, text="Back", command=self.search_carpools).pack()
+        tk.Label(self.view, text="Available Carpools", font=("Arial", 16)).pack(pady=10)
+
+        results = VirtualList(self.view, self, [
+            ("Driver", 100, lambda c: c.username),
+            ("From", 130, lambda c: c.start_point),
+            ("To", 130, lambda c: c.destination),
+            ("Price", 60, lambda c: f"${c.price}"),
+            ("Seats", 50, lambda c: c.seats),
+            ("Date", 90, lambda c: c.date),
+            ("Time", 60, lambda c: c.time),
+            ("Stops", 160, lambda c: c.stops if c.stops else "None"),
+        ], fetch_page, empty_text="No carpools found.", tag=(self.session.user_id, "carpool search"))
+        results.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Request to Join", command=results.command(self.request_to_join_carpool, "Select a carpool first.")).pack()
+        tk.Button(self.view, text="Back", command=self.search_carpools).pack()
 
     def request_to_join_carpool(self, carpool):
         """Send a request to join the carpool."""
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        db.query("""
+        student_id = self.session.user_id
+
+        def sent(_):
+            messagebox.showinfo("Success", "Request sent to join carpool.")
+            self.search_carpools()
+
+        self.run_async(lambda db: db.query("""
             INSERT INTO carpool_requests (carpool_id, student_id, status)
             VALUES (?, ?, 'pending')
-        """, (carpool[0], student_id))
-        messagebox.showinfo("Success", "Request sent to join carpool.")
-        self.search_carpools()
+        """, (carpool.carpool_id, student_id)), sent)
 
     def post_carpool(self):
         """Post a new carpool."""
         self.clear_screen()
-        tk.Label(self.root, text="Post Carpool", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Post Carpool", font=("Arial", 16)).pack(pady=10)
 
         # Input fields for carpool details
         fields = {
-            "Starting Point": tk.Entry(self.root),
-            "Destination": tk.Entry(self.root),
-            "Seats Available": tk.Entry(self.root),
-            "Price per Seat": tk.Entry(self.root),
-            "Date (YYYY-MM-DD)": tk.Entry(self.root),
-            "Time (HH:MM)": tk.Entry(self.root),
+            "Starting Point": tk.Entry(self.view),
+            "Destination": tk.Entry(self.view),
+            "Seats Available": tk.Entry(self.view),
+            "Price per Seat": tk.Entry(self.view),
+            "Date (YYYY-MM-DD)": tk.Entry(self.view),
+            "Time (HH:MM)": tk.Entry(self.view),
         }
 
         for label, widget in fields.items():
-            tk.Label(self.root, text=label).pack()
+            tk.Label(self.view, text=label).pack()
             widget.pack()
 
         # Stops and ETA input
-        stops_frame = tk.Frame(self.root)
+        stops_frame = tk.Frame(self.view)
         stops_frame.pack(pady=10)
 
         stops = []
@@ -1544,7 +1554,7 @@ class StudentDashboard(Screen):
             stop_frame.destroy()
             stops.remove((stop_entry, eta_entry))
 
-        tk.Button(self.root, text="Add Stop", command=add_stop).pack()
+        tk.Button(self.view, text="Add Stop", command=add_stop).pack()
 
         def submit_carpool():
             data = {key: widget.get().strip() for key, widget in fields.items()}
@@ -1557,84 +1567,88 @@ class StudentDashboard(Screen):
                 stop = stop_entry.get().strip()
                 eta = eta_entry.get().strip()
                 if stop and eta:
-                    stop_data.append(f"{stop} (ETA: {eta})")
+                    stop_data.append((stop, normalize_time(eta)))
+            if not normalize_time(data["Time (HH:MM)"]) or any(eta is None for _, eta in stop_data):
+                messagebox.showerror("Error", "Times must be in HH:MM format.")
+                return
+            data["Time (HH:MM)"] = normalize_time(data["Time (HH:MM)"])
 
-            stops_string = "; ".join(stop_data) if stop_data else None
+            student_id = self.session.user_id
 
-            db = DatabaseConnection()
-            student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-            db.query("""
-                INSERT INTO carpools (student_id, start_point, destination, seats, price, date, time, stops)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (student_id, data["Starting Point"], data["Destination"], data["Seats Available"], data["Price per Seat"], data["Date (YYYY-MM-DD)"], data["Time (HH:MM)"], stops_string))
-            messagebox.showinfo("Success", "Carpool posted successfully.")
-            self.carpooling_menu()
+            def post(db):
+                with db.transaction():
+                    db.query("""
+                        INSERT INTO carpools (student_id, start_point, destination, seats, price, date, time)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, (student_id, data["Starting Point"], data["Destination"], data["Seats Available"], data["Price per Seat"], data["Date (YYYY-MM-DD)"], data["Time (HH:MM)"]))
+                    carpool_id = db.fetch("SELECT last_insert_rowid()")[0][0]
+                    save_carpool_stops(db, carpool_id, stop_data)
+
+            def posted(_):
+                messagebox.showinfo("Success", "Carpool posted successfully.")
+                self.carpooling_menu()
+
+            self.run_async(post, posted)
 
-        tk.Button(self.root, text="Submit", command=submit_carpool).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.carpooling_menu).pack()
+        tk.Button(self.view, text="Submit", command=submit_carpool).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.carpooling_menu).pack()
 
 #manage_carpools
+    @cached_screen("carpools")
     def manage_carpools(self):
         """Manage student's carpools."""
-        self.clear_screen()
-        tk.Label(self.root, text="Manage Your Carpools", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        carpools = db.fetch("""
-            SELECT carpool_id, start_point, destination, seats, price, stops, date, time
-            FROM carpools
-            WHERE student_id = ?
-        """, (student_id,))
-
-        if carpools:
-            for carpool in carpools:
-                tk.Label(self.root, text=f"From {carpool[1]} to {carpool[2]}").pack()
-                tk.Label(self.root, text=f"Seats Available: {carpool[3]}").pack()
-                tk.Label(self.root, text=f"Price: ${carpool[4]}").pack()
-                tk.Label(self.root, text=f"Date: {carpool[6]}").pack()
-                tk.Label(self.root, text=f"Time: {carpool[7]}").pack()
-                tk.Button(self.root, text="Edit", command=lambda c=carpool: self.edit_carpool(c)).pack()
-                tk.Button(self.root, text="Remove", command=lambda c=carpool: self.remove_carpool(c[0])).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="You have no active carpools.").pack()
+        tk.Label(self.view, text="Manage Your Carpools", font=("Arial", 16)).pack(pady=10)
+
+        student_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            return queries.MY_CARPOOLS.fetch_page(db, (student_id,), after, page_size)
 
-        tk.Button(self.root, text="Back", command=self.carpooling_menu).pack()
+        carpools = VirtualList(self.view, self, [
+            ("From", 140, lambda c: c.start_point),
+            ("To", 140, lambda c: c.destination),
+            ("Seats Available", 100, lambda c: c.seats),
+            ("Price", 60, lambda c: f"${c.price}"),
+            ("Date", 90, lambda c: c.date),
+            ("Time", 60, lambda c: c.time),
+        ], fetch_page, empty_text="You have no active carpools.")
+        carpools.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        tk.Button(self.view, text="Edit", command=carpools.command(self.edit_carpool, "Select a carpool first.")).pack()
+        tk.Button(self.view, text="Remove", command=carpools.command(lambda c: self.remove_carpool(c.carpool_id), "Select a carpool first.")).pack()
+        tk.Button(self.view, text="Back", command=self.carpooling_menu).pack()
 
     def edit_carpool(self, carpool):
         """Edit an existing carpool."""
         self.clear_screen()
-        tk.Label(self.root, text="Edit Carpool", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Edit Carpool", font=("Arial", 16)).pack(pady=10)
 
         # Input fields for carpool details
         fields = {
-            "Starting Point": tk.Entry(self.root),
-            "Destination": tk.Entry(self.root),
-            "Seats Available": tk.Entry(self.root),
-            "Price per Seat": tk.Entry(self.root),
-            "Date (YYYY-MM-DD)": tk.Entry(self.root),
-            "Time (HH:MM)": tk.Entry(self.root),
+            "Starting Point": tk.Entry(self.view),
+            "Destination": tk.Entry(self.view),
+            "Seats Available": tk.Entry(self.view),
+            "Price per Seat": tk.Entry(self.view),
+            "Date (YYYY-MM-DD)": tk.Entry(self.view),
+            "Time (HH:MM)": tk.Entry(self.view),
         }
 
         # Pre-fill the fields with existing carpool data
-        fields["Starting Point"].insert(0, carpool[1])
-        fields["Destination"].insert(0, carpool[2])
-        fields["Seats Available"].insert(0, carpool[3])
-        fields["Price per Seat"].insert(0, carpool[4])
-        fields["Date (YYYY-MM-DD)"].insert(0, carpool[6])
-        fields["Time (HH:MM)"].insert(0, carpool[7])
+        fields["Starting Point"].insert(0, carpool.start_point)
+        fields["Destination"].insert(0, carpool.destination)
+        fields["Seats Available"].insert(0, carpool.seats)
+        fields["Price per Seat"].insert(0, carpool.price)
+        fields["Date (YYYY-MM-DD)"].insert(0, carpool.date)
+        fields["Time (HH:MM)"].insert(0, carpool.time)
 
         for label, widget in fields.items():
-            tk.Label(self.root, text=label).pack()
+            tk.Label(self.view, text=label).pack()
             widget.pack()
 
         # Stops and ETA input
-        stops_frame = tk.Frame(self.root)
+        stops_frame = tk.Frame(self.view)
         stops_frame.pack(pady=10)
 
-        # Parse existing stops into a list
-        existing_stops = carpool[5].split("; ") if carpool[5] else []
         stops = []
 
         def add_stop(stop_name="", eta=""):
@@ -1656,16 +1670,16 @@ class StudentDashboard(Screen):
             stop_frame.destroy()
             stops.remove((stop_name_entry, eta_entry))
 
+        def show_stops(existing_stops):
+            for stop_name, eta in existing_stops:
+                add_stop(stop_name, eta or "")
+            save_button.config(state=tk.NORMAL)     # Saving earlier would drop the stops not shown yet
+
         # Populate existing stops
-        for stop in existing_stops:
-            if "(ETA: " in stop:
-                stop_name, eta = stop.split(" (ETA: ")
-                eta = eta.rstrip(")")
-                add_stop(stop_name, eta)
-            else:
-                add_stop(stop, "")
+        self.run_async(lambda db: db.fetch(queries.CARPOOL_STOPS,
+                                           (carpool.carpool_id,)), show_stops, owner=stops_frame)
 
-        tk.Button(self.root, text="Add Stop", command=add_stop).pack()
+        tk.Button(self.view, text="Add Stop", command=add_stop).pack()
 
         def save_changes():
             """Save changes to the carpool."""
@@ -1679,234 +1693,212 @@ class StudentDashboard(Screen):
                 stop_name = stop_name_entry.get().strip()
                 eta = eta_entry.get().strip()
                 if stop_name and eta:
-                    stop_data.append(f"{stop_name} (ETA: {eta})")
+                    stop_data.append((stop_name, normalize_time(eta)))
+            if not normalize_time(data["Time (HH:MM)"]) or any(eta is None for _, eta in stop_data):
+                messagebox.showerror("Error", "Times must be in HH:MM format.")
+                return
+            data["Time (HH:MM)"] = normalize_time(data["Time (HH:MM)"])
 
-            stops_string = "; ".join(stop_data) if stop_data else None
+            def save(db):
+                with db.transaction():
+                    db.query("""
+                        UPDATE carpools
+                        SET start_point = ?, destination = ?, seats = ?, price = ?, date = ?, time = ?
+                        WHERE carpool_id = ?
+                    """, (data["Starting Point"], data["Destination"], data["Seats Available"], data["Price per Seat"], data["Date (YYYY-MM-DD)"], data["Time (HH:MM)"], carpool.carpool_id))
+                    save_carpool_stops(db, carpool.carpool_id, stop_data)
 
-            db = DatabaseConnection()
-            db.query("""
-                UPDATE carpools
-                SET start_point = ?, destination = ?, seats = ?, price = ?, stops = ?, date = ?, time = ?
-                WHERE carpool_id = ?
-            """, (data["Starting Point"], data["Destination"], data["Seats Available"], data["Price per Seat"], stops_string, data["Date (YYYY-MM-DD)"], data["Time (HH:MM)"], carpool[0]))
-            
-            # Notify participants about the update
-            participants = db.fetch("SELECT student_id FROM carpool_requests WHERE carpool_id = ? AND status = 'accepted'", (carpool[0],))
-            for participant in participants:
-                notification_manager.notify(participant[0], f"Carpool from {carpool[1]} to {carpool[2]} has been updated.")
-            
-            messagebox.showinfo("Success", "Carpool updated successfully.")
-            self.manage_carpools()
+                    # Notify participants about the update
+                    CarpoolObserver(db).notify_participants(carpool.carpool_id, f"Carpool from {carpool.start_point} to {carpool.destination} has been updated.")
+
+            def saved(_):
+                messagebox.showinfo("Success", "Carpool updated successfully.")
+                self.manage_carpools()
 
-        tk.Button(self.root, text="Save Changes", command=save_changes).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.manage_carpools).pack()
+            self.run_async(save, saved)
+
+        save_button = tk.Button(self.view, text="Save Changes", command=save_changes, state=tk.DISABLED)
+        save_button.pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.manage_carpools).pack()
 
 
     def remove_carpool(self, carpool_id):
-        db = DatabaseConnection()
-        observer = CarpoolObserver(db)
+        def remove(db):
+            observer = CarpoolObserver(db)
+
+            with db.transaction():
+                # Notify participants
+                observer.notify_participants(carpool_id, "The carpool you joined has been canceled by the poster.")
 
-        # Notify participants
-        observer.notify_participants(carpool_id, "The carpool you joined has been canceled by the poster.")
+                # Delete the carpool
+                db.query("DELETE FROM carpools WHERE carpool_id = ?", (carpool_id,))
+                db.query(queries.DELETE_CARPOOL_REQUESTS, (carpool_id,))
+                db.query(queries.DELETE_CARPOOL_STOPS, (carpool_id,))
+
+        def removed(_):
+            messagebox.showinfo("Success", "Carpool removed and participants notified.")
+            self.manage_carpools()
 
-        # Delete the carpool
-        db.query("DELETE FROM carpools WHERE carpool_id = ?", (carpool_id,))
-        db.query("DELETE FROM carpool_requests WHERE carpool_id = ?", (carpool_id,))
-        messagebox.showinfo("Success", "Carpool removed and participants notified.")
-        self.manage_carpools()
+        self.run_async(remove, removed)
 
 
+    @cached_screen("carpool_requests", "carpools")
     def view_carpool_requests(self):
         """View and manage requests for student's carpools."""
-        self.clear_screen()
-        tk.Label(self.root, text="Carpool Requests", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        requests = db.fetch("""
-            SELECT cr.request_id, cr.carpool_id, cr.student_id, cr.status, c.start_point, c.destination, u.username
-            FROM carpool_requests cr
-            JOIN carpools c ON cr.carpool_id = c.carpool_id
-            JOIN users u ON cr.student_id = u.user_id
-            WHERE c.student_id = ?
-        """, (student_id,))
-
-        if requests:
-            for req in requests:
-                tk.Label(self.root, text=f"Request from {req[6]}").pack()
-                tk.Label(self.root, text=f"Carpool: {req[4]} to {req[5]}").pack()
-                tk.Label(self.root, text=f"Status: {req[3]}").pack()
-                if req[3] == "pending":
-                    tk.Button(self.root, text="Accept", command=lambda r=req: self.accept_carpool_request(r)).pack()
-                    tk.Button(self.root, text="Reject", command=lambda r=req: self.reject_carpool_request(r)).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No carpool requests found.").pack()
+        tk.Label(self.view, text="Carpool Requests", font=("Arial", 16)).pack(pady=10)
+
+        student_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            return queries.CARPOOL_REQUESTS.fetch_page(db, (student_id,), after, page_size)
 
-        tk.Button(self.root, text="Back", command=self.carpooling_menu).pack()
+        requests = VirtualList(self.view, self, [
+            ("Request from", 120, lambda r: r.username),
+            ("Carpool", 260, lambda r: f"{r.start_point} to {r.destination}"),
+            ("Status", 80, lambda r: r.status),
+        ], fetch_page, empty_text="No carpool requests found.")
+        requests.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        def respond(action):
+            def run(request):
+                if request.status != "pending":
+                    messagebox.showerror("Error", f"This request has already been {request.status}.")
+                    return
+                action(request)
+            return requests.command(run, "Select a request first.")
+
+        tk.Button(self.view, text="Accept", command=respond(self.accept_carpool_request)).pack()
+        tk.Button(self.view, text="Reject", command=respond(self.reject_carpool_request)).pack()
+        tk.Button(self.view, text="Back", command=self.carpooling_menu).pack()
 
     def accept_carpool_request(self, request):
         """Accept a carpool request."""
-        db = DatabaseConnection()
-        db.query("UPDATE carpool_requests SET status = 'accepted' WHERE request_id = ?", (request[0],))
-        db.query("UPDATE carpools SET seats = seats - 1 WHERE carpool_id = ? AND seats > 0", (request[1],))
-        notification_manager.notify(request[2], "Your carpool request has been accepted.")
-        self.view_carpool_requests()
+        def accept(db):
+            with db.transaction():
+                db.query("UPDATE carpool_requests SET status = 'accepted' WHERE request_id = ?", (request.request_id,))
+                db.query("UPDATE carpools SET seats = seats - 1 WHERE carpool_id = ? AND seats > 0", (request.carpool_id,))
+                notification_manager.notify(request.student_id, "Your carpool request has been accepted.")
+
+        self.run_async(accept, lambda _: self.view_carpool_requests())
 
     def reject_carpool_request(self, request):
         """Reject a carpool request."""
-        db = DatabaseConnection()
-        db.query("UPDATE carpool_requests SET status = 'rejected' WHERE request_id = ?", (request[0],))
-        notification_manager.notify(request[2], "Your carpool request has been rejected.")
-        self.view_carpool_requests()
-
-    def view_upcoming_carpools(self):
-        """View upcoming carpools for the student."""
-        self.clear_screen()
-        tk.Label(self.root, text="Upcoming Carpools", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-
-        # Fetch carpools where the student is a driver or a passenger
-        upcoming_carpools = db.fetch("""
-            SELECT c.carpool_id, c.start_point, c.destination, c.seats, c.price, c.date, c.time, c.stops, u.username, c.student_id
-            FROM carpools c
-            LEFT JOIN carpool_requests cr ON c.carpool_id = cr.carpool_id
-            LEFT JOIN users u ON c.student_id = u.user_id
-            WHERE (c.student_id = ? OR cr.student_id = ?) AND (cr.status = 'accepted' OR c.student_id = ?)
-        """, (student_id, student_id, student_id))
-
-        if upcoming_carpools:
-            for carpool in upcoming_carpools:
-                driver_name = f"{carpool[8]} (You)" if carpool[9] == student_id else carpool[8]
-                tk.Label(self.root, text=f"Carpool ID: {carpool[0]}").pack()
-                tk.Label(self.root, text=f"Driver: {driver_name}").pack()
-                tk.Label(self.root, text=f"From: {carpool[1]}").pack()
-                tk.Label(self.root, text=f"To: {carpool[2]}").pack()
-                tk.Label(self.root, text=f"Date: {carpool[5]}").pack()
-                tk.Label(self.root, text=f"Time: {carpool[6]}").pack()
-                tk.Label(self.root, text=f"Seats Available: {carpool[3]}").pack()
-                tk.Label(self.root, text=f"Price: ${carpool[4]}").pack()
-                tk.Label(self.root, text=f"Stops: {carpool[7] if carpool[7] else 'None'}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No upcoming carpools found.").pack()
+        def reject(db):
+            with db.transaction():
+                db.query("UPDATE carpool_requests SET status = 'rejected' WHERE request_id = ?", (request.request_id,))
+                notification_manager.notify(request.student_id, "Your carpool request has been rejected.")
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
-
-
-    def clear_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.run_async(reject, lambda _: self.view_carpool_requests())
 
+    @cached_screen()
     def search_properties(self):
-        self.clear_screen()
-        tk.Label(self.root, text="Search Properties", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Search Properties", font=("Arial", 16)).pack(pady=10)
 
-        tk.Label(self.root, text="State (Mandatory):").pack()
-        state_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Keywords (address, area, description...):").pack()
+        keywords_entry = tk.Entry(self.view)
+        keywords_entry.pack()
+
+        tk.Label(self.view, text="State (Mandatory without keywords):").pack()
+        state_entry = tk.Entry(self.view)
         state_entry.pack()
 
-        tk.Label(self.root, text="City (Optional):").pack()
-        city_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="City (Optional):").pack()
+        city_entry = tk.Entry(self.view)
         city_entry.pack()
 
-        tk.Label(self.root, text="Bedrooms (Optional):").pack()
-        bedrooms_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Bedrooms (Optional):").pack()
+        bedrooms_entry = tk.Entry(self.view)
         bedrooms_entry.pack()
 
         def submit_search():
+            keywords = match_expression(keywords_entry.get())
             state = state_entry.get().strip()
             city = city_entry.get().strip()
             bedrooms = bedrooms_entry.get().strip()
 
-            if not state:
-                messagebox.showerror("Error", "State is mandatory.")
+            if not state and not keywords:
+                messagebox.showerror("Error", "Enter keywords or a state to search.")
                 return
 
-            db = DatabaseConnection()
-            student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
+            student_id = self.session.user_id
 
-            # SQL query to include all required columns
-            properties = db.fetch("""
-                SELECT p.property_id, p.address, p.city, p.state, p.zipcode, 
-                    p.bedrooms - (
-                        SELECT COUNT(*) 
-                        FROM leases 
-                        WHERE leases.property_id = p.property_id
-                    ) AS rooms_available, 
-                    p.bedrooms, p.kitchens, p.bathrooms
-                FROM properties p
-                WHERE p.state = ? AND p.visible = 1 
-                AND p.property_id NOT IN (
-                    SELECT property_id FROM leases WHERE tenant_id = ?
-                )
-                AND (p.city LIKE ? OR ? = '') 
-                AND (p.bedrooms = ? OR ? = '')
-            """, (state, student_id, f"%{city}%", city, bedrooms, bedrooms))
+            def ranked_page(db, after, page_size):
+                # Free-text search over the full-text index, best bm25 match first; the structured
+                # filters still apply when they are filled in
+                return queries.RANKED_PROPERTIES.fetch_page(
+                    db, (keywords, state, state, student_id, f"%{city}%", city, bedrooms, bedrooms), after, page_size)
 
+            def fetch_page(db, after, page_size):
+                # SQL query to include all required columns
+                return queries.SEARCH_PROPERTIES.fetch_page(
+                    db, (state, student_id, f"%{city}%", city, bedrooms, bedrooms), after, page_size)
 
-            self.display_search_results(properties)
+            self.display_search_results(ranked_page if keywords else fetch_page)
 
-        tk.Button(self.root, text="Search", command=submit_search).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        tk.Button(self.view, text="Search", command=submit_search).pack(pady=10)
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 
 
-    def display_search_results(self, results):
+    def display_search_results(self, fetch_page):
         self.clear_screen()
-        tk.Label(self.root, text="Search Results", font=("Arial", 16)).pack(pady=10)
-
-        if results:
-            for idx, property in enumerate(results, start=1):
-                tk.Label(self.root, text=f"{idx}. Address: {property[1]}").pack()
-                tk.Label(self.root, text=f"   City: {property[2]}, State: {property[3]}, Zipcode: {property[4]}").pack()
-                tk.Label(self.root, text=f"   Rooms Available: {property[5]}").pack()
-                tk.Label(self.root, text=f"   Bedrooms: {property[6]}, Kitchens: {property[7]}, Bathrooms: {property[8]}").pack()
-
-                # Add Bookmark and Schedule Visit Buttons
-                tk.Button(self.root, text="Bookmark", command=lambda p=property: self.bookmark_property(p[0])).pack()
-                tk.Button(self.root, text="Schedule Visit", command=lambda p=property: self.schedule_visit(p)).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No properties found.").pack()
+        tk.Label(self.view, text="Search Results", font=("Arial", 16)).pack(pady=10)
 
-        tk.Button(self.root, text="Back", command=self.search_properties).pack()
+        results = VirtualList(self.view, self, [
+            ("Address", 180, lambda p: p.address),
+            ("City", 100, lambda p: p.city),
+            ("State", 50, lambda p: p.state),
+            ("Zipcode", 70, lambda p: p.zipcode),
+            ("Rooms Available", 100, lambda p: p.rooms_available),
+            ("Bed / Kitchen / Bath", 120, lambda p: f"{p.bedrooms} / {p.kitchens} / {p.bathrooms}"),
+        ], fetch_page, empty_text="No properties found.", tag=(self.session.user_id, "property search"))
+        results.pack(fill=tk.BOTH, expand=True, padx=10)
 
+        # Bookmark and Schedule Visit act on the selected property
+        tk.Button(self.view, text="Bookmark", command=results.command(lambda p: self.bookmark_property(p.property_id), "Select a property first.")).pack()
+        tk.Button(self.view, text="Schedule Visit", command=results.command(self.schedule_visit, "Select a property first.")).pack()
+        tk.Button(self.view, text="Back", command=self.search_properties).pack()
 
 
 
-    def bookmark_property(self, property_id):
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        existing = db.fetch("SELECT * FROM bookmarks WHERE student_id = ? AND property_id = ?", (student_id, property_id))
 
-        if existing:
-            db.query("DELETE FROM bookmarks WHERE student_id = ? AND property_id = ?", (student_id, property_id))
-            messagebox.showinfo("Success", "Removed from bookmarks.")
-        else:
-            db.query("INSERT INTO bookmarks (student_id, property_id) VALUES (?, ?)", (student_id, property_id))
-            messagebox.showinfo("Success", "Property bookmarked.")
+    def bookmark_property(self, property_id, on_done=None):
+        """Toggle the bookmark on a property, then call on_done() once it is saved."""
+        student_id = self.session.user_id
+
+        def toggle(db):
+            with db.transaction():
+                if db.fetch(queries.BOOKMARK, (student_id, property_id)):
+                    db.query("DELETE FROM bookmarks WHERE student_id = ? AND property_id = ?", (student_id, property_id))
+                    return False
+                db.query("INSERT INTO bookmarks (student_id, property_id) VALUES (?, ?)", (student_id, property_id))
+                return True
+
+        def toggled(bookmarked):
+            messagebox.showinfo("Success", "Property bookmarked." if bookmarked else "Removed from bookmarks.")
+            if on_done:
+                on_done()
+
+        self.run_async(toggle, toggled)
 
     def schedule_visit(self, property):
         self.clear_screen()
-        tk.Label(self.root, text="Schedule Visit", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Schedule Visit", font=("Arial", 16)).pack(pady=10)
 
-        tk.Label(self.root, text=f"Property Address: {property[1]}").pack()
+        tk.Label(self.view, text=f"Property Address: {property.address}").pack()
 
         visit_type_var = tk.StringVar(value="virtual")
 
-        tk.Label(self.root, text="Visit Type:").pack()
-        tk.Radiobutton(self.root, text="Virtual", variable=visit_type_var, value="virtual").pack()
-        tk.Radiobutton(self.root, text="In-person", variable=visit_type_var, value="in_person").pack()
+        tk.Label(self.view, text="Visit Type:").pack()
+        tk.Radiobutton(self.view, text="Virtual", variable=visit_type_var, value="virtual").pack()
+        tk.Radiobutton(self.view, text="In-person", variable=visit_type_var, value="in_person").pack()
 
-        tk.Label(self.root, text="Date (YYYY-MM-DD):").pack()
-        date_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Date (YYYY-MM-DD):").pack()
+        date_entry = tk.Entry(self.view)
         date_entry.pack()
 
-        tk.Label(self.root, text="Time (HH:MM):").pack()
-        time_entry = tk.Entry(self.root)
+        tk.Label(self.view, text="Time (HH:MM):").pack()
+        time_entry = tk.Entry(self.view)
         time_entry.pack()
 
         def submit_request():
@@ -1914,118 +1906,126 @@ class StudentDashboard(Screen):
             date = date_entry.get().strip()
             time = time_entry.get().strip()
 
-            db = DatabaseConnection()
-            student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-            homeowner_id = db.fetch("SELECT homeowner_id FROM properties WHERE property_id = ?", (property[0],))[0][0]
+            student_id = self.session.user_id
+            username = self.username
+
+            def schedule(db):
+                homeowner_id = db.fetch("SELECT homeowner_id FROM properties WHERE property_id = ?", (property.property_id,))[0][0]
 
-            db.query("""
-                INSERT INTO property_visits (property_id, student_id, homeowner_id, visit_type, date, time)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (property[0], student_id, homeowner_id, visit_type, date, time))
-            notification_manager.notify(homeowner_id, f"New visit request for property: {property[1]} by {self.username}.")
-            messagebox.showinfo("Success", "Visit request submitted.")
-            self.display()
+                with db.transaction():
+                    db.query("""
+                        INSERT INTO property_visits (property_id, student_id, homeowner_id, visit_type, date, time)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (property.property_id, student_id, homeowner_id, visit_type, date, time))
+                    notification_manager.notify(homeowner_id, f"New visit request for property: {property.address} by {username}.")
 
-        tk.Button(self.root, text="Submit", command=submit_request).pack(pady=10)
-        tk.Button(self.root, text="Back", command=lambda: self.display_search_results([property])).pack()
+            def scheduled(_):
+                messagebox.showinfo("Success", "Visit request submitted.")
+                self.display()
 
+            self.run_async(schedule, scheduled)
+
+        tk.Button(self.view, text="Submit", command=submit_request).pack(pady=10)
+        tk.Button(self.view, text="Back", command=lambda: self.display_search_results(fixed_rows([property]))).pack()
+
+    @cached_screen("bookmarks", "properties")
     def view_bookmarked_properties(self):
-        self.clear_screen()
-        tk.Label(self.root, text="Bookmarked Properties", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        bookmarks = db.fetch("""
-            SELECT p.property_id, p.address, p.city, p.state, p.zipcode, p.bedrooms, p.kitchens, p.bathrooms, p.description
-            FROM bookmarks b
-            JOIN properties p ON b.property_id = p.property_id
-            WHERE b.student_id = ?
-        """, (student_id,))
-
-        if bookmarks:
-            for idx, bookmark in enumerate(bookmarks, start=1):
-                tk.Label(self.root, text=f"{idx}. Address: {bookmark[1]}").pack()
-                tk.Label(self.root, text=f"   City: {bookmark[2]}, State: {bookmark[3]}, Zipcode: {bookmark[4]}").pack()
-                tk.Label(self.root, text=f"   Bedrooms: {bookmark[5]}, Kitchens: {bookmark[6]}, Bathrooms: {bookmark[7]}").pack()
-                tk.Label(self.root, text=f"   Description: {bookmark[8]}").pack()
-
-                tk.Button(self.root, text="Unbookmark", command=lambda b=bookmark: self.bookmark_property(b[0])).pack()
-                tk.Button(self.root, text="Schedule Visit", command=lambda b=bookmark: self.schedule_visit(b)).pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No bookmarked properties.").pack()
+        tk.Label(self.view, text="Bookmarked Properties", font=("Arial", 16)).pack(pady=10)
+
+        student_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            return queries.BOOKMARKED_PROPERTIES.fetch_page(db, (student_id,), after, page_size)
+
+        bookmarks = VirtualList(self.view, self, [
+            ("Address", 160, lambda b: b.address),
+            ("City", 90, lambda b: b.city),
+            ("State", 50, lambda b: b.state),
+            ("Zipcode", 60, lambda b: b.zipcode),
+            ("Bed/Kit/Bath", 80, lambda b: f"{b.bedrooms}/{b.kitchens}/{b.bathrooms}"),
+            ("Description", 200, lambda b: b.description),
+        ], fetch_page, empty_text="No bookmarked properties.")
+        bookmarks.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        def unbookmark(bookmark):
+            self.bookmark_property(bookmark.property_id, on_done=bookmarks.refresh)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        tk.Button(self.view, text="Unbookmark", command=bookmarks.command(unbookmark, "Select a property first.")).pack()
+        tk.Button(self.view, text="Schedule Visit", command=bookmarks.command(self.schedule_visit, "Select a property first.")).pack()
+        tk.Button(self.view, text="Back", command=self.display).pack()
         
+    @cached_screen("carpool_requests", "carpools")
     def view_upcoming_carpools(self):
         """View upcoming carpools for the student."""
-        self.clear_screen()
-        tk.Label(self.root, text="Upcoming Carpools", font=("Arial", 16)).pack(pady=10)
-
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-
-        # Fetch carpools where the student is a driver or a passenger
-        upcoming_carpools = db.fetch("""
-            SELECT c.carpool_id, c.start_point, c.destination, c.seats, c.price, c.stops, u.username
-            FROM carpools c
-            LEFT JOIN carpool_requests cr ON c.carpool_id = cr.carpool_id
-            LEFT JOIN users u ON c.student_id = u.user_id
-            WHERE (c.student_id = ? OR cr.student_id = ?) AND cr.status = 'accepted'
-        """, (student_id, student_id))
-
-        if upcoming_carpools:
-            for carpool in upcoming_carpools:
-                tk.Label(self.root, text=f"Carpool ID: {carpool[0]}").pack()
-                tk.Label(self.root, text=f"Driver: {carpool[6]}").pack()
-                tk.Label(self.root, text=f"From: {carpool[1]}").pack()
-                tk.Label(self.root, text=f"To: {carpool[2]}").pack()
-                tk.Label(self.root, text=f"Seats Available: {carpool[3]}").pack()
-                tk.Label(self.root, text=f"Price: ${carpool[4]}").pack()
-                tk.Label(self.root, text=f"Stops: {carpool[5] if carpool[5] else 'None'}").pack()
-                tk.Label(self.root, text="").pack()
-        else:
-            tk.Label(self.root, text="No upcoming carpools found.").pack()
+        tk.Label(self.view, text="Upcoming Carpools", font=("Arial", 16)).pack(pady=10)
+
+        student_id = self.session.user_id
+
+        def fetch_page(db, after, page_size):
+            # Carpools the student rides in, or drives with at least one accepted passenger, once each
+            return queries.UPCOMING_CARPOOLS.fetch_page(db, (student_id, student_id), after, page_size)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        VirtualList(self.view, self, [
+            ("Driver", 100, lambda c: f"{c.username} (You)" if c.student_id == student_id else c.username),
+            ("From", 130, lambda c: c.start_point),
+            ("To", 130, lambda c: c.destination),
+            ("Date", 90, lambda c: c.date),
+            ("Time", 60, lambda c: c.time),
+            ("Seats Available", 100, lambda c: c.seats),
+            ("Price", 60, lambda c: f"${c.price}"),
+            ("Stops", 200, lambda c: c.stops if c.stops else "None"),
+        ], fetch_page, empty_text="No upcoming carpools found.").pack(fill=tk.BOTH, expand=True, padx=10)
 
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
+
+    @cached_screen("notifications")
     def view_notifications(self):
-        self.clear_screen()
-        tk.Label(self.root, text="Notifications", font=("Arial", 16)).pack(pady=10)
+        tk.Label(self.view, text="Notifications", font=("Arial", 16)).pack(pady=10)
 
-        db = DatabaseConnection()
-        student_id = db.fetch("SELECT user_id FROM users WHERE username = ?", (self.username,))[0][0]
-        notifications = db.fetch("SELECT message FROM notifications WHERE user_id = ?", (student_id,))
+        student_id = self.session.user_id
 
-        if notifications:
-            for notification in notifications:
-                tk.Label(self.root, text=notification[0]).pack()
-        else:
-            tk.Label(self.root, text="No notifications.").pack()
+        def fetch_page(db, after, page_size):
+            # Unread first, then newest first ('unread' sorts after 'read'), straight off idx_notifications_inbox
+            return queries.NOTIFICATIONS.fetch_page(db, (student_id,), after, page_size)
+
+        notifications = VirtualList(self.view, self, [
+            ("", 20, lambda n: "\u25cf" if n.status == "unread" else ""),
+            ("Message", 500, lambda n: f"{n.message} (x{n.count})" if n.count > 1 else n.message),     # A digest shows how many it merged
+        ], fetch_page, empty_text="No notifications.")
+        notifications.pack(fill=tk.BOTH, expand=True, padx=10)
 
-        tk.Button(self.root, text="Back", command=self.display).pack()
+        def mark_selected(notification):
+            self.run_async(lambda db: mark_read(db, student_id, [notification.notification_id]),
+                           lambda _: notifications.refresh(), owner=notifications)
+
+        def mark_everything():
+            self.run_async(lambda db: mark_all_read(db, student_id),
+                           lambda _: notifications.refresh(), owner=notifications)
+
+        tk.Button(self.view, text="Mark as Read",
+                  command=notifications.command(mark_selected, "Select a notification first.")).pack()
+        tk.Button(self.view, text="Mark All as Read", command=mark_everything).pack()
+        tk.Button(self.view, text="Back", command=self.display).pack()
 
 #CARPOOL CLASS        
+def save_carpool_stops(db, carpool_id, stops):
+    """Replace a carpool's stops with (place, eta) pairs, numbered in route order from 1."""
+    db.query(queries.DELETE_CARPOOL_STOPS, (carpool_id,))
+    db.query_many("""
+        INSERT INTO carpool_stops (carpool_id, seq, place, eta)
+        VALUES (?, ?, ?, ?)
+    """, [(carpool_id, seq, place, eta) for seq, (place, eta) in enumerate(stops, start=1)])
+
+
 class CarpoolObserver:
     def __init__(self, db):
         self.db = db
 
     def notify_participants(self, carpool_id, message):
         """Notify all participants of the carpool."""
-        participants = self.db.fetch("""
-            SELECT cr.student_id, u.username
-            FROM carpool_requests cr
-            JOIN users u ON cr.student_id = u.user_id
-            WHERE cr.carpool_id = ? AND cr.status = 'accepted'
-        """, (carpool_id,))
-
-        for participant in participants:
-            student_id = participant[0]
-            self.db.query("""
-                INSERT INTO notifications (user_id, message)
-                VALUES (?, ?)
-            """, (student_id, message))
+        participants = self.db.fetch(queries.CARPOOL_PARTICIPANTS, (carpool_id,))
+        notification_manager.notify_many([participant[0] for participant in participants], message, subject=f"carpool:{carpool_id}")
 
 #EVENTSS
 class EventFactory:
@@ -2077,25 +2077,31 @@ class EventObserver:
 
     def notify_participants(self, event_id, message):
         """Notify all participants of an event."""
-        participants = self.db.fetch("""
-            SELECT ep.student_id
-            FROM event_participants ep
-            WHERE ep.event_id = ? AND ep.status = 'accepted'
-        """, (event_id,))
-
-        for participant in participants:
-            student_id = participant[0]
-            self.db.query("""
-                INSERT INTO notifications (user_id, message)
-                VALUES (?, ?)
-            """, (student_id, message))
+        participants = self.db.fetch(queries.EVENT_PARTICIPANTS, (event_id,))
+        notification_manager.notify_many([participant[0] for participant in participants], message, subject=f"event:{event_id}")
 
 
 # Application Entry Point
 if __name__ == "__main__":
+    # Bring the schema up to date; this is a single PRAGMA read when nothing is pending
+    initializer = DatabaseInitializer()
+    initializer.migrate()
+    initializer.close()
+
+    # Set HOUSING_APP_QUERY_STATS to a file path to get per-statement timings as JSON on exit
+    if os.environ.get("HOUSING_APP_QUERY_STATS"):
+        DatabaseConnection().stats.dump_at_exit(os.environ["HOUSING_APP_QUERY_STATS"])
+
+    # Expire old notifications in the background, as configured by the HOUSING_APP_NOTIFICATION_* variables
+    compactor = NotificationCompactor.from_environment()
+    if compactor is not None:
+        compactor.start()
+
     root = tk.Tk()
     root.title("Housing Management App")
     root.geometry("500x600")
+    # Busy cursor while the database worker has queries in flight
+    DatabaseWorker.for_root(root).on_busy = lambda busy: root.config(cursor="watch" if busy else "")
     WelcomeScreen(root).display()
     root.mainloop()
 
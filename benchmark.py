@@ -0,0 +1,283 @@
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import platform
+
+from db_connection import DatabaseConnection
+from initialize_db import DatabaseInitializer
+from generate_data import DataGenerator, PROFILES, PASSWORD
+from loaders import tenants_by_property
+from observer import unread_count
+from search import match_expression, substring_expression
+import queries
+
+BENCHMARK_DIR = "benchmarks"     # Generated datasets (<profile>.db) and saved baselines (<profile>.json)
+SEED = 0     # Dataset and input seed, so two runs time the same queries against the same rows
+REGRESSION = 1.25     # --compare fails when an operation's p95 grows past this multiple of the baseline
+MIN_REGRESSION_MS = 0.1     # ... and by at least this much, so timer noise on sub-millisecond queries is ignored
+
+
+class Inputs:
+    """Random but repeatable arguments for the operations, drawn from the dataset being measured."""
+
+    def __init__(self, db, seed=SEED):
+        self.rng = random.Random(seed)
+        self.users = db.fetch("SELECT username, role FROM users ORDER BY user_id")
+        self.students = [row[0] for row in db.fetch("SELECT user_id FROM users WHERE role = 'student'")]
+        self.homeowners = [row[0] for row in db.fetch("SELECT DISTINCT homeowner_id FROM properties")]
+        self.tenants = [row[0] for row in db.fetch("SELECT tenant_id FROM leases WHERE status = 'active'")]
+        self.states = [row[0] for row in db.fetch("SELECT DISTINCT state FROM properties")]
+        self.words = ["Main", "Oak", "quiet", "furnished", "parking", "Maple Ave", "close to campus"]
+        # (pickup, drop-off) pairs on real routes: start to destination, or start to a stop
+        self.routes = db.fetch("""
+            SELECT c.start_point, COALESCE(s.place, c.destination)
+            FROM carpools c
+            LEFT JOIN carpool_stops s ON s.carpool_id = c.carpool_id AND s.seq = 1
+            WHERE c.carpool_id % 10 = 0
+        """)
+
+    def pick(self, values):
+        return self.rng.choice(values) if values else 0
+
+
+# Each operation runs the statements one screen issues, from queries.py like app.py does.
+# Paged screens fetch their first page with the VirtualList page size.
+PAGE_SIZE = 50
+
+
+def login(db, inputs):
+    username, _ = inputs.pick(inputs.users)
+    return db.fetch(queries.LOGIN, (username, PASSWORD))
+
+
+def search_properties(db, inputs):
+    state = inputs.pick(inputs.states)
+    bedrooms = inputs.rng.choice(("", "2", "3"))
+    return queries.SEARCH_PROPERTIES.fetch_page(
+        db, (state, inputs.pick(inputs.students), "%%", "", bedrooms, bedrooms), page_size=PAGE_SIZE)
+
+
+def search_properties_keywords(db, inputs):
+    return queries.RANKED_PROPERTIES.fetch_page(
+        db, (match_expression(inputs.pick(inputs.words)), "", "", inputs.pick(inputs.students), "%%", "", "", ""),
+        page_size=PAGE_SIZE)
+
+
+def view_properties(db, inputs):
+    page = queries.MY_PROPERTIES.fetch_page(db, (inputs.pick(inputs.homeowners),), page_size=PAGE_SIZE)
+    return page, tenants_by_property(db).load_many(property.property_id for property in page.rows)
+
+
+def manage_listings(db, inputs):
+    return queries.LISTINGS.fetch_page(db, (inputs.pick(inputs.homeowners),), page_size=PAGE_SIZE)
+
+
+def view_available_events(db, inputs):
+    student_id = inputs.pick(inputs.students)
+    return queries.AVAILABLE_EVENTS.fetch_page(db, (student_id, student_id), page_size=PAGE_SIZE)
+
+
+def view_upcoming_events(db, inputs):
+    student_id = inputs.pick(inputs.students)
+    return queries.UPCOMING_EVENTS.fetch_page(db, (student_id, student_id), page_size=PAGE_SIZE)
+
+
+def search_carpools(db, inputs):
+    start, destination = inputs.pick(inputs.routes)
+    return queries.SEARCH_CARPOOLS.fetch_page(
+        db, (substring_expression(("start_point",), start), substring_expression(("place",), start),
+             substring_expression(("destination",), destination), substring_expression(("place",), destination),
+             "", "", "", ""), page_size=PAGE_SIZE)
+
+
+def view_upcoming_carpools(db, inputs):
+    student_id = inputs.pick(inputs.students)
+    return queries.UPCOMING_CARPOOLS.fetch_page(db, (student_id, student_id), page_size=PAGE_SIZE)
+
+
+def view_notifications(db, inputs):
+    # Notifications are skewed towards low user ids, so draw from the busiest tenth of users too
+    user_id = inputs.rng.randint(1, max(1, len(inputs.users) // 10))
+    return queries.NOTIFICATIONS.fetch_page(db, (user_id,), page_size=PAGE_SIZE)
+
+
+def unread_badge(db, inputs):
+    return unread_count(db, inputs.rng.randint(1, max(1, len(inputs.users) // 10)))
+
+
+def view_visit_requests(db, inputs):
+    return queries.VISIT_REQUESTS.fetch_page(db, (inputs.pick(inputs.homeowners),), page_size=PAGE_SIZE)
+
+
+def homeowner_upcoming_visits(db, inputs):
+    return queries.HOMEOWNER_UPCOMING_VISITS.fetch_page(db, (inputs.pick(inputs.homeowners),), page_size=PAGE_SIZE)
+
+
+def student_upcoming_visits(db, inputs):
+    return queries.STUDENT_UPCOMING_VISITS.fetch_page(db, (inputs.pick(inputs.students),), page_size=PAGE_SIZE)
+
+
+def view_my_lease(db, inputs):
+    return queries.MY_LEASE.fetch_page(db, (inputs.pick(inputs.tenants),), page_size=PAGE_SIZE)
+
+
+def view_roommates(db, inputs):
+    student_id = inputs.pick(inputs.tenants)
+    property_id = db.fetch(queries.LEASE_PROPERTY, (student_id,))
+    if not property_id:
+        return []
+    return queries.ROOMMATES.fetch_page(db, (property_id[0][0], student_id), page_size=PAGE_SIZE)
+
+
+def view_maintenance_requests(db, inputs):
+    return queries.MY_MAINTENANCE_REQUESTS.fetch_page(db, (inputs.pick(inputs.tenants),), page_size=PAGE_SIZE)
+
+
+OPERATIONS = [
+    ("LoginScreen.login", login),
+    ("StudentDashboard.search_properties", search_properties),
+    ("StudentDashboard.search_properties (keywords)", search_properties_keywords),
+    ("HomeownerDashboard.view_properties", view_properties),
+    ("HomeownerDashboard.manage_listings", manage_listings),
+    ("StudentDashboard.view_available_events", view_available_events),
+    ("StudentDashboard.view_upcoming_events", view_upcoming_events),
+    ("StudentDashboard.search_carpools", search_carpools),
+    ("StudentDashboard.view_upcoming_carpools", view_upcoming_carpools),
+    ("StudentDashboard.view_notifications", view_notifications),
+    ("StudentDashboard.display (unread badge)", unread_badge),
+    ("HomeownerDashboard.view_visit_requests", view_visit_requests),
+    ("HomeownerDashboard.view_upcoming_visits", homeowner_upcoming_visits),
+    ("StudentDashboard.view_upcoming_visits", student_upcoming_visits),
+    ("StudentDashboard.view_my_lease", view_my_lease),
+    ("StudentDashboard.view_roommates", view_roommates),
+    ("StudentDashboard.view_maintenance_requests", view_maintenance_requests),
+]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def dataset(profile, regenerate=False):
+    """Path of the generated database for a profile, generating it on first use."""
+    path = os.path.join(BENCHMARK_DIR, f"{profile}.db")
+    if regenerate and os.path.exists(path):
+        os.remove(path)
+    if not os.path.exists(path):
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        print(f"Generating the {profile} dataset in {path}...")
+        DataGenerator(path, PROFILES[profile], seed=SEED).generate()
+    else:
+        initializer = DatabaseInitializer(path)
+        initializer.migrate()     # A dataset generated before a schema change is brought up to date
+        initializer.close()
+    return path
+
+
+def run(path, iterations, warmup, names=None):
+    """Time every operation against one database; return {name: summary}."""
+    db = DatabaseConnection(path)
+    db.stats.slow_threshold_ms = None     # Timing is reported here, not in the slow-query log
+    try:
+        inputs = Inputs(db)
+        results = {}
+        for name, operation in OPERATIONS:
+            if names and not any(part in name for part in names):
+                continue
+            for _ in range(warmup):     # Warm the page cache and the statement cache
+                operation(db, inputs)
+            timings = []
+            statements = db.statement_count
+            for _ in range(iterations):
+                started = time.perf_counter()
+                operation(db, inputs)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {
+                "p50_ms": round(percentile(timings, 0.50), 4),
+                "p95_ms": round(percentile(timings, 0.95), 4),
+                "p99_ms": round(percentile(timings, 0.99), 4),
+                "max_ms": round(timings[-1], 4),
+                "queries": round((db.statement_count - statements) / iterations, 2),
+            }
+        return results
+    finally:
+        db.close()
+
+
+def compare(results, baseline):
+    """Print each operation against its baseline and return the names that regressed."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline["operations"].get(name)
+        if before is None:
+            print(f"  new        {name}")
+            continue
+        ratio = result["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 1.0
+        queries = f", queries {before['queries']} -> {result['queries']}" if result["queries"] != before["queries"] else ""
+        slower = ratio > REGRESSION and result["p95_ms"] - before["p95_ms"] > MIN_REGRESSION_MS
+        worse = slower or result["queries"] > before["queries"]
+        if worse:
+            regressions.append(name)
+        print(f"  {'REGRESSED' if worse else 'ok':10} {name}: p95 {before['p95_ms']:.3f} -> {result['p95_ms']:.3f} ms "
+              f"({ratio:.2f}x){queries}")
+    return regressions
+
+
+def report(profile, results):
+    print(f"\n{profile}")
+    print(f"  {'operation':48} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+    for name, result in results.items():
+        print(f"  {name:48} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} {result['p99_ms']:9.3f} {result['queries']:8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the app's queries headlessly against generated datasets.")
+    parser.add_argument("--profile", nargs="+", choices=PROFILES, default=["small", "medium"],
+                        help="Dataset sizes to run against (see generate_data.py).")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed runs of each operation.")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed runs of each operation first.")
+    parser.add_argument("--only", nargs="+", metavar="TEXT", help="Run only operations whose name contains TEXT.")
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild the datasets even if they exist.")
+    parser.add_argument("--save", action="store_true", help=f"Write the results to {BENCHMARK_DIR}/<profile>.json.")
+    parser.add_argument("--compare", action="store_true",
+                        help=f"Compare with {BENCHMARK_DIR}/<profile>.json and exit non-zero on a regression.")
+    args = parser.parse_args()
+
+    regressed = []
+    for profile in args.profile:
+        results = run(dataset(profile, args.regenerate), args.iterations, args.warmup, args.only)
+        report(profile, results)
+        baseline_path = os.path.join(BENCHMARK_DIR, f"{profile}.json")
+
+        if args.compare:
+            if os.path.exists(baseline_path):
+                with open(baseline_path) as baseline_file:
+                    print(f"\n{profile} against {baseline_path}")
+                    regressed += [f"{profile}: {name}" for name in compare(results, json.load(baseline_file))]
+            else:
+                print(f"\nNo baseline at {baseline_path}; run with --save first.")
+
+        if args.save:
+            with open(baseline_path, "w") as baseline_file:
+                json.dump({
+                    "profile": profile,
+                    "sizes": PROFILES[profile],
+                    "seed": SEED,
+                    "iterations": args.iterations,
+                    "python": platform.python_version(),
+                    "sqlite": sqlite3.sqlite_version,
+                    "operations": results,
+                }, baseline_file, indent=2)
+                baseline_file.write("\n")
+            print(f"Saved {baseline_path}")
+
+    if regressed:
+        print(f"\n{len(regressed)} operation(s) regressed: {', '.join(regressed)}")
+        sys.exit(1)
@@ -0,0 +1,136 @@
+import sys
+
+import queries
+import observer
+import retention
+import notification_feed
+from loaders import TENANTS_BY_PROPERTY
+from initialize_db import DatabaseInitializer
+
+
+def in_list(sql, count=3):
+    """A statement with an IN ({keys}) list, as it runs for `count` keys."""
+    return sql.format(keys=", ".join("?" * count))
+
+
+# The keyed lookups issued by the app, by the screen method that runs them. Each one must be
+# answered from an index. Paged statements are checked as they run for every page after the first.
+HOT_QUERIES = [
+    ("LoginScreen.login", queries.LOGIN),
+    ("ChatBotScreen.fetch_roommates", queries.CHAT_ROOMMATES),
+    ("ChatBotScreen.fetch_events", queries.CHAT_EVENTS),
+    ("HomeownerDashboard.add_tenant_to_lease (rooms)", queries.ROOMS_AVAILABLE),
+    ("HomeownerDashboard.add_tenant_to_lease (students)", queries.VISITED_STUDENTS),
+    ("HomeownerDashboard.select_property_for_lease", queries.LEASE_PROPERTIES),
+    ("HomeownerDashboard.view_upcoming_visits", queries.HOMEOWNER_UPCOMING_VISITS.page_sql()),
+    ("HomeownerDashboard.manage_listings", queries.LISTINGS.page_sql()),
+    ("HomeownerDashboard.view_visit_requests", queries.VISIT_REQUESTS.page_sql()),
+    ("HomeownerDashboard.view_properties", queries.MY_PROPERTIES.page_sql()),
+    ("loaders.tenants_by_property", in_list(TENANTS_BY_PROPERTY)),
+    ("HomeownerDashboard.manage_maintenance_requests", queries.MAINTENANCE_REQUESTS.page_sql()),
+    ("StudentDashboard.view_roommates", queries.LEASE_PROPERTY),
+    ("StudentDashboard.view_roommates (roommates)", queries.ROOMMATES.page_sql()),
+    ("StudentDashboard.view_my_lease", queries.MY_LEASE.page_sql()),
+    ("StudentDashboard.view_maintenance_requests", queries.MY_MAINTENANCE_REQUESTS.page_sql()),
+    ("StudentDashboard.view_upcoming_visits", queries.STUDENT_UPCOMING_VISITS.page_sql()),
+    ("StudentDashboard.view_available_events", queries.AVAILABLE_EVENTS.page_sql()),
+    ("StudentDashboard.manage_event_requests", queries.EVENT_REQUESTS.page_sql()),
+    ("StudentDashboard.manage_events", queries.MY_EVENTS.page_sql()),
+    ("StudentDashboard.view_upcoming_events", queries.UPCOMING_EVENTS.page_sql()),
+    ("StudentDashboard.manage_carpools", queries.MY_CARPOOLS.page_sql()),
+    ("StudentDashboard.view_carpool_requests", queries.CARPOOL_REQUESTS.page_sql()),
+    ("StudentDashboard.view_upcoming_carpools", queries.UPCOMING_CARPOOLS.page_sql()),
+    ("StudentDashboard.search_properties", queries.SEARCH_PROPERTIES.page_sql()),
+    ("StudentDashboard.search_properties (keywords)", queries.RANKED_PROPERTIES.page_sql()),
+    ("StudentDashboard.search_carpools", queries.SEARCH_CARPOOLS.page_sql()),
+    ("StudentDashboard.search_carpools (fuzzy)", queries.FUZZY_CARPOOLS),
+    ("StudentDashboard.bookmark_property", queries.BOOKMARK),
+    ("StudentDashboard.view_bookmarked_properties", queries.BOOKMARKED_PROPERTIES.page_sql()),
+    ("StudentDashboard.view_notifications", queries.NOTIFICATIONS.page_sql()),
+    ("StudentDashboard.view_notifications (first page)", queries.NOTIFICATIONS.page_sql(first=True)),
+    ("StudentDashboard.display (unread badge)", observer.UNREAD_COUNT),
+    ("observer.mark_read", in_list(observer.MARK_READ, 2)),
+    ("NotificationBus._write_digests", observer.OPEN_DIGESTS.format(keys="(?, ?), (?, ?)")),
+    ("NotificationBus._write_digests (update)", observer.UPDATE_DIGEST),
+    ("observer.mark_all_read", observer.MARK_ALL_READ),
+    ("CarpoolObserver.notify_participants", queries.CARPOOL_PARTICIPANTS),
+    ("EventObserver.notify_participants", queries.EVENT_PARTICIPANTS),
+    ("StudentDashboard.edit_carpool", queries.CARPOOL_STOPS),
+    ("remove_carpool", queries.DELETE_CARPOOL_REQUESTS),
+    ("remove_carpool (stops)", queries.DELETE_CARPOOL_STOPS),
+    ("NotificationCompactor._expire", retention.EXPIRED),
+    ("NotificationCompactor._trim (users)", retention.USERS_AFTER),
+    ("NotificationCompactor._trim", retention.OVER_LIMIT),
+    ("NotificationFeed._changes", notification_feed.CHANGES),
+    ("NotificationCompactor._remove", in_list(retention.REMOVE)),
+]
+
+# Queries that still read a whole table, with the reason. These are reported but do not fail the check.
+KNOWN_SCANS = {
+    "ChatBotScreen.fetch_properties": (queries.CHAT_PROPERTIES, "lists every visible property"),
+    "ChatBotScreen.fetch_carpools": (queries.CHAT_CARPOOLS, "lists every carpool with seats left"),
+    "StudentDashboard.search_carpools (short names)": (queries.LIKE_CARPOOLS.page_sql(),
+                                                       "names under three characters are too short for the trigram index"),
+}
+
+
+def explain(connection, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement, binding NULL for every parameter."""
+    parameters = [None] * sql.count("?")
+    return [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + sql, parameters)]
+
+
+def table_scans(plan):
+    """Plan lines that read a whole table or index rather than searching it.
+
+    A virtual table line such as "SCAN properties_fts VIRTUAL TABLE INDEX 0:M5" is a lookup in
+    the virtual table's own index when constraints (after the colon) were passed to it. Scans of
+    a CTE or subquery result (MATERIALIZE pickup, CO-ROUTINE (subquery-1)) only read rows its own
+    plan lines already fetched, and those lines are checked in their own right.
+    """
+    intermediate = {line.split(" ", 1)[1] for line in plan if line.startswith(("MATERIALIZE ", "CO-ROUTINE "))}
+    scans = []
+    for line in plan:
+        if not line.startswith("SCAN ") or line.endswith(("CONSTANT ROW", "CONSTANT ROWS")):     # VALUES lists
+            continue
+        if " VIRTUAL TABLE INDEX " in line and line.rsplit(":", 1)[-1]:
+            continue
+        if line[len("SCAN "):] in intermediate:
+            continue
+        scans.append(line)
+    return scans
+
+
+def check(connection, verbose=False):
+    """Return (name, scan lines) for every hot query that still scans a table."""
+    failures = []
+    for name, sql in HOT_QUERIES:
+        plan = explain(connection, sql)
+        scans = table_scans(plan)
+        if scans:
+            failures.append((name, scans))
+        if verbose:
+            print(f"{'SCAN' if scans else 'ok  '}  {name}")
+            for line in plan:
+                print(f"        {line}")
+    return failures
+
+
+if __name__ == "__main__":
+    # Plans are taken against a freshly migrated in-memory schema, so the result does not
+    # depend on what happens to be in housing_app.db.
+    initializer = DatabaseInitializer(":memory:")
+    initializer.migrate()
+
+    failures = check(initializer.connection, verbose="-v" in sys.argv)
+    for name, (sql, reason) in KNOWN_SCANS.items():
+        scans = table_scans(explain(initializer.connection, sql))
+        if scans:
+            print(f"known scan  {name}: {reason}")
+    initializer.close()
+
+    if failures:
+        for name, scans in failures:
+            print(f"FAIL  {name}: {'; '.join(scans)}")
+        sys.exit(1)
+    print(f"All {len(HOT_QUERIES)} hot queries are answered from an index.")
@@ -1,25 +1,286 @@
-import sqlite3
-
-class DatabaseConnection:
-    _instance = None     # Singleton instance
-
-    def __new__(cls, db_name="housing_app.db"):         # Create a new instance if one doesn't already exist
-        if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance.connection = sqlite3.connect(db_name)
-            cls._instance.cursor = cls._instance.connection.cursor()
-        return cls._instance
-
-    def query(self, sql, parameters=()):
-        self.cursor.execute(sql, parameters)
-        self.connection.commit()
-
-    def fetch(self, sql, parameters=()):      ## Execute a SQL query and fetch all results
-        self.cursor.execute(sql, parameters)
-        return self.cursor.fetchall()
-
-    def close(self):       # Close the database connection and reset the singleton instance
-        self.connection.close()
-        DatabaseConnection._instance = None
-
-
+import re
+import sqlite3
+import threading
+import queue
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from query_stats import QueryStats, calling_method
+
+
+class ConnectionPool:
+    """A fixed-size pool of SQLite connections opened in WAL mode."""
+
+    def __init__(self, db_name="housing_app.db", size=5, busy_timeout=5.0):
+        self.db_name = db_name
+        self.size = size
+        self.busy_timeout = busy_timeout
+        self._idle = queue.LifoQueue()
+        self._connections = []      # Every connection this pool has opened
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # check_same_thread is off because a connection may be handed to a different thread
+        # once it is returned to the pool; a connection is only ever used by one thread at a time.
+        connection = sqlite3.connect(self.db_name, timeout=self.busy_timeout, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")     # Readers never block the writer
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        return connection
+
+    def acquire(self, timeout=None):
+        """Take an idle connection, opening a new one while the pool is below its size."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._connections) < self.size:
+                connection = self._connect()
+                self._connections.append(connection)
+                return connection
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection became available within {timeout} seconds.")
+
+    def release(self, connection):
+        """Return a connection to the pool, discarding any uncommitted work."""
+        if connection.in_transaction:
+            connection.rollback()
+        self._idle.put(connection)
+
+    def close_all(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._idle = queue.LifoQueue()
+
+
+# Table written by an INSERT, UPDATE or DELETE statement
+_WRITTEN_TABLE = re.compile(r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)",
+                            re.IGNORECASE)
+
+# One page of a keyset-paginated query: the rows, whether more follow, and the key to pass as `after` for the next page
+Page = namedtuple("Page", "rows has_more after")
+
+
+class DatabaseConnection:
+    _instance = None     # Singleton instance
+    _instance_lock = threading.Lock()     # Background threads may ask for the instance at the same time
+    _record_types = {}     # Column names -> namedtuple type for rows fetched with records=True
+
+    def __new__(cls, db_name="housing_app.db", pool_size=5):         # Create a new instance if one doesn't already exist
+        with cls._instance_lock:
+            if cls._instance is None:
+                # Only publish the instance once it is fully set up, so no thread sees it half-built
+                instance = super(DatabaseConnection, cls).__new__(cls)
+                instance.db_name = db_name
+                instance.pool = ConnectionPool(db_name, size=pool_size)
+                instance._local = threading.local()     # Connection checked out by each thread
+                instance.statement_count = 0     # Statements issued through query/query_many/fetch
+                instance.stats = QueryStats()     # Latency per statement and the slow-query log
+                instance.write_listeners = []     # Called with the table name after every write
+                cls._instance = instance
+            return cls._instance
+
+    @property
+    def connection(self):
+        """The connection checked out by the calling thread, acquired on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self.pool.acquire()
+            self._local.connection = connection
+        return connection
+
+    def release(self):
+        """Return the calling thread's connection to the pool (call before a worker thread exits)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            self._local.connection = None
+            self.pool.release(connection)
+
+    @contextmanager
+    def transaction(self):
+        """Group every write in the block into a single commit, rolling all of it back on error.
+
+        Nested blocks join the outermost transaction; only the outermost one commits. The block takes
+        the write lock as it starts (BEGIN IMMEDIATE), waiting up to the busy timeout for it. A deferred
+        BEGIN would fail outright with "database is locked" when another connection commits between
+        a read and a write in the block, and busy_timeout cannot help with that.
+        """
+        connection = self.connection
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            if not connection.in_transaction:
+                connection.execute("BEGIN IMMEDIATE")
+            self._local.after_commit = []     # (callback, on_rollback)
+        self._local.depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            if depth == 0:
+                connection.rollback()
+                callbacks, self._local.after_commit = self._local.after_commit, []     # Nothing was committed, so nothing follows it
+                for _, on_rollback in callbacks:
+                    if on_rollback is not None:
+                        on_rollback()
+            raise
+        else:
+            if depth == 0:
+                connection.commit()
+        finally:
+            self._local.depth = depth
+
+        if depth == 0:
+            callbacks, self._local.after_commit = self._local.after_commit, []
+            for callback, _ in callbacks:
+                callback()
+
+    def after_commit(self, callback, on_rollback=None):
+        """Call callback() once the calling thread's transaction() block commits, or now if none is open.
+
+        The callback is dropped if the transaction rolls back, so side effects outside the database
+        (such as queueing a notification) only happen for work that was actually saved; on_rollback()
+        is called instead, to give back anything taken in advance for the callback.
+        """
+        if getattr(self._local, "depth", 0):
+            self._local.after_commit.append((callback, on_rollback))
+        else:
+            callback()
+
+    def _record(self, sql, parameters, started, rows):
+        """Time a finished statement and send it to the slow-query log if it crossed the threshold."""
+        elapsed = time.perf_counter() - started
+        self.statement_count += 1
+        caller = calling_method()
+        if self.stats.record(sql, elapsed, rows, caller):
+            plan = [row[3] for row in self.connection.execute("EXPLAIN QUERY PLAN " + sql, parameters)]
+            self.stats.log_slow(sql, elapsed, rows, caller, plan)
+
+    def query(self, sql, parameters=()):
+        connection = self.connection
+        started = time.perf_counter()
+        cursor = connection.execute(sql, parameters)
+        if not getattr(self._local, "depth", 0):     # Inside a transaction() block the commit is deferred
+            connection.commit()
+        self._record(sql, parameters, started, cursor.rowcount)
+        self._written(sql)
+
+    def query_many(self, sql, parameter_rows):
+        """Run one statement for every row of parameters with a single executemany and commit."""
+        parameter_rows = list(parameter_rows)
+        started = time.perf_counter()
+        with self.transaction():
+            cursor = self.connection.executemany(sql, parameter_rows)
+        self._record(sql, parameter_rows[0] if parameter_rows else (), started, cursor.rowcount)
+        self._written(sql)
+
+    def _written(self, sql):
+        """Tell the write listeners which table a statement changed."""
+        match = _WRITTEN_TABLE.match(sql)
+        if match:
+            for listener in self.write_listeners:
+                listener(match.group(1).lower())
+
+    def _row_type(self, cursor):
+        """The namedtuple for rows of a cursor, named after its columns; one type per column list."""
+        columns = tuple(column[0] for column in cursor.description)
+        row_type = self._record_types.get(columns)
+        if row_type is None:
+            row_type = self._record_types[columns] = namedtuple("Row", columns, rename=True)
+        return row_type
+
+    def fetch(self, sql, parameters=(), records=False):      ## Execute a SQL query and fetch all results
+        # Each call gets its own cursor, so a fetch nested inside a loop over another result is safe.
+        # With records=True rows are namedtuples, as for stream()
+        started = time.perf_counter()
+        cursor = self.connection.execute(sql, parameters)
+        rows = cursor.fetchall()
+        if records:
+            row_type = self._row_type(cursor)
+            rows = [row_type(*row) for row in rows]
+        self._record(sql, parameters, started, len(rows))
+        return rows
+
+    def stream(self, sql, parameters=(), batch_size=500, records=False, row_type=None):
+        """Yield the rows of a query a batch at a time instead of holding the whole result in memory.
+
+        Rows are read with fetchmany on a cursor of their own, so other statements can run while the
+        stream is open. With records=True each row is a namedtuple named after the selected columns
+        (row.rooms_available instead of row[5]); row_type builds each row as row_type(*values) instead,
+        e.g. a class with __slots__. The statement is timed once the stream is exhausted or closed.
+        """
+        started = time.perf_counter()
+        cursor = self.connection.execute(sql, parameters)
+        if records and row_type is None:
+            row_type = self._row_type(cursor)
+        count = 0
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                count += len(rows)
+                for row in rows:
+                    yield row if row_type is None else row_type(*row)
+        finally:
+            cursor.close()
+            self._record(sql, parameters, started, count)
+
+    @staticmethod
+    def page_sql(sql, order_by, descending=False, first=False, key=(0,)):
+        """The statement fetch_page runs: the keyset condition filled in, then ORDER BY and LIMIT appended.
+
+        After the first page a key of several columns is expanded into one arm per column, joined
+        with UNION ALL: for (a, b) > (x, y) the arms are a = x AND b > y, then a > x. Each arm is a
+        plain range on an index and SQLite merges them in order, where a row value or an OR of the
+        same terms only seeks on the first column. The compound is ordered by the columns' positions
+        in the row, `key`.
+        """
+        direction = " DESC" if descending else ""
+        if first:
+            arms = [sql.format(keyset="1")]
+        else:
+            arms = []
+            for position, column in enumerate(order_by):
+                terms = [f"{earlier} = ?" for earlier in order_by[:position]]
+                terms.append(f"{column} {'<' if descending else '>'} ?")
+                arms.append(sql.format(keyset=" AND ".join(terms)))
+        if len(arms) == 1:
+            order = ", ".join(column + direction for column in order_by)
+        else:
+            order = ", ".join(str(position + 1) + direction for position in key)
+        return " UNION ALL ".join(arms) + f" ORDER BY {order} LIMIT ?"
+
+    def fetch_page(self, sql, parameters=(), order_by=("rowid",), key=(0,), after=None, page_size=50, descending=False,
+                   records=False):
+        """Fetch one page of a query, continuing after the key of the previous page instead of an OFFSET.
+
+        `sql` is a SELECT without ORDER BY or LIMIT whose WHERE clause contains a `{keyset}` placeholder
+        after every other `?`. Rows are ordered by the `order_by` columns, which should end in a unique
+        column, and `key` gives the positions of those values in each row. A page is a seek to the
+        previous key and a read of page_size rows only when an index has the columns the WHERE clause
+        compares for equality followed by the order_by columns; otherwise every page sorts all the
+        matching rows first. With records=True the rows are namedtuples, as for stream().
+        """
+        sql = self.page_sql(sql, order_by, descending, first=after is None, key=key)
+        parameters = tuple(parameters)
+        if after is None:
+            bound = parameters
+        else:
+            bound = ()
+            for position in range(len(order_by)):     # Each arm binds the statement's parameters and its part of the key
+                bound += parameters + tuple(after[:position + 1])
+        rows = self.fetch(sql, bound + (page_size + 1,), records)     # One extra row detects a next page
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return Page(rows, has_more, tuple(rows[-1][i] for i in key) if rows else after)
+
+    def close(self):       # Close every pooled connection and reset the singleton instance
+        with DatabaseConnection._instance_lock:
+            self.pool.close_all()
+            DatabaseConnection._instance = None
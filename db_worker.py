@@ -0,0 +1,136 @@
+import sys
+import queue
+import threading
+
+from db_connection import DatabaseConnection
+
+
+class Job:
+    """A unit of database work submitted to the worker."""
+
+    def __init__(self, work, on_done, on_error, owner, tag, background=False):
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.owner = owner
+        self.tag = tag
+        self.background = background
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class DatabaseWorker:
+    """Runs database work on a background thread and delivers results on the Tk thread.
+
+    Tk must only be touched from the thread running mainloop, so the worker never calls back
+    into Tk itself: results are queued and picked up by a root.after poll on the Tk thread.
+    """
+
+    POLL_MS = 15
+
+    def __init__(self, root):
+        self.root = root
+        self.on_busy = None     # Loading indicator hook: called with True/False as work starts/finishes
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._latest = {}     # tag -> newest job; older jobs with the same tag are superseded
+        self._lock = threading.Lock()
+        self._running = None     # (job, connection) while the worker thread is inside job.work
+        self._outstanding = 0
+        self._busy = 0     # Outstanding jobs that show the loading indicator
+        self._polling = False
+        threading.Thread(target=self._run, name="database-worker", daemon=True).start()
+
+    @classmethod
+    def for_root(cls, root):
+        """The worker attached to a Tk root, created on first use."""
+        worker = getattr(root, "_database_worker", None)
+        if worker is None:
+            worker = root._database_worker = cls(root)
+        return worker
+
+    def submit(self, work, on_done, on_error=None, owner=None, tag=None, background=False):
+        """Run work(db) on the worker thread, then on_done(result) on the Tk thread.
+
+        A newer job with the same tag cancels an older one that has not been delivered yet, and
+        interrupts its statement if it is running, so tags are only for reads (pages, searches).
+        If `owner` is a widget that has been destroyed by the time the result arrives (the user
+        navigated away), the result is dropped. Background jobs (periodic checks the user did not
+        ask for) don't switch on the loading indicator.
+        """
+        job = Job(work, on_done, on_error, owner, tag, background)
+        if tag is not None:
+            previous = self._latest.get(tag)
+            if previous is not None:
+                previous.cancel()
+                self._interrupt(previous)
+            self._latest[tag] = job
+
+        self._outstanding += 1
+        if not background:
+            self._busy += 1
+            if self._busy == 1 and self.on_busy:
+                self.on_busy(True)
+        self._jobs.put(job)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._poll)
+        return job
+
+    def _interrupt(self, job):
+        """Abort the statement a superseded job is running, so the job after it doesn't wait for it."""
+        with self._lock:     # Held so the worker can't move on to the next job before the interrupt lands
+            if self._running is not None and self._running[0] is job:
+                self._running[1].interrupt()
+
+    def _run(self):
+        db = DatabaseConnection()
+        while True:
+            job = self._jobs.get()
+            if job.cancelled:
+                self._results.put((job, None, None))
+                continue
+            with self._lock:
+                self._running = (job, db.connection)
+            try:
+                outcome = (job, job.work(db), None)
+            except Exception as error:
+                outcome = (job, None, error)     # An interrupted job fails here, but it was cancelled so nobody sees it
+            with self._lock:
+                self._running = None
+            self._results.put(outcome)
+
+    def _poll(self):
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if not job.background:
+                self._busy -= 1
+            if self._latest.get(job.tag) is job:
+                del self._latest[job.tag]
+            try:
+                self._deliver(job, result, error)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())     # Keep polling after a failing callback
+
+        if self._busy == 0 and self.on_busy:
+            self.on_busy(False)
+        if self._outstanding:
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _deliver(self, job, result, error):
+        if job.cancelled or (job.owner is not None and not job.owner.winfo_exists()):
+            return
+        if error is None:
+            job.on_done(result)
+        elif job.on_error:
+            job.on_error(error)
+        else:
+            raise error
@@ -0,0 +1,463 @@
+import time
+import random
+import argparse
+import datetime
+from itertools import islice
+
+from initialize_db import DatabaseInitializer
+
+# Rows generated per table. The averages below (bookmarks per student, stops per carpool, ...)
+# follow from these, so scale them together.
+DEFAULT_SIZES = {
+    "users": 2000,
+    "properties": 500,
+    "leases": 800,
+    "property_visits": 2000,
+    "maintenance_requests": 400,
+    "bookmarks": 3000,
+    "carpools": 400,
+    "carpool_stops": 800,
+    "carpool_requests": 1200,
+    "community_events": 300,
+    "event_participants": 3000,
+    "event_responses": 600,
+    "notifications": 10000,
+}
+
+# Named dataset sizes, e.g. for benchmarking the same queries at several scales
+PROFILES = {
+    "small": DEFAULT_SIZES,
+    "medium": {table: count * 10 for table, count in DEFAULT_SIZES.items()},
+    "campus": {
+        "users": 200000,
+        "properties": 50000,
+        "leases": 80000,
+        "property_visits": 200000,
+        "maintenance_requests": 40000,
+        "bookmarks": 300000,
+        "carpools": 40000,
+        "carpool_stops": 80000,
+        "carpool_requests": 120000,
+        "community_events": 30000,
+        "event_participants": 300000,
+        "event_responses": 60000,
+        "notifications": 1000000,
+    },
+}
+
+HOMEOWNER_SHARE = 0.1     # Fraction of users who are homeowners; the rest are students
+PASSWORD = "password"     # Every generated user logs in with this
+
+STATES = {
+    "NY": ["New York", "Buffalo", "Rochester", "Syracuse", "Albany", "Ithaca"],
+    "CA": ["Los Angeles", "San Diego", "San Jose", "Berkeley", "Davis", "Irvine"],
+    "TX": ["Austin", "Houston", "Dallas", "San Antonio", "College Station"],
+    "MA": ["Boston", "Cambridge", "Worcester", "Amherst", "Lowell"],
+    "IL": ["Chicago", "Champaign", "Urbana", "Evanston", "Springfield"],
+    "MI": ["Ann Arbor", "Detroit", "East Lansing", "Grand Rapids"],
+    "PA": ["Philadelphia", "Pittsburgh", "State College", "Bethlehem"],
+    "WA": ["Seattle", "Spokane", "Tacoma", "Pullman"],
+}
+STREETS = ["Main", "Oak", "Maple", "Elm", "Cedar", "Pine", "Washington", "Lake", "Hill", "Park",
+           "College", "University", "Church", "Spring", "Highland", "Walnut", "Chestnut", "Sunset"]
+STREET_TYPES = ["St", "Ave", "Rd", "Blvd", "Ln", "Dr", "Ct", "Way"]
+FEATURES = ["bright", "quiet", "newly renovated", "furnished", "spacious", "cozy", "pet friendly",
+            "close to campus", "near the bus line", "with in-unit laundry", "with a backyard", "with parking"]
+LANDMARKS = ["Campus North", "Campus South", "Library", "Student Union", "Downtown Mall", "Train Station",
+             "Airport", "Stadium", "Medical Center", "Engineering Quad", "Riverside Park", "Grocery Outlet"]
+EVENT_TYPES = ["social", "academic", "sports", "potluck", "other"]
+EVENT_NAMES = ["Study Group", "Movie Night", "Pickup Soccer", "Potluck Dinner", "Board Game Night",
+               "Career Talk", "Hiking Trip", "Open Mic", "Yoga in the Park", "Hackathon"]
+ISSUES = ["Leaking faucet", "Broken heater", "Clogged drain", "Door lock stuck", "Wi-Fi not working",
+          "Mold in the bathroom", "Window won't close", "Fridge not cooling"]
+NOTIFICATIONS = [
+    "Your visit request for property {n} has been accepted.",
+    "Your visit request for property {n} has been rejected.",
+    "A new student requested to join your carpool {n}.",
+    "Your request to join carpool {n} was accepted.",
+    "Event {n} has been updated by the organizer.",
+    "Your request to join event {n} was accepted.",
+    "Maintenance request {n} has been resolved.",
+    "Your lease {n} has been updated.",
+]
+
+
+class DataGenerator:
+    """Fills every table created by DatabaseInitializer with seeded, referentially consistent rows.
+
+    The same seed, sizes and anchor date always produce the same database. Primary keys are
+    assigned explicitly from 1 so rows can refer to each other without reading anything back,
+    which is why the target database must not already have users. Dates are spread around the
+    anchor (today by default) so the app's "upcoming" screens have something to show.
+    """
+
+    BATCH_SIZE = 10000     # Rows handed to each executemany call
+
+    def __init__(self, db_name="housing_app.db", sizes=None, seed=0, anchor=None):
+        self.db_name = db_name
+        self.sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+        self.rng = random.Random(seed)
+        self.anchor = anchor or datetime.date.today()
+
+        homeowners = max(1, int(self.sizes["users"] * HOMEOWNER_SHARE))
+        self.homeowner_ids = range(1, homeowners + 1)
+        self.student_ids = range(homeowners + 1, max(self.sizes["users"], homeowners + 1) + 1)
+        self.property_owner = []     # property_id - 1 -> homeowner_id
+        self.property_bedrooms = []
+        self.tenancies = []     # (property_id, tenant_id) of every active lease
+        self.carpool_owner = []     # carpool_id - 1 -> student_id
+        self.event_limits = []     # event_id - 1 -> max_participants
+
+    def generate(self):
+        """Migrate the schema and insert every table in one transaction; return {table: rows inserted}."""
+        initializer = DatabaseInitializer(self.db_name)
+        initializer.migrate()
+        cursor = initializer.cursor
+        if cursor.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+            initializer.close()
+            raise ValueError(f"{self.db_name} already has users; generate into a new database file.")
+
+        cursor.execute("PRAGMA synchronous = OFF")     # Nothing to lose if a generated database is cut short
+        # Inserting with the secondary indexes and triggers in place costs a random b-tree write or
+        # an UPDATE per row. Drop them for the load, rebuild each index in one sorted pass and
+        # recompute what the triggers maintain in bulk, then put the triggers back.
+        schema = cursor.execute("""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND sql IS NOT NULL
+        """).fetchall()
+        counts = {}
+        cursor.execute("BEGIN")
+        try:
+            for kind, name, _ in schema:
+                cursor.execute(f"DROP {kind} {name}")
+            for table, rows in self._tables():
+                counts[table] = self._insert(cursor, table, rows)
+            for kind, _, sql in schema:
+                if kind == "index":
+                    cursor.execute(sql)
+            initializer.refresh_derived()
+            for kind, _, sql in schema:
+                if kind == "trigger":
+                    cursor.execute(sql)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            initializer.close()
+        return counts
+
+    def _tables(self):
+        # Parents before children: later generators read the ids recorded by earlier ones
+        return [
+            ("users", self.users()),
+            ("properties", self.properties()),
+            ("leases", self.leases()),
+            ("property_visits", self.property_visits()),
+            ("maintenance_requests", self.maintenance_requests()),
+            ("bookmarks", self.bookmarks()),
+            ("carpools", self.carpools()),
+            ("carpool_stops", self.carpool_stops()),
+            ("carpool_requests", self.carpool_requests()),
+            ("community_events", self.community_events()),
+            ("event_participants", self.event_participants()),
+            ("event_responses", self.event_responses()),
+            ("notifications", self.notifications()),
+        ]
+
+    def _insert(self, cursor, table, rows):
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        sql = f"INSERT INTO {table} ({', '.join(first)}) VALUES ({', '.join(':' + column for column in first)})"
+        cursor.execute(sql, first)
+        count = 1
+        while True:
+            batch = list(islice(rows, self.BATCH_SIZE))
+            if not batch:
+                return count
+            cursor.executemany(sql, batch)
+            count += len(batch)
+
+    def _date(self, before=0, after=0):
+        """A YYYY-MM-DD date between `before` days before and `after` days after the anchor."""
+        return (self.anchor + datetime.timedelta(days=self.rng.randint(-before, after))).isoformat()
+
+    def _time(self, earliest=7, latest=21):
+        return f"{self.rng.randint(earliest, latest):02d}:{self.rng.choice((0, 15, 30, 45)):02d}"
+
+    def _student(self):
+        return self.rng.choice(self.student_ids)
+
+    def users(self):
+        for user_id in range(1, self.sizes["users"] + 1):
+            role = "homeowner" if user_id in self.homeowner_ids else "student"
+            yield {
+                "user_id": user_id,
+                "username": f"{role}{user_id}",
+                "password": PASSWORD,
+                "email": f"{role}{user_id}@example.edu",
+                "role": role,
+                "phone_number": f"555-{self.rng.randint(100, 999)}-{user_id % 10000:04d}",
+            }
+
+    def properties(self):
+        rng = self.rng
+        states = list(STATES)
+        for property_id in range(1, self.sizes["properties"] + 1):
+            state = rng.choice(states)
+            owner = rng.choice(self.homeowner_ids)
+            bedrooms = rng.choice((1, 2, 2, 3, 3, 4, 5))
+            self.property_owner.append(owner)
+            self.property_bedrooms.append(bedrooms)
+            yield {
+                "property_id": property_id,
+                "homeowner_id": owner,
+                "address": f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}",
+                "bedrooms": bedrooms,
+                "kitchens": rng.choice((1, 1, 1, 2)),
+                "bathrooms": rng.randint(1, max(1, bedrooms - 1)),
+                "description": f"A {', '.join(rng.sample(FEATURES, 3))} {bedrooms} bedroom home.",
+                "state": state,
+                "city": rng.choice(STATES[state]),
+                "zipcode": f"{rng.randint(10000, 99999)}",
+                "photo_path": None,
+            }
+
+    def leases(self):
+        # Active leases never outnumber a property's bedrooms and give each student at most one home,
+        # so the rooms_available trigger stays non-negative; the rest of the quota is past leases
+        rng = self.rng
+        if not self.property_owner:
+            return
+        rooms = list(self.property_bedrooms)
+        tenants = list(self.student_ids)
+        rng.shuffle(tenants)
+        for lease_id in range(1, self.sizes["leases"] + 1):
+            property_id = rng.randint(1, len(rooms))
+            active = tenants and rooms[property_id - 1] > 0 and rng.random() < 0.75
+            if active:
+                tenant = tenants.pop()
+                rooms[property_id - 1] -= 1
+                self.tenancies.append((property_id, tenant))
+                start = self.anchor - datetime.timedelta(days=rng.randint(0, 300))
+            else:
+                tenant = self._student()
+                start = self.anchor - datetime.timedelta(days=rng.randint(400, 1200))
+            yield {
+                "lease_id": lease_id,
+                "property_id": property_id,
+                "tenant_id": tenant,
+                "start_date": start.isoformat(),
+                "end_date": (start + datetime.timedelta(days=365)).isoformat(),
+                "rent_amount": float(rng.randrange(500, 2500, 25)),
+                "status": "active" if active else "terminated",
+            }
+
+    def property_visits(self):
+        rng = self.rng
+        if not self.property_owner:
+            return
+        for visit_id in range(1, self.sizes["property_visits"] + 1):
+            property_id = rng.randint(1, len(self.property_owner))
+            yield {
+                "visit_id": visit_id,
+                "property_id": property_id,
+                "student_id": self._student(),
+                "homeowner_id": self.property_owner[property_id - 1],
+                "visit_type": rng.choice(("virtual", "in_person")),
+                "date": self._date(before=60, after=60),
+                "time": self._time(9, 18),
+                "status": rng.choice(("pending", "accepted", "accepted", "rejected")),
+                "note": rng.choice((None, "Can we see the kitchen?", "Running 10 minutes late.")),
+            }
+
+    def maintenance_requests(self):
+        rng = self.rng
+        if not self.tenancies:
+            return
+        for request_id in range(1, self.sizes["maintenance_requests"] + 1):
+            property_id, tenant = rng.choice(self.tenancies)
+            resolved = rng.random() < 0.5
+            yield {
+                "request_id": request_id,
+                "property_id": property_id,
+                "tenant_id": tenant,
+                "description": rng.choice(ISSUES),
+                "location": rng.choice(("Kitchen", "Bathroom", "Bedroom", "Living room", None)),
+                "date": self._date(before=180),
+                "resolution_date": self._date(before=30) if resolved else None,
+                "status": "resolved" if resolved else "pending",
+            }
+
+    def bookmarks(self):
+        rng = self.rng
+        if not self.property_owner:
+            return
+        seen = set()
+        limit = min(self.sizes["bookmarks"], len(self.student_ids) * len(self.property_owner))
+        while len(seen) < limit:
+            pair = (self._student(), rng.randint(1, len(self.property_owner)))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            yield {"bookmark_id": len(seen), "student_id": pair[0], "property_id": pair[1]}
+
+    def carpools(self):
+        rng = self.rng
+        for carpool_id in range(1, self.sizes["carpools"] + 1):
+            start, destination = rng.sample(LANDMARKS, 2)
+            owner = self._student()
+            self.carpool_owner.append(owner)
+            yield {
+                "carpool_id": carpool_id,
+                "student_id": owner,
+                "start_point": start,
+                "destination": destination,
+                "seats": rng.randint(0, 4),
+                "price": float(rng.randint(2, 20)),
+                "date": self._date(before=30, after=30),
+                "time": self._time(6, 20),
+            }
+
+    def carpool_stops(self):
+        # Streets rather than landmarks, so a stop never repeats a carpool's start or destination
+        rng = self.rng
+        if not self.carpool_owner:
+            return
+        stop_id = 0
+        carpools = len(self.carpool_owner)
+        per_carpool = self.sizes["carpool_stops"] / carpools
+        for carpool_id in range(1, carpools + 1):
+            minutes = rng.randint(6 * 60, 20 * 60)
+            count = min(int(per_carpool) + (rng.random() < per_carpool % 1), self.sizes["carpool_stops"] - stop_id)
+            for seq in range(1, count + 1):
+                stop_id += 1
+                minutes += rng.randint(5, 20)
+                yield {
+                    "stop_id": stop_id,
+                    "carpool_id": carpool_id,
+                    "seq": seq,
+                    "place": f"{rng.choice(STREETS)} {rng.choice(STREET_TYPES)}",
+                    "eta": f"{minutes // 60 % 24:02d}:{minutes % 60:02d}" if rng.random() < 0.9 else None,
+                }
+
+    def carpool_requests(self):
+        rng = self.rng
+        if not self.carpool_owner:
+            return
+        for request_id in range(1, self.sizes["carpool_requests"] + 1):
+            carpool_id = rng.randint(1, len(self.carpool_owner))
+            student = self._student()
+            while student == self.carpool_owner[carpool_id - 1] and len(self.student_ids) > 1:
+                student = self._student()
+            yield {
+                "request_id": request_id,
+                "carpool_id": carpool_id,
+                "student_id": student,
+                "status": rng.choice(("pending", "accepted", "accepted", "rejected")),
+            }
+
+    def community_events(self):
+        rng = self.rng
+        for event_id in range(1, self.sizes["community_events"] + 1):
+            limit = rng.choice((5, 10, 20, 30, 50, 100))
+            self.event_limits.append(limit)
+            name = rng.choice(EVENT_NAMES)
+            yield {
+                "event_id": event_id,
+                "organizer_id": self._student(),
+                "name": name,
+                "location": rng.choice(LANDMARKS),
+                "date": self._date(before=30, after=90),
+                "time": self._time(8, 22),
+                "max_participants": limit,
+                "description": f"{name} for students. Everyone is welcome.",
+                "event_type": rng.choice(EVENT_TYPES),
+            }
+
+    def event_participants(self):
+        # Accepted participants never exceed max_participants, so some events fill up
+        rng = self.rng
+        if not self.event_limits:
+            return
+        accepted = [0] * len(self.event_limits)
+        seen = set()
+        limit = min(self.sizes["event_participants"], len(self.event_limits) * len(self.student_ids))
+        while len(seen) < limit:
+            pair = (rng.randint(1, len(self.event_limits)), self._student())
+            if pair in seen:
+                continue
+            seen.add(pair)
+            status = rng.choice(("pending", "accepted", "accepted", "rejected"))
+            if status == "accepted":
+                if accepted[pair[0] - 1] >= self.event_limits[pair[0] - 1]:
+                    status = "pending"
+                else:
+                    accepted[pair[0] - 1] += 1
+            yield {
+                "participant_id": len(seen),
+                "event_id": pair[0],
+                "student_id": pair[1],
+                "response": rng.choice((None, "Count me in!", "Can I bring a friend?")),
+                "status": status,
+            }
+
+    def event_responses(self):
+        rng = self.rng
+        if not self.event_limits:
+            return
+        for response_id in range(1, self.sizes["event_responses"] + 1):
+            yield {
+                "response_id": response_id,
+                "event_id": rng.randint(1, len(self.event_limits)),
+                "student_id": self._student(),
+                "response": rng.choice(("Going", "Maybe", "Not going")),
+                "status": rng.choice(("pending", "accepted", "rejected")),
+            }
+
+    def notifications(self):
+        # Skewed towards low user ids so a few users have long inboxes, as active users do.
+        # Sent evenly over the year before the anchor, oldest first.
+        rng = self.rng
+        users = self.sizes["users"]
+        total = self.sizes["notifications"]
+        end = datetime.datetime.combine(self.anchor, datetime.time())
+        for notification_id in range(1, total + 1):
+            message = rng.choice(NOTIFICATIONS).format(n=rng.randint(1, 5000))
+            sent = end - datetime.timedelta(days=365 * (total - notification_id) / total)
+            yield {
+                "notification_id": notification_id,
+                "user_id": 1 + int(rng.random() ** 3 * users),
+                "message": message,
+                "status": "unread" if rng.random() < 0.3 else "read",
+                "subject": message,
+                "count": 1,
+                "created_at": sent.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill a new database with seeded synthetic data for scale testing.")
+    parser.add_argument("--db", default="generated.db", help="Path to the SQLite database file to create.")
+    parser.add_argument("--profile", choices=PROFILES, default="small", help="Starting sizes for every table.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same data.")
+    parser.add_argument("--anchor", type=datetime.date.fromisoformat, default=None,
+                        help="Date (YYYY-MM-DD) the generated dates are spread around. Defaults to today.")
+    for table in DEFAULT_SIZES:
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, dest=table, metavar="N",
+                            help=f"Number of {table.replace('_', ' ')} (overrides the profile).")
+    args = parser.parse_args()
+
+    sizes = dict(PROFILES[args.profile])
+    sizes.update({table: getattr(args, table) for table in DEFAULT_SIZES if getattr(args, table) is not None})
+
+    started = time.perf_counter()
+    try:
+        counts = DataGenerator(args.db, sizes, seed=args.seed, anchor=args.anchor).generate()
+    except ValueError as error:
+        parser.exit(1, f"{error}\n")
+    for table, count in counts.items():
+        print(f"{table:22} {count:>10}")
+    print(f"Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f} s.")
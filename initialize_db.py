@@ -1,12 +1,101 @@
 import sqlite3
+import argparse
+
+# Oldest SQLite the migrations run on: ALTER TABLE ... DROP COLUMN needs 3.35 (the trigram tokenizer 3.34)
+MINIMUM_SQLITE_VERSION = (3, 35, 0)
 
 class DatabaseInitializer:
     def __init__(self, db_name="housing_app.db"):
-        self.connection = sqlite3.connect(db_name)
+        # Autocommit mode so migrate() controls its own BEGIN/COMMIT around DDL
+        self.connection = sqlite3.connect(db_name, isolation_level=None)
         self.cursor = self.connection.cursor()
 
     def initialize(self):
-        """Initialize the database schema."""
+        """Initialize the database schema by applying every pending migration."""
+        self.migrate()
+        self.close()
+        print("Database initialized successfully.")
+
+    def schema_version(self):
+        return self.cursor.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self, dry_run=False):
+        """Apply pending migrations in order and return the (version, name) pairs applied.
+
+        With dry_run=True nothing is executed; the pending migrations are only reported.
+        """
+        self.check_sqlite_version()
+        current = self.schema_version()
+        if current >= MIGRATIONS[-1][0]:     # Fast path: schema already up to date
+            return []
+
+        pending = [(version, name, steps) for version, name, steps in MIGRATIONS if version > current]
+        for version, name, steps in pending:
+            if dry_run:
+                print(f"Pending migration {version}: {name}")
+                continue
+
+            self.cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for step in steps:
+                    if callable(step):
+                        step(self)
+                    else:
+                        self.cursor.execute(step)
+                self.cursor.execute(f"PRAGMA user_version = {int(version)}")
+                self.cursor.execute("COMMIT")
+            except Exception:
+                self.cursor.execute("ROLLBACK")
+                raise
+            print(f"Applied migration {version}: {name}")
+        return [(version, name) for version, name, steps in pending]
+
+    def check_sqlite_version(self):
+        """Raise RuntimeError if the SQLite library Python was built with is too old for the schema."""
+        if sqlite3.sqlite_version_info < MINIMUM_SQLITE_VERSION:
+            minimum = ".".join(str(part) for part in MINIMUM_SQLITE_VERSION)
+            raise RuntimeError(f"SQLite {minimum} or later is required (this Python has {sqlite3.sqlite_version}).")
+
+    def add_column(self, table, column, definition):
+        """ALTER TABLE ... ADD COLUMN, skipped when the column already exists."""
+        columns = [row[1] for row in self.cursor.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def drop_column(self, table, column):
+        """ALTER TABLE ... DROP COLUMN, skipped when the column is already gone."""
+        columns = [row[1] for row in self.cursor.execute(f"PRAGMA table_info({table})")]
+        if column in columns:
+            self.cursor.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+    def split_carpool_stops(self):
+        """Move the "Place (ETA: HH:MM); ..." strings in carpools.stops into carpool_stops rows (migration 7)."""
+        columns = [row[1] for row in self.cursor.execute("PRAGMA table_info(carpools)")]
+        if "stops" not in columns:
+            return
+        rows = []
+        for carpool_id, stops in self.cursor.execute("SELECT carpool_id, stops FROM carpools WHERE stops != ''").fetchall():
+            places = [stop.partition(" (ETA: ") for stop in stops.split("; ")]
+            for seq, (place, _, eta) in enumerate([stop for stop in places if stop[0].strip()], start=1):
+                rows.append((carpool_id, seq, place.strip(), eta.rstrip(")").strip() or None))
+        self.cursor.executemany("INSERT INTO carpool_stops (carpool_id, seq, place, eta) VALUES (?, ?, ?, ?)", rows)
+
+    def refresh_derived(self):
+        """Recompute everything the triggers maintain: room, participant and unread counts and the search indexes.
+
+        For bulk loads that drop the triggers while inserting; a normal write never needs this.
+        """
+        self.cursor.execute(BACKFILL_ROOMS)
+        self.cursor.execute(BACKFILL_PARTICIPANT_COUNTS)
+        self.cursor.execute(BACKFILL_UNREAD_COUNTS)
+        for table in ("properties_fts", "carpools_fts", "carpool_stops_fts"):
+            self.cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+    def close(self):
+        self.connection.close()
+
+    def create_tables(self):
+        """Create the base schema (migration 1)."""
         # Users table
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -183,11 +272,387 @@ class DatabaseInitializer:
             );
         """)
 
-        self.connection.commit()
-        self.connection.close()
-        print("Database initialized successfully.")
+
+
+# Recompute columns the triggers keep current from the rows they summarize (backfills for
+# migrations 3 and 4, and refresh_derived after a bulk load with the triggers dropped)
+BACKFILL_ROOMS = """
+    UPDATE properties
+    SET rooms_available = bedrooms - (
+            SELECT COUNT(*) FROM leases
+            WHERE leases.property_id = properties.property_id AND leases.status = 'active'
+        ),
+        visible = CASE WHEN bedrooms - (
+            SELECT COUNT(*) FROM leases
+            WHERE leases.property_id = properties.property_id AND leases.status = 'active'
+        ) > 0 THEN 1 ELSE 0 END
+"""
+
+BACKFILL_PARTICIPANT_COUNTS = """
+    UPDATE community_events
+    SET accepted_participants = (
+            SELECT COUNT(*) FROM event_participants
+            WHERE event_participants.event_id = community_events.event_id AND status = 'accepted'
+        ),
+        pending_participants = (
+            SELECT COUNT(*) FROM event_participants
+            WHERE event_participants.event_id = community_events.event_id AND status = 'pending'
+        )
+"""
+
+BACKFILL_UNREAD_COUNTS = """
+    UPDATE users
+    SET unread_notifications = (
+        SELECT COUNT(*) FROM notifications
+        WHERE notifications.user_id = users.user_id AND status = 'unread'
+    )
+"""
+
+# Ordered schema migrations keyed on PRAGMA user_version: (version, name, steps).
+# A step is a SQL string or a callable taking the DatabaseInitializer. Every step must be
+# safe to re-run against a database that already has the change (IF NOT EXISTS, add_column).
+MIGRATIONS = [
+    (1, "Base schema", [DatabaseInitializer.create_tables]),
+    (2, "Indexes for the lookups in app.py", [
+        "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)",
+        "CREATE INDEX IF NOT EXISTS idx_properties_homeowner ON properties(homeowner_id)",
+        "CREATE INDEX IF NOT EXISTS idx_properties_state_visible ON properties(state, visible, bedrooms)",
+        "CREATE INDEX IF NOT EXISTS idx_leases_property_tenant ON leases(property_id, tenant_id)",
+        "CREATE INDEX IF NOT EXISTS idx_leases_tenant_status ON leases(tenant_id, status, property_id)",
+        "CREATE INDEX IF NOT EXISTS idx_leases_status_tenant ON leases(status, tenant_id)",
+        "CREATE INDEX IF NOT EXISTS idx_visits_homeowner ON property_visits(homeowner_id)",
+        "CREATE INDEX IF NOT EXISTS idx_visits_property_status ON property_visits(property_id, status, date, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_visits_student_status ON property_visits(student_id, status, date, time)",
+        "CREATE INDEX IF NOT EXISTS idx_maintenance_property ON maintenance_requests(property_id)",
+        "CREATE INDEX IF NOT EXISTS idx_bookmarks_student_property ON bookmarks(student_id, property_id)",
+        "CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_carpools_student ON carpools(student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_carpool_requests_carpool_status ON carpool_requests(carpool_id, status, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_carpool_requests_student_status ON carpool_requests(student_id, status, carpool_id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_organizer ON community_events(organizer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_date ON community_events(date)",
+        "CREATE INDEX IF NOT EXISTS idx_event_participants_event_status ON event_participants(event_id, status, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_event_participants_student_event ON event_participants(student_id, event_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_event_responses_event ON event_responses(event_id)",
+    ]),
+    (3, "Trigger-maintained rooms_available and visible on properties", [
+        # Backfill from the active leases, then keep both columns current incrementally
+        BACKFILL_ROOMS,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_properties_rooms_insert AFTER INSERT ON properties
+            BEGIN
+                UPDATE properties
+                SET rooms_available = NEW.bedrooms,
+                    visible = CASE WHEN NEW.bedrooms > 0 THEN 1 ELSE 0 END
+                WHERE property_id = NEW.property_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_properties_rooms_bedrooms AFTER UPDATE OF bedrooms ON properties
+            BEGIN
+                UPDATE properties
+                SET rooms_available = rooms_available + NEW.bedrooms - OLD.bedrooms,
+                    visible = CASE WHEN rooms_available + NEW.bedrooms - OLD.bedrooms > 0 THEN 1 ELSE 0 END
+                WHERE property_id = NEW.property_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_leases_rooms_insert AFTER INSERT ON leases
+            WHEN NEW.status = 'active'
+            BEGIN
+                UPDATE properties
+                SET rooms_available = rooms_available - 1,
+                    visible = CASE WHEN rooms_available - 1 > 0 THEN 1 ELSE 0 END
+                WHERE property_id = NEW.property_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_leases_rooms_delete AFTER DELETE ON leases
+            WHEN OLD.status = 'active'
+            BEGIN
+                UPDATE properties
+                SET rooms_available = rooms_available + 1,
+                    visible = CASE WHEN rooms_available + 1 > 0 THEN 1 ELSE 0 END
+                WHERE property_id = OLD.property_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_leases_rooms_update AFTER UPDATE OF status, property_id ON leases
+            BEGIN
+                UPDATE properties
+                SET rooms_available = rooms_available + 1,
+                    visible = CASE WHEN rooms_available + 1 > 0 THEN 1 ELSE 0 END
+                WHERE property_id = OLD.property_id AND OLD.status = 'active';
+                UPDATE properties
+                SET rooms_available = rooms_available - 1,
+                    visible = CASE WHEN rooms_available - 1 > 0 THEN 1 ELSE 0 END
+                WHERE property_id = NEW.property_id AND NEW.status = 'active';
+            END
+        """,
+    ]),
+    (4, "Materialized participant counts on community_events", [
+        lambda initializer: initializer.add_column("community_events", "accepted_participants", "INTEGER NOT NULL DEFAULT 0"),
+        lambda initializer: initializer.add_column("community_events", "pending_participants", "INTEGER NOT NULL DEFAULT 0"),
+        BACKFILL_PARTICIPANT_COUNTS,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_event_participants_count_insert AFTER INSERT ON event_participants
+            BEGIN
+                UPDATE community_events
+                SET accepted_participants = accepted_participants + (NEW.status = 'accepted'),
+                    pending_participants = pending_participants + (NEW.status = 'pending')
+                WHERE event_id = NEW.event_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_event_participants_count_delete AFTER DELETE ON event_participants
+            BEGIN
+                UPDATE community_events
+                SET accepted_participants = accepted_participants - (OLD.status = 'accepted'),
+                    pending_participants = pending_participants - (OLD.status = 'pending')
+                WHERE event_id = OLD.event_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_event_participants_count_update AFTER UPDATE OF status, event_id ON event_participants
+            BEGIN
+                UPDATE community_events
+                SET accepted_participants = accepted_participants - (OLD.status = 'accepted'),
+                    pending_participants = pending_participants - (OLD.status = 'pending')
+                WHERE event_id = OLD.event_id;
+                UPDATE community_events
+                SET accepted_participants = accepted_participants + (NEW.status = 'accepted'),
+                    pending_participants = pending_participants + (NEW.status = 'pending')
+                WHERE event_id = NEW.event_id;
+            END
+        """,
+        # Upcoming events that still have room, for the available-events screen
+        """
+            CREATE INDEX IF NOT EXISTS idx_events_open_by_date ON community_events(date)
+            WHERE accepted_participants < max_participants
+        """,
+    ]),
+    (5, "Full-text index over property listings", [
+        # External-content FTS5 table: the text stays in properties, the index is kept in step by triggers
+        """
+            CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5(
+                address, city, state, zipcode, description,
+                content = 'properties', content_rowid = 'property_id',
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """,
+        "INSERT INTO properties_fts(properties_fts) VALUES ('rebuild')",
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_properties_fts_insert AFTER INSERT ON properties
+            BEGIN
+                INSERT INTO properties_fts(rowid, address, city, state, zipcode, description)
+                VALUES (NEW.property_id, NEW.address, NEW.city, NEW.state, NEW.zipcode, NEW.description);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_properties_fts_delete AFTER DELETE ON properties
+            BEGIN
+                INSERT INTO properties_fts(properties_fts, rowid, address, city, state, zipcode, description)
+                VALUES ('delete', OLD.property_id, OLD.address, OLD.city, OLD.state, OLD.zipcode, OLD.description);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_properties_fts_update AFTER UPDATE OF address, city, state, zipcode, description ON properties
+            BEGIN
+                INSERT INTO properties_fts(properties_fts, rowid, address, city, state, zipcode, description)
+                VALUES ('delete', OLD.property_id, OLD.address, OLD.city, OLD.state, OLD.zipcode, OLD.description);
+                INSERT INTO properties_fts(rowid, address, city, state, zipcode, description)
+                VALUES (NEW.property_id, NEW.address, NEW.city, NEW.state, NEW.zipcode, NEW.description);
+            END
+        """,
+    ]),
+    (6, "Trigram index over carpool places", [
+        # The trigram tokenizer indexes every three-character window, so a phrase matches any substring
+        """
+            CREATE VIRTUAL TABLE IF NOT EXISTS carpools_fts USING fts5(
+                start_point, stops, destination,
+                content = 'carpools', content_rowid = 'carpool_id',
+                tokenize = 'trigram'
+            )
+        """,
+        "INSERT INTO carpools_fts(carpools_fts) VALUES ('rebuild')",
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpools_fts_insert AFTER INSERT ON carpools
+            BEGIN
+                INSERT INTO carpools_fts(rowid, start_point, stops, destination)
+                VALUES (NEW.carpool_id, NEW.start_point, NEW.stops, NEW.destination);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpools_fts_delete AFTER DELETE ON carpools
+            BEGIN
+                INSERT INTO carpools_fts(carpools_fts, rowid, start_point, stops, destination)
+                VALUES ('delete', OLD.carpool_id, OLD.start_point, OLD.stops, OLD.destination);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpools_fts_update AFTER UPDATE OF start_point, stops, destination ON carpools
+            BEGIN
+                INSERT INTO carpools_fts(carpools_fts, rowid, start_point, stops, destination)
+                VALUES ('delete', OLD.carpool_id, OLD.start_point, OLD.stops, OLD.destination);
+                INSERT INTO carpools_fts(rowid, start_point, stops, destination)
+                VALUES (NEW.carpool_id, NEW.start_point, NEW.stops, NEW.destination);
+            END
+        """,
+    ]),
+    (7, "Carpool stops as ordered rows", [
+        """
+            CREATE TABLE IF NOT EXISTS carpool_stops (
+                stop_id INTEGER PRIMARY KEY,
+                carpool_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,  -- 1 for the first stop after the start point
+                place TEXT NOT NULL,
+                eta TEXT,
+                UNIQUE(carpool_id, seq),
+                FOREIGN KEY(carpool_id) REFERENCES carpools(carpool_id)
+            )
+        """,
+        DatabaseInitializer.split_carpool_stops,
+        # The old index covers the stops string, so it is rebuilt over start and destination only
+        "DROP TRIGGER IF EXISTS trg_carpools_fts_insert",
+        "DROP TRIGGER IF EXISTS trg_carpools_fts_delete",
+        "DROP TRIGGER IF EXISTS trg_carpools_fts_update",
+        "DROP TABLE IF EXISTS carpools_fts",
+        lambda initializer: initializer.drop_column("carpools", "stops"),
+        """
+            CREATE VIRTUAL TABLE IF NOT EXISTS carpools_fts USING fts5(
+                start_point, destination,
+                content = 'carpools', content_rowid = 'carpool_id',
+                tokenize = 'trigram'
+            )
+        """,
+        "INSERT INTO carpools_fts(carpools_fts) VALUES ('rebuild')",
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpools_fts_insert AFTER INSERT ON carpools
+            BEGIN
+                INSERT INTO carpools_fts(rowid, start_point, destination)
+                VALUES (NEW.carpool_id, NEW.start_point, NEW.destination);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpools_fts_delete AFTER DELETE ON carpools
+            BEGIN
+                INSERT INTO carpools_fts(carpools_fts, rowid, start_point, destination)
+                VALUES ('delete', OLD.carpool_id, OLD.start_point, OLD.destination);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpools_fts_update AFTER UPDATE OF start_point, destination ON carpools
+            BEGIN
+                INSERT INTO carpools_fts(carpools_fts, rowid, start_point, destination)
+                VALUES ('delete', OLD.carpool_id, OLD.start_point, OLD.destination);
+                INSERT INTO carpools_fts(rowid, start_point, destination)
+                VALUES (NEW.carpool_id, NEW.start_point, NEW.destination);
+            END
+        """,
+        """
+            CREATE VIRTUAL TABLE IF NOT EXISTS carpool_stops_fts USING fts5(
+                place,
+                content = 'carpool_stops', content_rowid = 'stop_id',
+                tokenize = 'trigram'
+            )
+        """,
+        "INSERT INTO carpool_stops_fts(carpool_stops_fts) VALUES ('rebuild')",
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpool_stops_fts_insert AFTER INSERT ON carpool_stops
+            BEGIN
+                INSERT INTO carpool_stops_fts(rowid, place) VALUES (NEW.stop_id, NEW.place);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpool_stops_fts_delete AFTER DELETE ON carpool_stops
+            BEGIN
+                INSERT INTO carpool_stops_fts(carpool_stops_fts, rowid, place) VALUES ('delete', OLD.stop_id, OLD.place);
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_carpool_stops_fts_update AFTER UPDATE OF place ON carpool_stops
+            BEGIN
+                INSERT INTO carpool_stops_fts(carpool_stops_fts, rowid, place) VALUES ('delete', OLD.stop_id, OLD.place);
+                INSERT INTO carpool_stops_fts(rowid, place) VALUES (NEW.stop_id, NEW.place);
+            END
+        """,
+    ]),
+    (8, "Unread notification counts and an unread-first inbox index", [
+        lambda initializer: initializer.add_column("users", "unread_notifications", "INTEGER NOT NULL DEFAULT 0"),
+        "UPDATE notifications SET status = 'unread' WHERE status IS NULL",
+        BACKFILL_UNREAD_COUNTS,
+        # 'unread' sorts after 'read', so walking this index backwards gives unread first, newest first
+        "CREATE INDEX IF NOT EXISTS idx_notifications_inbox ON notifications(user_id, status, notification_id)",
+        "DROP INDEX IF EXISTS idx_notifications_user",     # A prefix of the inbox index
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_insert AFTER INSERT ON notifications
+            WHEN NEW.status = 'unread'
+            BEGIN
+                UPDATE users SET unread_notifications = unread_notifications + 1 WHERE user_id = NEW.user_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_delete AFTER DELETE ON notifications
+            WHEN OLD.status = 'unread'
+            BEGIN
+                UPDATE users SET unread_notifications = unread_notifications - 1 WHERE user_id = OLD.user_id;
+            END
+        """,
+        """
+            CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_update AFTER UPDATE OF status, user_id ON notifications
+            BEGIN
+                UPDATE users SET unread_notifications = unread_notifications - 1
+                WHERE user_id = OLD.user_id AND OLD.status = 'unread';
+                UPDATE users SET unread_notifications = unread_notifications + 1
+                WHERE user_id = NEW.user_id AND NEW.status = 'unread';
+            END
+        """,
+    ]),
+    (9, "Notification digests", [
+        # subject groups notifications that coalesce into one digest row; count is how many it stands for
+        lambda initializer: initializer.add_column("notifications", "subject", "TEXT"),
+        lambda initializer: initializer.add_column("notifications", "count", "INTEGER NOT NULL DEFAULT 1"),
+        lambda initializer: initializer.add_column("notifications", "created_at", "TEXT"),
+        "UPDATE notifications SET subject = message WHERE subject IS NULL",
+        "UPDATE notifications SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL",     # Age counts from the upgrade
+        """
+            CREATE INDEX IF NOT EXISTS idx_notifications_digest ON notifications(user_id, subject, created_at)
+            WHERE status = 'unread'
+        """,
+    ]),
+    (10, "Notification retention", [
+        # The retention job expires notifications oldest first
+        "CREATE INDEX IF NOT EXISTS idx_notifications_age ON notifications(created_at)",
+    ]),
+    (11, "Zero-padded carpool times", [
+        # Pickup windows compare times as text, which only orders correctly as HH:MM
+        "UPDATE carpools SET time = '0' || time WHERE time GLOB '[0-9]:[0-9][0-9]'",
+        "UPDATE carpool_stops SET eta = '0' || eta WHERE eta GLOB '[0-9]:[0-9][0-9]'",
+    ]),
+    (12, "Property search in id order", [
+        # Search results are paged by property_id, so the id follows the filtered columns and no page sorts
+        "CREATE INDEX IF NOT EXISTS idx_properties_state_visible_id ON properties(state, visible, property_id)",
+        "DROP INDEX IF EXISTS idx_properties_state_visible",     # bedrooms is compared with an OR, so it never narrowed a search
+    ]),
+    (13, "Inbox in time order", [
+        # An updated digest keeps its id but gets a new created_at, so the inbox sorts on created_at to bring it back
+        # to the top; notification_id only breaks ties within a second
+        "CREATE INDEX IF NOT EXISTS idx_notifications_inbox_time ON notifications(user_id, status, created_at, notification_id)",
+        "DROP INDEX IF EXISTS idx_notifications_inbox",     # A prefix of it except for created_at
+    ]),
+]
 
 
 if __name__ == "__main__":
-    initializer = DatabaseInitializer()
-    initializer.initialize()
+    parser = argparse.ArgumentParser(description="Create or upgrade the housing app database schema.")
+    parser.add_argument("--db", default="housing_app.db", help="Path to the SQLite database file.")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations without applying them.")
+    args = parser.parse_args()
+
+    initializer = DatabaseInitializer(args.db)
+    if args.dry_run:
+        if not initializer.migrate(dry_run=True):
+            print(f"Schema is up to date (version {initializer.schema_version()}).")
+        initializer.close()
+    else:
+        initializer.initialize()
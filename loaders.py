@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+
+from db_connection import DatabaseConnection
+
+
+class BatchLoader:
+    """DataLoader-style batching: collect keys, then fetch them all with one WHERE ... IN (...) query.
+
+    `sql` must select the key as its first column and contain a `{keys}` placeholder for the IN list;
+    any other `?` parameters come before it and are bound from `parameters`. Rows are grouped by key
+    and returned without the key column, or with records=True as whole records named after the
+    columns. Create one loader per screen render so the cache never outlives the data it was read from.
+    """
+
+    CHUNK_SIZE = 500     # Keys bound per query, well under SQLite's host parameter limit
+
+    def __init__(self, sql, parameters=(), db=None, records=False):
+        self.sql = sql
+        self.parameters = tuple(parameters)
+        self.records = records
+        self.db = db or DatabaseConnection()
+        self._pending = {}     # Keys waiting for the next dispatch, in insertion order
+        self._cache = {}
+
+    def prime(self, keys):
+        """Queue keys to be fetched together on the next load."""
+        for key in keys:
+            if key not in self._cache:
+                self._pending[key] = None
+
+    def load(self, key):
+        """Rows for one key, dispatching every queued key in the same query if it is not cached yet."""
+        if key not in self._cache:
+            self.prime([key])
+            self._dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        keys = list(keys)
+        self.prime(keys)
+        self._dispatch()
+        return {key: self._cache[key] for key in keys}
+
+    def _dispatch(self):
+        pending, self._pending = list(self._pending), {}
+        for start in range(0, len(pending), self.CHUNK_SIZE):
+            chunk = pending[start:start + self.CHUNK_SIZE]
+            for key in chunk:
+                self._cache[key] = []
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.db.fetch(self.sql.format(keys=placeholders), self.parameters + tuple(chunk), self.records):
+                self._cache[row[0]].append(row if self.records else row[1:])
+
+
+TENANTS_BY_PROPERTY = """
+    SELECT l.property_id, u.user_id, u.username, u.email
+    FROM leases l
+    JOIN users u ON l.tenant_id = u.user_id
+    WHERE l.property_id IN ({keys})
+"""
+
+
+def tenants_by_property(db=None):
+    """Records (property_id, user_id, username, email) of every tenant on each property."""
+    return BatchLoader(TENANTS_BY_PROPERTY, db=db, records=True)
+
+
+@contextmanager
+def assert_query_count(expected, db=None):
+    """Fail if the block issues a different number of statements than `expected` (for tests)."""
+    db = db or DatabaseConnection()
+    start = db.statement_count
+    yield
+    issued = db.statement_count - start
+    if issued != expected:
+        raise AssertionError(f"Expected {expected} queries, {issued} were issued.")
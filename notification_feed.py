@@ -0,0 +1,145 @@
+import queue
+from collections import deque
+
+from db_connection import DatabaseConnection
+from db_worker import DatabaseWorker
+from observer import Notification, unread_count, timestamp
+
+# The user's unread rows stored or updated since a created_at
+CHANGES = """
+    SELECT notification_id, user_id, message, count, created_at
+    FROM notifications
+    WHERE user_id = ? AND status = 'unread' AND created_at >= ?
+    ORDER BY created_at, notification_id
+"""
+
+
+class NotificationFeed:
+    """Pushes a user's new notifications and unread count to an open screen, on the Tk thread.
+
+    Notifications stored by this process arrive straight from the bus subscription. Its callbacks
+    run on the dispatcher thread, so they are only queued there and picked up by a root.after poll,
+    as the database worker does with its results. Other processes writing to the same database file
+    are caught by a check on the database worker every WATCH_MS: PRAGMA data_version tells whether
+    anyone else has committed since the last check, and only then are the user's unread rows stored
+    or updated since the last one (a digest keeps its id but gets a new created_at) and the unread
+    counter read. A connection's own commits don't change its
+    data_version, so writes to notifications made through this process (marking them read, say)
+    force the next check instead. Nothing is ever reloaded wholesale.
+
+    on_notifications(notifications) gets each new Notification once, and a digest again each time
+    its count grows; on_unread(count) gets the unread count whenever it may have changed. The feed stops when `owner` is destroyed.
+    """
+
+    POLL_MS = 200
+    WATCH_MS = 2000
+    SEEN = 200     # Recent (id, count) pairs remembered, so a notification seen by both the bus and the check shows once
+
+    def __init__(self, root, bus, user_id, owner, on_notifications, on_unread):
+        self.root = root
+        self.bus = bus
+        self.user_id = user_id
+        self.owner = owner
+        self.on_notifications = on_notifications
+        self.on_unread = on_unread
+        self._pushed = queue.Queue()     # Filled by the bus on the dispatcher thread
+        self._seen = deque(maxlen=self.SEEN)
+        self._version = None     # data_version of the worker's connection at the last check
+        self._since = None     # created_at the next check reads from
+        self._checking = False
+        self._recheck = False     # Something changed while a check was in flight
+        self._written = False     # This process wrote to notifications since the last check
+        self._timer = None     # Pending root.after of the next check
+        self._closed = False
+
+        bus.subscribe(user_id, self._pushed.put)
+        DatabaseConnection().write_listeners.append(self._table_written)
+        owner.bind("<Destroy>", lambda event: self.close(), add="+")
+        self.root.after(self.POLL_MS, self._poll)
+        self._check()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.bus.unsubscribe(self.user_id, self._pushed.put)
+            DatabaseConnection().write_listeners.remove(self._table_written)
+
+    def _table_written(self, table):
+        # Called on whichever thread wrote; the flag is only read by the next check
+        if table == "notifications":
+            self._written = True
+
+    def _poll(self):
+        if self._closed:
+            return
+        pushed = []
+        while True:
+            try:
+                pushed.append(self._pushed.get_nowait())
+            except queue.Empty:
+                break
+        if pushed:
+            self._show(pushed)
+            self._check()     # The bus has committed, so the unread count is already different
+        self.root.after(self.POLL_MS, self._poll)
+
+    def _show(self, notifications):
+        new = [notification for notification in notifications
+               if (notification.notification_id, notification.count) not in self._seen]
+        self._seen.extend((notification.notification_id, notification.count) for notification in new)
+        if new:
+            self.on_notifications(new)
+
+    def _check(self):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+        if self._closed:
+            return
+        if self._checking:
+            self._recheck = True
+            return
+        self._checking = True
+        version, since = self._version, self._since
+        if self._written:
+            self._written = False
+            version = None
+        DatabaseWorker.for_root(self.root).submit(lambda db: self._changes(db, version, since), self._changed,
+                                                  on_error=self._failed, owner=self.owner, background=True)
+
+    def _changes(self, db, version, since):
+        """Runs on the worker: (data_version, new notifications, next since, unread count), or None if unchanged."""
+        current = db.fetch("PRAGMA data_version")[0][0]
+        if current == version:
+            return None
+        if since is None:     # First check: only what arrives from now on is new
+            since = timestamp()
+        # created_at has one-second resolution, so the last second is read again next time; _show drops repeats
+        rows = db.fetch(CHANGES, (self.user_id, since))
+        if rows:
+            since = rows[-1][4]
+        return current, [Notification(*row[:4]) for row in rows], since, unread_count(db, self.user_id)
+
+    def _changed(self, result):
+        self._checking = False
+        if result is not None:
+            first = self._since is None
+            self._version, notifications, self._since, unread = result
+            if first:     # Already stored when the feed started, so remember them without showing them
+                self._seen.extend((notification.notification_id, notification.count) for notification in notifications)
+            else:
+                self._show(notifications)
+            self.on_unread(unread)
+        if self._recheck:
+            self._recheck = False
+            self._check()
+        else:
+            self._schedule()
+
+    def _failed(self, error):
+        self._checking = False     # A locked or busy database is tried again on the next check
+        self._schedule()
+
+    def _schedule(self):
+        if not self._closed and self._timer is None:
+            self._timer = self.root.after(self.WATCH_MS, self._check)
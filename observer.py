@@ -1,11 +1,278 @@
-class NotificationSystem:
-    def __init__(self):
-        self.notifications = []
+import sys
+import time
+import queue
+import atexit
+import threading
+import traceback
+from collections import namedtuple
 
-    def notify(self, message):
-        self.notifications.append(message)
+from db_connection import DatabaseConnection
 
-    def get_notifications(self):
-        current_notifications = self.notifications[:]
-        self.notifications.clear()
-        return current_notifications
+# A stored notification as handed to subscribers; notification_id lets a subscriber drop a redelivery.
+# count is how many notifications the row stands for once same-subject ones have been merged into it.
+Notification = namedtuple("Notification", "notification_id user_id message count")
+
+LOOKUP_CHUNK = 500     # (user_id, subject) pairs per open-digest lookup, well under SQLite's parameter limit
+
+# Statements whose plans check_query_plans.py checks; {keys} is the placeholder list for a chunk of keys
+OPEN_DIGESTS = """
+    SELECT n.user_id, n.subject, n.notification_id, n.count
+    FROM (VALUES {keys}) AS k
+    JOIN notifications n ON n.user_id = k.column1 AND n.subject = k.column2
+        AND n.status = 'unread' AND n.created_at >= ?
+    ORDER BY n.notification_id
+"""
+UPDATE_DIGEST = """
+    UPDATE notifications SET message = ?, count = count + ?, created_at = ?
+    WHERE notification_id = ?
+"""
+UNREAD_COUNT = "SELECT unread_notifications FROM users WHERE user_id = ?"
+MARK_READ = """
+    UPDATE notifications SET status = 'read'
+    WHERE user_id = ? AND status = 'unread' AND notification_id IN ({keys})
+"""
+MARK_ALL_READ = "UPDATE notifications SET status = 'read' WHERE user_id = ? AND status = 'unread'"
+
+
+def timestamp(seconds=None):
+    """UTC time as stored in notifications.created_at, in the same format as CURRENT_TIMESTAMP."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(seconds))
+
+
+class NotificationBus:
+    """Every notification goes through one bounded queue drained by a background dispatcher.
+
+    notify() only enqueues, so a sender never waits on SQLite. The dispatcher stores everything
+    queued so far with one batched insert, then hands each stored Notification to the callbacks
+    subscribed for its user. The queue holds at most max_pending notifications: notify() takes
+    a place in it straight away, blocking while it is full (backpressure), and raises TimeoutError
+    if no room frees up within put_timeout seconds. Inside a transaction() block that happens
+    before the commit, so the sender's write fails with it instead of being saved without its
+    notifications; the notifications themselves are queued once the block commits.
+
+    Notifications to the same user with the same subject (the message itself unless the sender
+    gives one) are coalesced: within a batch, and with an unread row for that subject stored in the
+    last coalesce_window seconds, they become one digest row carrying the latest message and the
+    total count. An open digest is updated in place and keeps its id, so an inbox that is already
+    showing it can still mark it read; its created_at moves to now, which brings it back to the top
+    of the inbox.
+
+    Delivery is at least once. A batch that fails to store stays queued and is retried until it
+    is written, and a callback that raises is called again with the same notification until it
+    returns (or unsubscribes); both wait retry_delay, doubling up to max_retry_delay, between tries.
+    Callbacks run on the dispatcher thread, so a Tk screen must pass what it receives over to the
+    Tk thread rather than touch widgets in the callback.
+    """
+
+    def __init__(self, max_pending=10000, batch_size=500, linger=0.05, put_timeout=5.0, retry_delay=0.5,
+                 max_retry_delay=30.0, coalesce_window=600, exit_timeout=10.0):
+        self.batch_size = batch_size
+        self.linger = linger     # How long the dispatcher waits for more notifications to fill a batch
+        self.coalesce_window = coalesce_window
+        self.put_timeout = put_timeout
+        self.retry_delay = retry_delay     # First pause before a failed write or delivery is retried
+        self.max_retry_delay = max_retry_delay
+        self.exit_timeout = exit_timeout     # How long closing the app waits for the queue to be stored
+        self.subscribers = {}
+        self._queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_pending)     # One per queued notification; the queue's bound
+        self._retries = []     # (due, callback, notification, attempts) of deliveries that raised
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, user_id, callback):
+        """Call callback(notification) for every notification stored for user_id from now on."""
+        with self._lock:
+            self.subscribers.setdefault(user_id, []).append(callback)
+
+    def unsubscribe(self, user_id, callback):
+        with self._lock:
+            callbacks = self.subscribers.get(user_id, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def notify(self, user_id, message, subject=None):
+        self.notify_many([user_id], message, subject)
+
+    def notify_many(self, user_ids, message, subject=None):
+        """Queue one notification per user; returns as soon as they are queued.
+
+        Give repeated updates about one thing the same subject (e.g. "event:12") so they are
+        merged into a digest even when the wording differs. Called inside a transaction() block,
+        the notifications are only queued once that block commits, and never if it rolls back.
+        """
+        user_ids = list(user_ids)
+        self._reserve(len(user_ids))     # Before the commit, so a full queue fails the write rather than the notifications
+        DatabaseConnection().after_commit(lambda: self._enqueue(user_ids, message, subject or message),
+                                          on_rollback=lambda: self._release(len(user_ids)))
+
+    def _reserve(self, count):
+        deadline = time.monotonic() + self.put_timeout
+        for taken in range(count):
+            if not self._slots.acquire(timeout=max(0, deadline - time.monotonic())):
+                self._release(taken)
+                raise TimeoutError(f"The notification queue stayed full for {self.put_timeout} seconds.")
+
+    def _release(self, count):
+        for _ in range(count):
+            self._slots.release()
+
+    def _enqueue(self, user_ids, message, subject):
+        self._start()
+        for user_id in user_ids:
+            self._queue.put((user_id, message, subject))     # Never blocks: the places were reserved
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been stored and delivered once.
+
+        Returns False if timeout seconds pass first.
+        """
+        if self._thread is None:
+            return True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_at_exit)
+
+    def _flush_at_exit(self):
+        # Don't lose what is still queued when the app closes, but don't hang on a database that keeps failing
+        if not self.flush(self.exit_timeout):
+            print(f"Closing with {self._queue.unfinished_tasks} notifications not stored.", file=sys.stderr)
+
+    def _backoff(self, attempts):
+        return min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+
+    def _run(self):
+        while True:
+            if self._retries:     # Wake up for the next delivery retry that falls due
+                timeout = max(0, min(retry[0] for retry in self._retries) - time.monotonic())
+            else:
+                timeout = None
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                self._retry_deliveries()
+                continue
+
+            # Take whatever else arrives within `linger`, up to a full batch
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            try:
+                for notification in self._store(batch):
+                    self._deliver(notification)
+                self._retry_deliveries()
+            finally:
+                self._release(len(batch))
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _store(self, batch):
+        """Coalesce and store a batch and return the digest rows written, as Notifications."""
+        db = DatabaseConnection()
+        digests = {}     # (user_id, subject) -> [latest message, count], in arrival order
+        for user_id, message, subject in batch:
+            digest = digests.setdefault((user_id, subject), [message, 0])
+            digest[0] = message
+            digest[1] += 1
+
+        attempts = 0
+        while True:     # The batch keeps its places in the queue until it is written, so nothing is dropped
+            try:
+                return self._write_digests(db, digests)
+            except Exception:
+                attempts += 1
+                print(f"Storing {len(batch)} notifications failed (attempt {attempts}), retrying:", file=sys.stderr)
+                traceback.print_exc()
+                time.sleep(self._backoff(attempts))
+
+    def _write_digests(self, db, digests):
+        now = timestamp()
+        keys = list(digests)
+        with db.transaction():
+            # The newest unread row for each subject still inside the window is the open digest
+            open_digests = {}     # (user_id, subject) -> (notification_id, count)
+            for start in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[start:start + LOOKUP_CHUNK]
+                for user_id, subject, notification_id, count in db.fetch(
+                        OPEN_DIGESTS.format(keys=", ".join(["(?, ?)"] * len(chunk))),
+                        [value for key in chunk for value in key] + [timestamp(time.time() - self.coalesce_window)]):
+                    open_digests[(user_id, subject)] = (notification_id, count)
+
+            stored = []     # In arrival order; None for the ids of rows not inserted yet
+            updates, inserts = [], []
+            for (user_id, subject), (message, count) in digests.items():
+                if (user_id, subject) in open_digests:
+                    notification_id, previous = open_digests[(user_id, subject)]
+                    updates.append((message, count, now, notification_id))
+                    stored.append([notification_id, user_id, message, previous + count])
+                else:
+                    inserts.append((user_id, message, subject, count, now))
+                    stored.append([None, user_id, message, count])
+            if updates:
+                db.query_many(UPDATE_DIGEST, updates)
+            if inserts:
+                db.query_many("""
+                    INSERT INTO notifications (user_id, message, subject, count, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, inserts)
+                # The write lock is held until commit, so the rows got consecutive ids ending here
+                last_id = db.fetch("SELECT last_insert_rowid()")[0][0]
+
+        if inserts:
+            new_ids = iter(range(last_id - len(inserts) + 1, last_id + 1))
+            for row in stored:
+                if row[0] is None:
+                    row[0] = next(new_ids)
+        return [Notification(*row) for row in stored]
+
+    def _deliver(self, notification, callbacks=None, attempts=0):
+        if callbacks is None:
+            with self._lock:
+                callbacks = list(self.subscribers.get(notification.user_id, []))
+        for callback in callbacks:
+            try:
+                callback(notification)
+            except Exception:
+                if attempts == 0:
+                    print(f"Delivering notification {notification.notification_id} failed, retrying:", file=sys.stderr)
+                    traceback.print_exc()
+                self._retries.append((time.monotonic() + self._backoff(attempts + 1), callback, notification, attempts + 1))
+
+    def _retry_deliveries(self):
+        now = time.monotonic()
+        due = [retry for retry in self._retries if retry[0] <= now]
+        self._retries = [retry for retry in self._retries if retry[0] > now]
+        for _, callback, notification, attempts in due:
+            with self._lock:
+                subscribed = callback in self.subscribers.get(notification.user_id, [])
+            if subscribed:     # A callback that unsubscribed (a closed screen) no longer wants it
+                self._deliver(notification, [callback], attempts)
+
+
+def unread_count(db, user_id):
+    """A user's unread notifications, read from the counter the notification triggers keep current."""
+    row = db.fetch(UNREAD_COUNT, (user_id,))
+    return row[0][0] if row else 0
+
+
+def mark_read(db, user_id, notification_ids, chunk_size=500):
+    """Mark some of a user's notifications read with one UPDATE per chunk of ids."""
+    notification_ids = list(notification_ids)
+    with db.transaction():
+        for start in range(0, len(notification_ids), chunk_size):
+            chunk = notification_ids[start:start + chunk_size]
+            db.query(MARK_READ.format(keys=", ".join("?" * len(chunk))), (user_id, *chunk))
+
+
+def mark_all_read(db, user_id):
+    db.query(MARK_ALL_READ, (user_id,))
@@ -0,0 +1,301 @@
+from collections import namedtuple
+
+from db_connection import DatabaseConnection
+from search import PROPERTY_WEIGHTS, CARPOOL_STOPS_COLUMN
+
+# The statements the screens in app.py run, by the screen that runs them. benchmark.py times these
+# same constants and check_query_plans.py checks their plans, so there is one copy of each to edit.
+
+
+class PagedQuery(namedtuple("PagedQuery", "sql order_by key descending", defaults=((0,), False))):
+    """A statement read a page at a time with DatabaseConnection.fetch_page.
+
+    `sql` has the `{keyset}` placeholder; order_by, key and descending are as for fetch_page.
+    Rows come back as records named after the selected columns (row.address, not row[1]).
+    """
+
+    __slots__ = ()
+
+    def fetch_page(self, db, parameters, after=None, page_size=50):
+        return db.fetch_page(self.sql, parameters, order_by=self.order_by, key=self.key, after=after,
+                             page_size=page_size, descending=self.descending, records=True)
+
+    def page_sql(self, first=False):
+        """The statement as it runs for every page after the first (or, with first=True, for the first)."""
+        return DatabaseConnection.page_sql(self.sql, self.order_by, self.descending, first=first, key=self.key)
+
+
+# LoginScreen
+LOGIN = "SELECT * FROM users WHERE username = ? AND password = ?"
+
+# ChatBotScreen
+CHAT_PROPERTIES = "SELECT address FROM properties WHERE visible = 1"
+CHAT_CARPOOLS = "SELECT start_point, destination FROM carpools WHERE seats > 0"
+CHAT_EVENTS = "SELECT name, date, time FROM community_events WHERE date >= DATE('now')"
+CHAT_ROOMMATES = """
+    SELECT username
+    FROM users
+    WHERE role = 'student'
+    AND user_id NOT IN (
+        SELECT tenant_id
+        FROM leases
+        WHERE status = 'active'
+    )
+"""
+
+# HomeownerDashboard
+ROOMS_AVAILABLE = "SELECT rooms_available FROM properties WHERE property_id = ?"
+VISITED_STUDENTS = """
+    SELECT DISTINCT u.user_id, u.username
+    FROM property_visits pv
+    JOIN users u ON pv.student_id = u.user_id
+    WHERE pv.property_id = ? AND pv.status = 'accepted'
+"""
+LEASE_PROPERTIES = """
+    SELECT property_id, address
+    FROM properties
+    WHERE homeowner_id = ?
+"""
+HOMEOWNER_UPCOMING_VISITS = PagedQuery("""
+    SELECT pv.visit_id, p.address, u.username AS visitor, pv.visit_type, pv.date, pv.time, pv.status
+    FROM property_visits pv
+    JOIN properties p ON pv.property_id = p.property_id
+    JOIN users u ON pv.student_id = u.user_id
+    WHERE p.homeowner_id = ? AND pv.status = 'accepted' AND pv.date >= DATE('now')
+    AND {keyset}
+""", ("pv.date", "pv.time", "pv.visit_id"), (4, 5, 0))
+LISTINGS = PagedQuery("""
+    SELECT property_id, address, state, city, zipcode, bedrooms, kitchens, bathrooms, description, photo_path
+    FROM properties
+    WHERE homeowner_id = ? AND {keyset}
+""", ("property_id",))
+VISIT_REQUESTS = PagedQuery("""
+    SELECT pv.visit_id, p.address, pv.visit_type, pv.date, pv.time, pv.status, pv.note, u.username
+    FROM property_visits pv
+    JOIN properties p ON pv.property_id = p.property_id
+    JOIN users u ON pv.student_id = u.user_id
+    WHERE pv.homeowner_id = ? AND {keyset}
+""", ("pv.visit_id",))
+MY_PROPERTIES = PagedQuery("""
+    SELECT property_id, address, rooms_available, bedrooms
+    FROM properties
+    WHERE homeowner_id = ? AND {keyset}
+""", ("property_id",))
+MAINTENANCE_REQUESTS = PagedQuery("""
+    SELECT request_id, description, location, date, status, resolution_date
+    FROM maintenance_requests
+    WHERE property_id = ? AND {keyset}
+""", ("request_id",))
+
+# StudentDashboard
+LEASE_PROPERTY = """
+    SELECT property_id
+    FROM leases
+    WHERE tenant_id = ? AND status = 'active'
+"""
+ROOMMATES = PagedQuery("""
+    SELECT u.username, u.email, l.tenant_id, l.lease_id
+    FROM leases l
+    JOIN users u ON l.tenant_id = u.user_id
+    WHERE l.property_id = ? AND l.tenant_id != ? AND {keyset}
+""", ("l.tenant_id", "l.lease_id"), (2, 3))
+MY_LEASE = PagedQuery("""
+    SELECT l.lease_id, p.address, l.start_date, l.end_date, l.rent_amount, l.status
+    FROM leases l
+    JOIN properties p ON l.property_id = p.property_id
+    WHERE l.tenant_id = ? AND l.status = 'active' AND {keyset}
+""", ("l.lease_id",))
+MY_MAINTENANCE_REQUESTS = PagedQuery("""
+    SELECT mr.description, mr.location, mr.date, mr.status, mr.resolution_date, l.lease_id, mr.request_id
+    FROM leases l
+    JOIN maintenance_requests mr ON mr.property_id = l.property_id
+    WHERE l.tenant_id = ? AND l.status = 'active' AND {keyset}
+""", ("l.lease_id", "mr.request_id"), (5, 6))
+STUDENT_UPCOMING_VISITS = PagedQuery("""
+    SELECT pv.visit_type, pv.date, pv.time, p.address, pv.visit_id
+    FROM property_visits pv
+    JOIN properties p ON pv.property_id = p.property_id
+    WHERE pv.student_id = ? AND pv.status = 'accepted' AND {keyset}
+""", ("pv.date", "pv.time", "pv.visit_id"), (1, 2, 4))
+AVAILABLE_EVENTS = PagedQuery("""
+    SELECT e.event_id, e.name, e.location, e.date, e.time, e.max_participants,
+        e.accepted_participants AS current_participants,
+        e.description, e.event_type, e.organizer_id,
+        (SELECT status FROM event_participants WHERE event_id = e.event_id AND student_id = ?) AS my_status
+    FROM community_events e
+    WHERE e.accepted_participants < e.max_participants AND e.date >= DATE('now') AND e.organizer_id != ?
+    AND {keyset}
+""", ("e.date", "e.time", "e.event_id"), (3, 4, 0))
+EVENT_REQUESTS = PagedQuery("""
+    SELECT ep.participant_id, ep.event_id, ep.student_id, ep.status, e.name, u.username
+    FROM event_participants ep
+    JOIN community_events e ON ep.event_id = e.event_id
+    JOIN users u ON ep.student_id = u.user_id
+    WHERE e.organizer_id = ? AND {keyset}
+""", ("ep.participant_id",))
+MY_EVENTS = PagedQuery("""
+    SELECT event_id, name, location, date, time, max_participants, description, event_type
+    FROM community_events
+    WHERE organizer_id = ? AND {keyset}
+""", ("event_id",))
+UPCOMING_EVENTS = PagedQuery("""
+    SELECT e.event_id, e.name, e.location, e.date, e.time, e.max_participants, e.description, e.event_type, u.username AS organizer
+    FROM community_events e
+    LEFT JOIN users u ON e.organizer_id = u.user_id
+    WHERE (e.organizer_id = ?
+        OR e.event_id IN (
+            SELECT event_id FROM event_participants WHERE student_id = ? AND status = 'accepted'
+        ))
+    AND {keyset}
+""", ("e.date", "e.time", "e.event_id"), (3, 4, 0))
+MY_CARPOOLS = PagedQuery("""
+    SELECT carpool_id, start_point, destination, seats, price, date, time
+    FROM carpools
+    WHERE student_id = ? AND {keyset}
+""", ("carpool_id",))
+CARPOOL_STOPS = "SELECT place, eta FROM carpool_stops WHERE carpool_id = ? ORDER BY seq"
+DELETE_CARPOOL_REQUESTS = "DELETE FROM carpool_requests WHERE carpool_id = ?"
+DELETE_CARPOOL_STOPS = "DELETE FROM carpool_stops WHERE carpool_id = ?"
+CARPOOL_REQUESTS = PagedQuery("""
+    SELECT cr.request_id, cr.carpool_id, cr.student_id, cr.status, c.start_point, c.destination, u.username
+    FROM carpool_requests cr
+    JOIN carpools c ON cr.carpool_id = c.carpool_id
+    JOIN users u ON cr.student_id = u.user_id
+    WHERE c.student_id = ? AND {keyset}
+""", ("cr.request_id",))
+UPCOMING_CARPOOLS = PagedQuery(f"""
+    SELECT c.carpool_id, c.start_point, c.destination, c.seats, c.price, c.date, c.time,
+        {CARPOOL_STOPS_COLUMN}, u.username, c.student_id
+    FROM carpools c
+    LEFT JOIN users u ON c.student_id = u.user_id
+    WHERE c.carpool_id IN (
+        SELECT carpool_id FROM carpool_requests WHERE student_id = ? AND status = 'accepted'
+        UNION
+        SELECT cr.carpool_id
+        FROM carpools mine
+        JOIN carpool_requests cr ON cr.carpool_id = mine.carpool_id
+        WHERE mine.student_id = ? AND cr.status = 'accepted'
+    )
+    AND {{keyset}}
+""", ("c.date", "c.time", "c.carpool_id"), (5, 6, 0))
+SEARCH_PROPERTIES = PagedQuery("""
+    SELECT p.property_id, p.address, p.city, p.state, p.zipcode, p.rooms_available,
+        p.bedrooms, p.kitchens, p.bathrooms
+    FROM properties p
+    WHERE p.state = ? AND p.visible = 1
+    AND p.property_id NOT IN (
+        SELECT property_id FROM leases WHERE tenant_id = ?
+    )
+    AND (p.city LIKE ? OR ? = '')
+    AND (p.bedrooms = ? OR ? = '')
+    AND {keyset}
+""", ("p.property_id",))
+RANKED_PROPERTIES = PagedQuery(f"""
+    SELECT p.property_id, p.address, p.city, p.state, p.zipcode, p.rooms_available,
+        p.bedrooms, p.kitchens, p.bathrooms,
+        bm25(properties_fts, {", ".join(map(str, PROPERTY_WEIGHTS))}) AS score
+    FROM properties_fts
+    JOIN properties p ON p.property_id = properties_fts.rowid
+    WHERE properties_fts MATCH ? AND p.visible = 1
+    AND (p.state = ? OR ? = '')
+    AND p.property_id NOT IN (
+        SELECT property_id FROM leases WHERE tenant_id = ?
+    )
+    AND (p.city LIKE ? OR ? = '')
+    AND (p.bedrooms = ? OR ? = '')
+    AND {{keyset}}
+""", ("score", "p.property_id"), (9, 0))
+SEARCH_CARPOOLS = PagedQuery(f"""
+    WITH pickup(carpool_id, seq, eta) AS (
+        SELECT c.carpool_id, 0, c.time
+        FROM carpools_fts
+        JOIN carpools c ON c.carpool_id = carpools_fts.rowid
+        WHERE carpools_fts MATCH ?
+        UNION ALL
+        SELECT s.carpool_id, s.seq, s.eta
+        FROM carpool_stops_fts
+        JOIN carpool_stops s ON s.stop_id = carpool_stops_fts.rowid
+        WHERE carpool_stops_fts MATCH ?
+    ),
+    dropoff(carpool_id, seq) AS (
+        SELECT rowid, 2147483647     -- The destination comes after every stop
+        FROM carpools_fts
+        WHERE carpools_fts MATCH ?
+        UNION ALL
+        SELECT s.carpool_id, s.seq
+        FROM carpool_stops_fts
+        JOIN carpool_stops s ON s.stop_id = carpool_stops_fts.rowid
+        WHERE carpool_stops_fts MATCH ?
+    )
+    SELECT c.carpool_id, c.start_point, c.destination, c.price, c.seats, c.date, c.time,
+        {CARPOOL_STOPS_COLUMN}, u.username
+    FROM carpools c
+    LEFT JOIN users u ON c.student_id = u.user_id
+    WHERE c.carpool_id IN (
+        SELECT pickup.carpool_id
+        FROM pickup
+        JOIN dropoff ON dropoff.carpool_id = pickup.carpool_id AND dropoff.seq > pickup.seq
+        WHERE (pickup.eta >= ? OR ? = '') AND (pickup.eta <= ? OR ? = '')
+    )
+    AND c.seats > 0
+    AND {{keyset}}
+""", ("c.carpool_id",))
+LIKE_CARPOOLS = PagedQuery(f"""
+    SELECT c.carpool_id, c.start_point, c.destination, c.price, c.seats, c.date, c.time,
+        {CARPOOL_STOPS_COLUMN}, u.username
+    FROM carpools c
+    LEFT JOIN users u ON c.student_id = u.user_id
+    WHERE (c.start_point LIKE ? OR EXISTS (
+        SELECT 1 FROM carpool_stops s WHERE s.carpool_id = c.carpool_id AND s.place LIKE ?
+    ))
+    AND c.destination LIKE ? AND c.seats > 0
+    AND (c.time >= ? OR ? = '') AND (c.time <= ? OR ? = '')
+    AND {{keyset}}
+""", ("c.carpool_id",))
+FUZZY_CARPOOLS = f"""
+    WITH matched(carpool_id, rank) AS (
+        SELECT rowid, rank     -- Start point and destination
+        FROM carpools_fts
+        WHERE carpools_fts MATCH ?
+        UNION ALL
+        SELECT s.carpool_id, carpool_stops_fts.rank     -- A stop for the start, and the destination
+        FROM carpool_stops_fts
+        JOIN carpool_stops s ON s.stop_id = carpool_stops_fts.rowid
+        WHERE carpool_stops_fts MATCH ?
+        AND s.carpool_id IN (SELECT rowid FROM carpools_fts WHERE carpools_fts MATCH ?)
+    )
+    SELECT c.carpool_id, c.start_point, c.destination, c.price, c.seats, c.date, c.time,
+        {CARPOOL_STOPS_COLUMN}, u.username
+    FROM (SELECT carpool_id, min(rank) AS rank FROM matched GROUP BY carpool_id) m
+    JOIN carpools c ON c.carpool_id = m.carpool_id
+    LEFT JOIN users u ON c.student_id = u.user_id
+    WHERE c.seats > 0
+    AND (c.time >= ? OR ? = '') AND (c.time <= ? OR ? = '')
+    ORDER BY m.rank
+    LIMIT ?
+"""
+BOOKMARK = "SELECT * FROM bookmarks WHERE student_id = ? AND property_id = ?"
+BOOKMARKED_PROPERTIES = PagedQuery("""
+    SELECT p.property_id, p.address, p.city, p.state, p.zipcode, p.bedrooms, p.kitchens, p.bathrooms, p.description,
+        b.bookmark_id
+    FROM bookmarks b
+    JOIN properties p ON b.property_id = p.property_id
+    WHERE b.student_id = ? AND {keyset}
+""", ("b.bookmark_id",), (9,))
+NOTIFICATIONS = PagedQuery("""
+    SELECT notification_id, message, status, count, created_at
+    FROM notifications
+    WHERE user_id = ? AND {keyset}
+""", ("status", "created_at", "notification_id"), (2, 4, 0), descending=True)
+
+# CarpoolObserver and EventObserver
+CARPOOL_PARTICIPANTS = """
+    SELECT cr.student_id
+    FROM carpool_requests cr
+    WHERE cr.carpool_id = ? AND cr.status = 'accepted'
+"""
+EVENT_PARTICIPANTS = """
+    SELECT ep.student_id
+    FROM event_participants ep
+    WHERE ep.event_id = ? AND ep.status = 'accepted'
+"""
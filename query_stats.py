@@ -0,0 +1,89 @@
+import re
+import sys
+import json
+import time
+import atexit
+import threading
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last bucket is open-ended
+BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000]
+
+# Modules whose frames are skipped when looking for the screen method that issued a statement
+_DATABASE_MODULES = {"db_connection", "query_stats", "loaders", "queries"}
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and IN (...) lists so the same statement always gets the same key."""
+    sql = " ".join(sql.split())
+    return re.sub(r"IN \((\?(, )?)+\)", "IN (?...)", sql)
+
+
+def calling_method():
+    """Qualified name of the first function outside the database layer on the call stack."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module not in _DATABASE_MODULES and not module.startswith("contextlib"):
+            code = frame.f_code
+            return getattr(code, "co_qualname", code.co_name)
+        frame = frame.f_back
+    return "<unknown>"
+
+
+class QueryStats:
+    """Per-statement latency histograms keyed by normalized SQL, plus a slow-query log."""
+
+    def __init__(self, slow_threshold_ms=100, slow_log_path="slow_queries.log"):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_log_path = slow_log_path
+        self.statements = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, elapsed, rows, caller):
+        """Add one execution; return True if it crossed the slow-query threshold."""
+        key = normalize_sql(sql)
+        elapsed_ms = elapsed * 1000
+        bucket = next((i for i, bound in enumerate(BUCKETS_MS) if elapsed_ms <= bound), len(BUCKETS_MS))
+        with self._lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                entry = self.statements[key] = {
+                    "count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "histogram": [0] * (len(BUCKETS_MS) + 1), "callers": {},
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["rows"] += max(rows, 0)
+            entry["histogram"][bucket] += 1
+            entry["callers"][caller] = entry["callers"].get(caller, 0) + 1
+        return self.slow_threshold_ms is not None and elapsed_ms >= self.slow_threshold_ms
+
+    def log_slow(self, sql, elapsed, rows, caller, plan):
+        """Append a slow statement and its EXPLAIN QUERY PLAN to the slow-query log."""
+        if not self.slow_log_path:
+            return
+        lines = [f"{time.strftime('%Y-%m-%d %H:%M:%S')}  {elapsed * 1000:.1f} ms  {rows} rows  {caller}",
+                 f"    {normalize_sql(sql)}"]
+        lines += [f"        {step}" for step in plan]
+        with self._lock, open(self.slow_log_path, "a") as log:
+            log.write("\n".join(lines) + "\n")
+
+    def summary(self):
+        """Aggregated stats per statement, slowest total time first."""
+        with self._lock:
+            rows = []
+            for sql, entry in self.statements.items():
+                rows.append(dict(entry, sql=sql, mean_ms=entry["total_ms"] / entry["count"], callers=dict(entry["callers"])))
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def dump_json(self, path):
+        with open(path, "w") as out:
+            json.dump({"buckets_ms": BUCKETS_MS, "statements": self.summary()}, out, indent=2)
+
+    def dump_at_exit(self, path):
+        atexit.register(self.dump_json, path)
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
@@ -0,0 +1,224 @@
+import os
+import sys
+import math
+import time
+import argparse
+import threading
+import traceback
+
+from db_connection import DatabaseConnection
+from initialize_db import DatabaseInitializer
+from observer import timestamp
+
+DEFAULT_MAX_AGE_DAYS = 180
+DEFAULT_MAX_PER_USER = 500
+DEFAULT_VACUUM_FRACTION = 0.25     # Used by the command line; the background job never vacuums
+
+EXPIRED = "SELECT notification_id FROM notifications WHERE created_at < ? ORDER BY created_at LIMIT ?"
+USERS_AFTER = "SELECT user_id FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?"
+# Notifications of the users in an id range beyond each user's newest max_per_user
+OVER_LIMIT = """
+    SELECT notification_id FROM (
+        SELECT notification_id,
+            row_number() OVER (PARTITION BY user_id ORDER BY notification_id DESC) AS newer
+        FROM notifications
+        WHERE user_id BETWEEN ? AND ?
+    )
+    WHERE newer > ?
+    LIMIT ?
+"""
+REMOVE = "DELETE FROM notifications WHERE notification_id IN ({keys})"
+
+
+def _setting(environ, name, parse, default):
+    """parse(environ[name]) if it is a finite number of zero or more, otherwise default (with a warning if set)."""
+    value = environ.get(name)
+    if value is None:
+        return default
+    try:
+        number = parse(value)
+        if not math.isfinite(number) or number < 0:
+            raise ValueError(value)
+    except ValueError:
+        print(f"Ignoring {name}={value!r}: expected a number of zero or more, using {default}.", file=sys.stderr)
+        return default
+    return number
+
+
+class NotificationCompactor:
+    """Deletes old notifications in small batches on a background thread.
+
+    Two rules decide what goes, and either can be turned off with None: notifications older than
+    max_age_days, and everything but the newest max_per_user notifications of each user. Each
+    batch of at most batch_size rows is removed in its own short transaction, with a pause after
+    it, so the app's own writes never wait long for the lock. The unread counters are kept right
+    by the notification triggers.
+
+    With an archive path, removed rows are first copied into a notifications table in that
+    database (attached as "archive") in the same transaction. After a pass that removed at least
+    optimize_after rows the planner statistics are refreshed with PRAGMA optimize. With a
+    vacuum_fraction the file is also vacuumed once more than that fraction of its pages are free;
+    VACUUM holds the write lock while it rewrites the whole file, so only pass one when nothing
+    else is using the database (the command line does, the app does not).
+    """
+
+    def __init__(self, max_age_days=DEFAULT_MAX_AGE_DAYS, max_per_user=DEFAULT_MAX_PER_USER, archive=None,
+                 batch_size=500, users_per_batch=200, pause=0.05, interval=3600, optimize_after=10000,
+                 vacuum_fraction=None):
+        self.max_age_days = max_age_days
+        self.max_per_user = max_per_user
+        self.archive = archive
+        self.batch_size = batch_size
+        self.users_per_batch = users_per_batch     # Users whose notifications are ranked per max_per_user batch
+        self.pause = pause     # Seconds between batches, leaving the write lock free for the app
+        self.interval = interval     # Seconds between passes when running in the background
+        self.optimize_after = optimize_after
+        self.vacuum_fraction = vacuum_fraction
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_environment(cls, environ=os.environ):
+        """The compactor configured by the HOUSING_APP_NOTIFICATION_* variables, or None when it is turned off.
+
+        HOUSING_APP_NOTIFICATION_RETENTION=off turns it off. HOUSING_APP_NOTIFICATION_MAX_AGE_DAYS and
+        HOUSING_APP_NOTIFICATION_MAX_PER_USER override the limits, and 0 turns that rule off; a value
+        that is not a number of zero or more is reported on stderr and the default is used instead.
+        HOUSING_APP_NOTIFICATION_ARCHIVE is a database to copy deleted notifications into.
+        """
+        if environ.get("HOUSING_APP_NOTIFICATION_RETENTION", "on").lower() in ("off", "0", "false", "no"):
+            return None
+        max_age_days = _setting(environ, "HOUSING_APP_NOTIFICATION_MAX_AGE_DAYS", float, DEFAULT_MAX_AGE_DAYS)
+        max_per_user = _setting(environ, "HOUSING_APP_NOTIFICATION_MAX_PER_USER", int, DEFAULT_MAX_PER_USER)
+        return cls(max_age_days=max_age_days or None, max_per_user=max_per_user or None,
+                   archive=environ.get("HOUSING_APP_NOTIFICATION_ARCHIVE") or None)
+
+    def start(self):
+        """Run a pass now and then every `interval` seconds on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="notification-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop after the current batch."""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_pass()
+            except Exception:
+                print("Notification compaction failed:", file=sys.stderr)
+                traceback.print_exc()
+            self._stop.wait(self.interval)
+        DatabaseConnection().release()
+
+    def run_pass(self):
+        """Apply both rules until nothing more is due and return (expired, over the limit) row counts."""
+        db = DatabaseConnection()
+        if self.archive:
+            self._attach(db)
+        try:
+            expired = self._expire(db) if self.max_age_days is not None else 0
+            trimmed = self._trim(db) if self.max_per_user is not None else 0
+        finally:
+            if self.archive:
+                db.query("DETACH DATABASE archive")
+        if expired + trimmed >= self.optimize_after:
+            self._maintain(db)
+        return expired, trimmed
+
+    def _attach(self, db):
+        db.query("ATTACH DATABASE ? AS archive", (self.archive,))
+        db.query("""
+            CREATE TABLE IF NOT EXISTS archive.notifications (
+                notification_id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                status TEXT,
+                subject TEXT,
+                count INTEGER NOT NULL DEFAULT 1,
+                created_at TEXT,
+                archived_at TEXT
+            )
+        """)
+
+    def _expire(self, db):
+        cutoff = timestamp(time.time() - self.max_age_days * 86400)
+        removed = 0
+        while not self._stop.is_set():
+            ids = [row[0] for row in db.fetch(EXPIRED, (cutoff, self.batch_size))]
+            if not ids:
+                break
+            removed += self._remove(db, ids)
+            self._stop.wait(self.pause)
+        return removed
+
+    def _trim(self, db):
+        # Walk the users in id order, a range at a time, ranking each user's notifications newest first
+        removed = 0
+        after = 0
+        while not self._stop.is_set():
+            users = db.fetch(USERS_AFTER, (after, self.users_per_batch))
+            if not users:
+                break
+            ids = [row[0] for row in db.fetch(OVER_LIMIT, (users[0][0], users[-1][0], self.max_per_user, self.batch_size))]
+            if ids:
+                removed += self._remove(db, ids)
+                self._stop.wait(self.pause)
+            if len(ids) < self.batch_size:     # A full batch may have left more in this range
+                after = users[-1][0]
+        return removed
+
+    def _remove(self, db, ids):
+        placeholders = ", ".join("?" * len(ids))
+        with db.transaction():
+            if self.archive:
+                # REPLACE: in WAL mode a crash can commit the copy without the delete; the next pass copies it again
+                db.query(f"""
+                    INSERT OR REPLACE INTO archive.notifications
+                    SELECT notification_id, user_id, message, status, subject, count, created_at, ?
+                    FROM notifications WHERE notification_id IN ({placeholders})
+                """, (timestamp(), *ids))
+            db.query(REMOVE.format(keys=placeholders), ids)
+        return len(ids)
+
+    def _maintain(self, db):
+        db.query("PRAGMA optimize")
+        if self.vacuum_fraction is None:
+            return
+        free = db.fetch("PRAGMA freelist_count")[0][0]
+        pages = db.fetch("PRAGMA page_count")[0][0]
+        if pages and free / pages > self.vacuum_fraction:
+            db.query("VACUUM")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete old notifications once, in small batches.")
+    parser.add_argument("--db", default="housing_app.db", help="Path to the SQLite database file.")
+    parser.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help="Delete notifications older than this.")
+    parser.add_argument("--max-per-user", type=int, default=DEFAULT_MAX_PER_USER,
+                        help="Keep only this many of each user's newest.")
+    parser.add_argument("--no-max-age", action="store_true", help="Don't expire notifications by age.")
+    parser.add_argument("--no-max-per-user", action="store_true", help="Don't limit notifications per user.")
+    parser.add_argument("--archive", help="Copy deleted notifications into this SQLite database first.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Notifications deleted per transaction.")
+    parser.add_argument("--vacuum-fraction", type=float, default=DEFAULT_VACUUM_FRACTION,
+                        help="After a large cleanup, VACUUM once more than this fraction of pages are free.")
+    parser.add_argument("--no-vacuum", action="store_true", help="Never VACUUM.")
+    args = parser.parse_args()
+
+    initializer = DatabaseInitializer(args.db)
+    initializer.migrate()
+    initializer.close()
+
+    DatabaseConnection(args.db)
+    compactor = NotificationCompactor(max_age_days=None if args.no_max_age else args.max_age_days,
+                                      max_per_user=None if args.no_max_per_user else args.max_per_user,
+                                      archive=args.archive, batch_size=args.batch_size, pause=0,
+                                      vacuum_fraction=None if args.no_vacuum else args.vacuum_fraction)
+    started = time.perf_counter()
+    expired, trimmed = compactor.run_pass()
+    print(f"Deleted {expired} expired and {trimmed} over-the-limit notifications "
+          f"in {time.perf_counter() - started:.1f} s.")
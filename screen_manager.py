@@ -0,0 +1,125 @@
+import functools
+import tkinter as tk
+
+from db_connection import DatabaseConnection
+
+
+class ScreenManager:
+    """Keeps built screens as stacked frames in the root window and switches between them with tkraise.
+
+    A cached screen is built once and raised again on later visits instead of being destroyed and
+    rebuilt. It lists the tables it reads, and any write to one of them marks it stale: the next
+    time it is shown the frame is kept and the widgets in it that read data (VirtualLists and
+    load_async frames, registered with on_refresh) reload. Transient screens (forms, one-off
+    results) are not cached: each one is destroyed as soon as another screen is shown.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.current = None     # Frame of the screen on top; screens build their widgets into it
+        self._frames = {}     # key -> frame of a cached screen
+        self._tables = {}     # key -> tables the cached screen reads
+        self._refreshers = {}     # frame of a cached screen -> [(widget, reload)] run when it is shown stale
+        self._stale = set()
+        self._transient = None
+        root.grid_rowconfigure(0, weight=1)
+        root.grid_columnconfigure(0, weight=1)
+        DatabaseConnection().write_listeners.append(self.table_changed)
+
+    @classmethod
+    def for_root(cls, root):
+        """The screen manager attached to a Tk root, created on first use."""
+        manager = getattr(root, "_screen_manager", None)
+        if manager is None:
+            manager = root._screen_manager = cls(root)
+        return manager
+
+    def _new_frame(self):
+        frame = tk.Frame(self.root)
+        frame.grid(row=0, column=0, sticky="nsew")     # Every screen shares the same cell
+        return frame
+
+    def _raise(self, frame):
+        if self._transient is not None and self._transient is not frame:
+            self._transient.destroy()
+            self._transient = None
+        self.current = frame
+        frame.tkraise()
+
+    def show(self, key, build, tables=()):
+        """Raise the cached screen for key, calling build() to fill a new frame if it is missing.
+
+        A stale screen keeps its frame; its registered widgets reload their data instead.
+        """
+        frame = self._frames.get(key)
+        stale = key in self._stale
+        self._stale.discard(key)
+
+        if frame is not None:
+            self._raise(frame)
+            if stale:
+                self._refresh(frame)
+            return
+        frame = self._frames[key] = self._new_frame()
+        self._tables[key] = set(tables)
+        self._refreshers[frame] = []
+        self._raise(frame)
+        build()
+
+    def on_refresh(self, widget, reload):
+        """Call reload() when the cached screen holding widget is shown after going stale.
+
+        Widgets on transient screens are ignored: those are rebuilt on every visit anyway.
+        """
+        frame = widget
+        while frame is not None and frame not in self._refreshers:
+            frame = frame.master
+        if frame is not None:
+            self._refreshers[frame].append((widget, reload))
+
+    def _refresh(self, frame):
+        live = self._refreshers[frame] = [entry for entry in self._refreshers[frame] if entry[0].winfo_exists()]
+        for widget, reload in live:
+            if widget.winfo_exists():     # An earlier reload may have replaced it (a load_async frame re-rendering)
+                reload()
+
+    def transient(self):
+        """Raise a fresh frame for a screen that is thrown away when the user leaves it."""
+        frame = self._new_frame()
+        self._raise(frame)
+        self._transient = frame
+        return frame
+
+    def table_changed(self, table):
+        # May be called from the database worker thread, so only mark screens here; widgets are
+        # reloaded on the Tk thread by show()
+        self._stale.update(key for key, tables in list(self._tables.items()) if table in tables)
+
+    def clear(self):
+        """Destroy every screen, e.g. on logout so nothing built for one user is shown to the next."""
+        for frame in self._frames.values():
+            frame.destroy()
+        if self._transient is not None:
+            self._transient.destroy()
+        self._frames.clear()
+        self._tables.clear()
+        self._refreshers.clear()
+        self._stale.clear()
+        self._transient = None
+        self.current = None
+
+
+def cached_screen(*tables):
+    """Build a Screen method's screen once and raise it again on later visits.
+
+    The cache key is the screen class, the logged-in user and the method's arguments. Writes to any
+    of `tables` mark the screen stale so the next visit reloads its lists with fresh data.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def show(self, *args):
+            session = getattr(self, "session", None)
+            key = (type(self).__name__, session.user_id if session else None, method.__name__) + args
+            ScreenManager.for_root(self.root).show(key, lambda: method(self, *args), tables)
+        return show
+    return decorate
@@ -0,0 +1,70 @@
+import re
+
+# Relative weight of each properties_fts column in bm25: address, city, state, zipcode, description
+PROPERTY_WEIGHTS = (3.0, 2.0, 1.0, 2.0, 1.0)
+
+
+def match_expression(text):
+    """Turn free text typed by a user into an FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix term ("main"* matches Main and Maine) and the terms are
+    ANDed, so punctuation or FTS5 operators in the input can never produce a syntax error.
+    Returns None if the text has no searchable words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+# Fraction of a typed place name's trigrams that must appear in a stored one for a fuzzy match
+FUZZY_THRESHOLD = 0.5
+FUZZY_CANDIDATES = 200     # Best-ranked index matches scored in Python on a fuzzy search
+
+
+def trigrams(text):
+    """The set of lower-cased three-character windows of text, with whitespace collapsed."""
+    text = " ".join(text.lower().split())
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(typed, stored):
+    """How much of `typed` appears in `stored`, from 0 to 1, by shared trigrams.
+
+    Only the typed text's trigrams count, so a short place name typed in full scores 1 against
+    a longer stored value that contains it, and a misspelling loses only the trigrams it breaks.
+    """
+    wanted = trigrams(typed)
+    if not wanted:
+        return 0.0
+    return len(wanted & trigrams(stored or "")) / len(wanted)
+
+
+def _quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def substring_expression(columns, text):
+    """MATCH expression for `text` anywhere inside any of `columns` of a trigram-tokenized table.
+
+    Returns None when the text is shorter than a trigram and so cannot use the index.
+    """
+    text = " ".join(text.split())
+    if len(text) < 3:
+        return None
+    return f"{{{' '.join(columns)}}} : {_quote(text)}"
+
+
+def fuzzy_expression(columns, text):
+    """MATCH expression for rows sharing any trigram with `text` in `columns`, for a fuzzy search."""
+    grams = sorted(trigrams(text))
+    if not grams:
+        return None
+    return f"{{{' '.join(columns)}}} : ({' OR '.join(_quote(gram) for gram in grams)})"
+
+
+# The stops of carpool `c` in route order, formatted for display: "Main St (ETA: 10:00); Elm Rd (ETA: 10:10)"
+CARPOOL_STOPS_COLUMN = """(
+    SELECT group_concat(place || COALESCE(' (ETA: ' || eta || ')', ''), '; ')
+    FROM (SELECT place, eta FROM carpool_stops WHERE carpool_id = c.carpool_id ORDER BY seq)
+) AS stops"""
@@ -0,0 +1,131 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))     # The modules live in the repo root
+
+from db_connection import DatabaseConnection
+from initialize_db import DatabaseInitializer
+from observer import timestamp
+
+
+def migrate(path, dry_run=False):
+    """Migrate the database at path quietly and return what migrate() returned."""
+    initializer = DatabaseInitializer(path)
+    try:
+        with redirect_stdout(io.StringIO()):
+            return initializer.migrate(dry_run=dry_run)
+    finally:
+        initializer.close()
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Each test gets a freshly migrated database in a temporary directory."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "test.db")
+        migrate(self.path)
+        if DatabaseConnection._instance is not None:
+            DatabaseConnection().close()
+        self.db = DatabaseConnection(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def last_id(self, table, column):
+        return self.db.fetch(f"SELECT max({column}) FROM {table}")[0][0]
+
+    def add_user(self, username, role="student"):
+        self.db.query("INSERT INTO users (username, password, email, role, phone_number) VALUES (?, ?, ?, ?, ?)",
+                      (username, "password", f"{username}@example.com", role, "555-0100"))
+        return self.last_id("users", "user_id")
+
+    def add_property(self, homeowner_id, bedrooms=2, state="NY", city="Albany"):
+        self.db.query("""
+            INSERT INTO properties (homeowner_id, address, bedrooms, kitchens, bathrooms, state, city)
+            VALUES (?, ?, ?, 1, 1, ?, ?)
+        """, (homeowner_id, f"{bedrooms} Main St", bedrooms, state, city))
+        return self.last_id("properties", "property_id")
+
+    def add_lease(self, property_id, tenant_id):
+        self.db.query("""
+            INSERT INTO leases (property_id, tenant_id, start_date, end_date, rent_amount)
+            VALUES (?, ?, '2026-01-01', '2026-12-31', 800)
+        """, (property_id, tenant_id))
+        return self.last_id("leases", "lease_id")
+
+    def add_notification(self, user_id, message, created_at=None, status="unread"):
+        self.db.query("INSERT INTO notifications (user_id, message, subject, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                      (user_id, message, message, status, created_at or timestamp()))
+        return self.last_id("notifications", "notification_id")
+
+
+class Owner:
+    """Stands in for the widget that owns a job or a feed: destroy() fires its <Destroy> bindings."""
+
+    def __init__(self):
+        self.alive = True
+        self.bindings = []
+
+    def winfo_exists(self):
+        return self.alive
+
+    def bind(self, event, callback, add=None):
+        self.bindings.append(callback)
+
+    def destroy(self):
+        self.alive = False
+        for callback in self.bindings:
+            callback(None)
+
+
+class FakeRoot:
+    """Stands in for a Tk root: after() callbacks run from run(), on a virtual clock."""
+
+    def __init__(self):
+        self.now = 0
+        self.pending = []     # (due, sequence, callback)
+        self.sequence = 0
+        self.cancelled = set()
+        self.errors = []
+
+    def after(self, ms, callback):
+        self.sequence += 1
+        self.pending.append((self.now + ms, self.sequence, callback))
+        return self.sequence
+
+    def after_cancel(self, timer):
+        self.cancelled.add(timer)
+
+    def report_callback_exception(self, kind, error, traceback):
+        self.errors.append(error)
+
+    def run(self, ms):
+        """Advance the clock by ms, running the callbacks that fall due (with a pause for the worker thread)."""
+        end = self.now + ms
+        while True:
+            due = sorted(entry for entry in self.pending if entry[0] <= end)
+            if not due:
+                break
+            entry = due[0]
+            self.pending.remove(entry)
+            self.now = entry[0]
+            if entry[1] not in self.cancelled:
+                entry[2]()
+                time.sleep(0.002)
+        self.now = end
+
+    def run_until(self, condition, timeout=5):
+        """Run in steps until condition() is true; fails the test after timeout seconds of real time."""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                raise AssertionError("Timed out waiting for the Tk callbacks")
+            self.run(15)
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import queries
+from app import normalize_time
+from initialize_db import DatabaseInitializer, MIGRATIONS
+from search import fuzzy_expression, substring_expression
+from support import DatabaseTestCase, migrate
+
+
+class SplitCarpoolStopsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "test.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_stops_string_becomes_rows(self):
+        later = MIGRATIONS[6:]     # Stop before migration 7 so carpools still has the stops column
+        del MIGRATIONS[6:]
+        try:
+            migrate(self.path)
+        finally:
+            MIGRATIONS.extend(later)
+        initializer = DatabaseInitializer(self.path)
+        initializer.cursor.execute("""
+            INSERT INTO carpools (student_id, start_point, destination, seats, price, date, time, stops)
+            VALUES (1, 'Albany', 'Boston', 3, 20, '2026-11-01', '09:00', 'Main St (ETA: 10:00); Elm Rd; ; Oak Ave (ETA: 10:20)')
+        """)
+        initializer.close()
+
+        migrate(self.path)
+        initializer = DatabaseInitializer(self.path)
+        stops = initializer.cursor.execute("SELECT seq, place, eta FROM carpool_stops ORDER BY seq").fetchall()
+        columns = [row[1] for row in initializer.cursor.execute("PRAGMA table_info(carpools)")]
+        initializer.close()
+        self.assertEqual(stops, [(1, "Main St", "10:00"), (2, "Elm Rd", None), (3, "Oak Ave", "10:20")])
+        self.assertNotIn("stops", columns)
+
+
+class NormalizeTimeTest(unittest.TestCase):
+    def test_pads_the_hour(self):
+        self.assertEqual(normalize_time("9:05"), "09:05")
+        self.assertEqual(normalize_time("23:59"), "23:59")
+
+    def test_rejects_invalid_times(self):
+        for text in ("24:00", "12:60", "9:5", "0930", "noon", ""):
+            self.assertIsNone(normalize_time(text), text)
+
+
+class CarpoolRouteTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        driver = self.add_user("driver")
+        self.db.query("""
+            INSERT INTO carpools (student_id, start_point, destination, seats, price, date, time)
+            VALUES (?, 'Albany', 'Boston', 3, 20, '2026-11-01', '09:00')
+        """, (driver,))
+        self.carpool = self.last_id("carpools", "carpool_id")
+        self.db.query_many("INSERT INTO carpool_stops (carpool_id, seq, place, eta) VALUES (?, ?, ?, ?)",
+                           [(self.carpool, 1, "Springfield", "10:00"), (self.carpool, 2, "Worcester", "11:00")])
+
+    def search(self, start, destination, earliest="", latest=""):
+        page = queries.SEARCH_CARPOOLS.fetch_page(self.db, (
+            substring_expression(("start_point",), start), substring_expression(("place",), start),
+            substring_expression(("destination",), destination), substring_expression(("place",), destination),
+            earliest, earliest, latest, latest))
+        return [row.carpool_id for row in page.rows]
+
+    def test_pickup_and_dropoff_along_the_route(self):
+        self.assertEqual(self.search("Albany", "Boston"), [self.carpool])
+        self.assertEqual(self.search("Springfield", "Boston"), [self.carpool])
+        self.assertEqual(self.search("Springfield", "Worcester"), [self.carpool])
+        self.assertEqual(self.search("Albany", "Worcester"), [self.carpool])
+
+    def test_dropoff_must_come_after_pickup(self):
+        self.assertEqual(self.search("Worcester", "Springfield"), [])
+        self.assertEqual(self.search("Boston", "Albany"), [])
+        self.assertEqual(self.search("Worcester", "Albany"), [])
+
+    def test_pickup_time_is_the_stop_eta(self):
+        self.assertEqual(self.search("Springfield", "Boston", earliest="09:30"), [self.carpool])
+        self.assertEqual(self.search("Springfield", "Boston", earliest="10:30"), [])
+        self.assertEqual(self.search("Albany", "Boston", latest="08:30"), [])
+
+    def test_fuzzy_candidates_include_stops(self):
+        def candidates(start, destination):
+            rows = self.db.fetch(queries.FUZZY_CARPOOLS, (
+                f"{fuzzy_expression(('start_point',), start)} AND {fuzzy_expression(('destination',), destination)}",
+                fuzzy_expression(("place",), start), fuzzy_expression(("destination",), destination),
+                "", "", "", "", 10), records=True)
+            return [row.carpool_id for row in rows]
+        self.assertEqual(candidates("Albny", "Bostn"), [self.carpool])
+        self.assertEqual(candidates("Sprngfield", "Bostn"), [self.carpool])     # Matched on a stop
+        self.assertEqual(candidates("Sprngfield", "Chicago"), [])
@@ -0,0 +1,212 @@
+import sqlite3
+import threading
+
+import queries
+from db_connection import DatabaseConnection, ConnectionPool
+from support import DatabaseTestCase
+
+
+class FetchPageTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.query("CREATE TABLE items (item_id INTEGER PRIMARY KEY, category TEXT NOT NULL, name TEXT)")
+        self.db.query("CREATE INDEX idx_items_category ON items(category, item_id)")
+        self.db.query_many("INSERT INTO items (category, name) VALUES (?, ?)",
+                           [("abc"[n % 3], f"Item {n}") for n in range(40)])
+        self.sql = "SELECT item_id, category, name FROM items WHERE name LIKE 'Item%' AND {keyset}"
+
+    def read_pages(self, order_by, key, descending=False, page_size=7):
+        rows, after = [], None
+        while True:
+            page = self.db.fetch_page(self.sql, (), order_by, key, after=after, page_size=page_size,
+                                      descending=descending)
+            rows.extend(page.rows)
+            after = page.after
+            if not page.has_more:
+                return rows
+
+    def test_single_column_pages_cover_every_row_once(self):
+        everything = self.db.fetch("SELECT item_id, category, name FROM items ORDER BY item_id")
+        self.assertEqual(self.read_pages(("item_id",), (0,)), everything)
+        self.assertEqual(self.read_pages(("item_id",), (0,), descending=True), everything[::-1])
+
+    def test_composite_key_pages_cover_every_row_once(self):
+        everything = self.db.fetch("SELECT item_id, category, name FROM items ORDER BY category, item_id")
+        self.assertEqual(self.read_pages(("category", "item_id"), (1, 0)), everything)
+        self.assertEqual(self.read_pages(("category", "item_id"), (1, 0), descending=True), everything[::-1])
+
+    def test_composite_key_seeks_on_every_column(self):
+        sql = self.db.page_sql(self.sql, ("category", "item_id"), descending=True, key=(1, 0))
+        plan = [row[3] for row in self.db.fetch("EXPLAIN QUERY PLAN " + sql, (None,) * sql.count("?"))]
+        self.assertIn("SEARCH items USING INDEX idx_items_category (category=? AND item_id<?)", plan)
+        self.assertIn("SEARCH items USING INDEX idx_items_category (category<?)", plan)
+        self.assertFalse([line for line in plan if "TEMP B-TREE" in line])
+
+    def test_last_page(self):
+        page = self.db.fetch_page(self.sql, (), ("item_id",), page_size=40)
+        self.assertEqual(len(page.rows), 40)
+        self.assertFalse(page.has_more)
+        page = self.db.fetch_page(self.sql, (), ("item_id",), after=page.after)
+        self.assertEqual(page.rows, [])
+        self.assertFalse(page.has_more)
+
+
+class PagedQueryTest(DatabaseTestCase):
+    def test_search_pages_do_not_sort(self):
+        sql = queries.SEARCH_PROPERTIES.page_sql()
+        plan = [row[3] for row in self.db.fetch("EXPLAIN QUERY PLAN " + sql, (None,) * sql.count("?"))]
+        self.assertFalse([line for line in plan if "TEMP B-TREE" in line])
+
+    def test_search_pages(self):
+        homeowner = self.add_user("owner", "homeowner")
+        student = self.add_user("ann")
+        ids = [self.add_property(homeowner, state="NY" if n % 2 else "VT") for n in range(12)]
+        parameters = ("NY", student, "%", "", "", "")
+        page = queries.SEARCH_PROPERTIES.fetch_page(self.db, parameters, page_size=4)
+        rest = queries.SEARCH_PROPERTIES.fetch_page(self.db, parameters, after=page.after, page_size=4)
+        self.assertTrue(page.has_more)
+        self.assertFalse(rest.has_more)
+        self.assertEqual([row.property_id for row in page.rows + rest.rows], ids[1::2])
+        self.assertEqual({row.state for row in page.rows + rest.rows}, {"NY"})
+
+    def test_maintenance_requests_page_across_leases(self):
+        homeowner = self.add_user("owner", "homeowner")
+        student = self.add_user("ann")
+        properties = [self.add_property(homeowner, bedrooms=3) for _ in range(2)]
+        for property_id in reversed(properties):     # The later property's lease comes first
+            self.add_lease(property_id, student)
+        for n in range(5):
+            self.db.query("""
+                INSERT INTO maintenance_requests (property_id, tenant_id, description, date, status)
+                VALUES (?, ?, ?, '2026-10-01', 'pending')
+            """, (properties[n % 2], student, f"Issue {n}"))
+
+        page = queries.MY_MAINTENANCE_REQUESTS.fetch_page(self.db, (student,), page_size=2)
+        rest = queries.MY_MAINTENANCE_REQUESTS.fetch_page(self.db, (student,), after=page.after, page_size=3)
+        self.assertEqual([row.description for row in page.rows + rest.rows], ["Issue 1", "Issue 3", "Issue 0", "Issue 2", "Issue 4"])
+        self.assertFalse(rest.has_more)
+
+
+class RecordsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = [self.add_user(f"user{n}") for n in range(7)]
+        self.sql = "SELECT user_id, username AS name FROM users ORDER BY user_id"
+
+    def test_fetch_records_are_named_after_the_columns(self):
+        rows = self.db.fetch(self.sql, records=True)
+        self.assertEqual([(row.user_id, row.name) for row in rows], [(user, f"user{n}") for n, user in enumerate(self.users)])
+        self.assertEqual(rows[0], (self.users[0], "user0"))     # Still a tuple
+        self.assertIs(type(rows[0]), type(self.db.fetch(self.sql, records=True)[0]))     # The type is built once per column list
+
+    def test_stream_records(self):
+        rows = list(self.db.stream(self.sql, batch_size=3, records=True))
+        self.assertEqual([row.name for row in rows], [f"user{n}" for n in range(7)])
+
+    def test_stream_row_type(self):
+        class User:
+            __slots__ = ("user_id", "name")
+
+            def __init__(self, user_id, name):
+                self.user_id, self.name = user_id, name
+        rows = list(self.db.stream(self.sql, row_type=User))
+        self.assertEqual([row.user_id for row in rows], self.users)
+
+    def test_closing_a_stream_early_stops_reading(self):
+        self.db.stats.reset()
+        rows = self.db.stream(self.sql, batch_size=3, records=True)
+        self.assertEqual([next(rows).name for _ in range(2)], ["user0", "user1"])
+        rows.close()
+        entry = self.db.stats.statements[self.sql]
+        self.assertEqual((entry["count"], entry["rows"]), (1, 3))     # Only the first batch was read
+
+
+class ConnectionPoolTest(DatabaseTestCase):
+    def connection_of_thread(self):
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.db.connection))
+        thread.start()
+        thread.join()
+        return connections[0]
+
+    def test_one_instance(self):
+        self.assertIs(DatabaseConnection(), self.db)
+        instances = []
+        threads = [threading.Thread(target=lambda: instances.append(DatabaseConnection())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(instance is self.db for instance in instances))
+
+    def test_each_thread_has_its_own_connection(self):
+        mine = self.db.connection
+        self.assertIs(self.db.connection, mine)
+        self.assertIsNot(self.connection_of_thread(), mine)
+
+    def test_released_connection_is_reused(self):
+        mine = self.db.connection
+        self.db.release()
+        self.assertIs(self.connection_of_thread(), mine)
+
+    def test_pool_size_is_a_limit(self):
+        pool = ConnectionPool(self.path, size=2)
+        first, second = pool.acquire(), pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        pool.release(second)
+        self.assertIs(pool.acquire(timeout=0.05), second)
+        self.assertIsNot(first, second)
+        pool.close_all()
+
+    def test_connections_use_wal(self):
+        self.assertEqual(self.db.fetch("PRAGMA journal_mode")[0][0], "wal")
+
+
+class TransactionTest(DatabaseTestCase):
+    def usernames(self):
+        return [row[0] for row in self.db.fetch("SELECT username FROM users ORDER BY user_id")]
+
+    def test_commits_every_write_together(self):
+        with self.db.transaction():
+            self.add_user("ann")
+            self.add_user("bob")
+        self.db.release()     # Read back on a fresh connection
+        self.assertEqual(self.usernames(), ["ann", "bob"])
+
+    def test_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.db.transaction():
+                self.add_user("ann")
+                raise ValueError
+        self.assertEqual(self.usernames(), [])
+
+    def test_nested_blocks_join_the_outermost(self):
+        with self.assertRaises(ValueError):
+            with self.db.transaction():
+                with self.db.transaction():
+                    self.add_user("ann")
+                self.assertTrue(self.db.connection.in_transaction)     # The inner block did not commit
+                raise ValueError
+        self.assertEqual(self.usernames(), [])
+
+    def test_takes_the_write_lock_as_it_starts(self):
+        other = sqlite3.connect(self.path, timeout=0)
+        try:
+            with self.db.transaction():
+                with self.assertRaises(sqlite3.OperationalError):
+                    other.execute("BEGIN IMMEDIATE")
+        finally:
+            other.close()
+
+    def test_after_commit(self):
+        calls = []
+        self.db.after_commit(lambda: calls.append("now"))
+        with self.db.transaction():
+            self.db.after_commit(lambda: calls.append("committed"))
+            self.assertEqual(calls, ["now"])
+        with self.assertRaises(ValueError):
+            with self.db.transaction():
+                self.db.after_commit(lambda: calls.append("rolled back"), on_rollback=lambda: calls.append("undone"))
+                raise ValueError
+        self.assertEqual(calls, ["now", "committed", "undone"])
@@ -0,0 +1,64 @@
+import time
+
+from db_worker import DatabaseWorker
+from support import DatabaseTestCase, FakeRoot, Owner
+
+# Counts to ten million, which takes seconds unless it is interrupted
+SLOW_QUERY = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10000000) SELECT count(*) FROM n"
+
+
+class DatabaseWorkerTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = FakeRoot()
+        self.worker = DatabaseWorker(self.root)
+        self.results = []
+
+    def test_result_is_delivered_on_the_root(self):
+        self.worker.submit(lambda db: db.fetch("SELECT 41 + 1")[0][0], self.results.append)
+        self.assertEqual(self.results, [])     # Nothing is delivered outside the root's callbacks
+        self.root.run_until(lambda: self.results)
+        self.assertEqual(self.results, [42])
+
+    def test_errors_go_to_on_error(self):
+        errors = []
+        self.worker.submit(lambda db: db.fetch("SELECT * FROM missing_table"), self.results.append, on_error=errors.append)
+        self.root.run_until(lambda: errors)
+        self.assertEqual(self.results, [])
+        self.assertIn("missing_table", str(errors[0]))
+
+    def test_result_for_a_destroyed_owner_is_dropped(self):
+        owner = Owner()
+        job = self.worker.submit(lambda db: 1, self.results.append, owner=owner)
+        owner.alive = False
+        self.root.run_until(lambda: self.worker._outstanding == 0)
+        self.assertEqual(self.results, [])
+        self.assertFalse(job.cancelled)
+
+    def test_writes_run_on_the_worker_and_commit(self):
+        def write(db):
+            with db.transaction():
+                db.query("INSERT INTO users (username, password, email, role, phone_number) VALUES ('bob', 'password', 'b@example.com', 'student', '555-0101')")
+            return db.connection
+
+        self.worker.submit(write, self.results.append)
+        self.root.run_until(lambda: self.results)
+        self.assertIsNot(self.results[0], self.db.connection)     # The worker thread has a connection of its own
+        self.assertEqual(self.db.fetch("SELECT count(*) FROM users WHERE username = 'bob'")[0][0], 1)
+
+    def test_newer_job_with_the_same_tag_interrupts_the_running_one(self):
+        started = time.monotonic()
+        first = self.worker.submit(lambda db: db.fetch(SLOW_QUERY), self.results.append, tag="search")
+        time.sleep(0.1)     # Let the worker start on the slow query
+        self.worker.submit(lambda db: "second", self.results.append, tag="search")
+        self.root.run_until(lambda: self.results, timeout=15)
+
+        self.assertEqual(self.results, ["second"])
+        self.assertTrue(first.cancelled)
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_untagged_jobs_are_not_superseded(self):
+        for n in range(3):
+            self.worker.submit(lambda db, n=n: n, self.results.append)
+        self.root.run_until(lambda: len(self.results) == 3)
+        self.assertEqual(self.results, [0, 1, 2])
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from support import DatabaseTestCase, migrate
+import initialize_db
+from initialize_db import DatabaseInitializer, MIGRATIONS
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "test.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def schema_version(self):
+        initializer = DatabaseInitializer(self.path)
+        try:
+            return initializer.schema_version()
+        finally:
+            initializer.close()
+
+    def test_dry_run_changes_nothing(self):
+        pending = migrate(self.path, dry_run=True)
+        self.assertEqual(pending, [(version, name) for version, name, steps in MIGRATIONS])
+        self.assertEqual(self.schema_version(), 0)
+
+    def test_migrate_applies_everything_once(self):
+        self.assertEqual(len(migrate(self.path)), len(MIGRATIONS))
+        self.assertEqual(self.schema_version(), MIGRATIONS[-1][0])
+        self.assertEqual(migrate(self.path), [])
+        self.assertEqual(migrate(self.path, dry_run=True), [])
+
+    def test_versions_increase(self):
+        versions = [version for version, name, steps in MIGRATIONS]
+        self.assertEqual(versions, list(range(1, len(MIGRATIONS) + 1)))
+
+    def test_failed_migration_rolls_back(self):
+        migrate(self.path)
+        MIGRATIONS.append((MIGRATIONS[-1][0] + 1, "Broken", ["CREATE TABLE half_done (x)", "NOT SQL"]))
+        try:
+            with self.assertRaises(Exception):
+                migrate(self.path)
+        finally:
+            MIGRATIONS.pop()
+        initializer = DatabaseInitializer(self.path)
+        tables = [row[0] for row in initializer.cursor.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'")]
+        initializer.close()
+        self.assertEqual(tables, [])
+        self.assertEqual(self.schema_version(), MIGRATIONS[-1][0])
+
+    def test_old_sqlite_is_refused(self):
+        with mock.patch.object(initialize_db.sqlite3, "sqlite_version_info", (3, 31, 1)):
+            with self.assertRaisesRegex(RuntimeError, "SQLite 3.35.0 or later"):
+                migrate(self.path)
+        self.assertEqual(self.schema_version(), 0)
+
+
+class RoomsAvailableTest(DatabaseTestCase):
+    def rooms(self, property_id):
+        return self.db.fetch("SELECT rooms_available, visible FROM properties WHERE property_id = ?", (property_id,))[0]
+
+    def test_follows_leases_and_bedrooms(self):
+        homeowner = self.add_user("owner", "homeowner")
+        property_id = self.add_property(homeowner, bedrooms=2)
+        self.assertEqual(self.rooms(property_id), (2, 1))
+
+        first = self.add_lease(property_id, self.add_user("ann"))
+        self.add_lease(property_id, self.add_user("bob"))
+        self.assertEqual(self.rooms(property_id), (0, 0))
+
+        self.db.query("UPDATE leases SET status = 'terminated' WHERE lease_id = ?", (first,))
+        self.assertEqual(self.rooms(property_id), (1, 1))
+        self.db.query("UPDATE properties SET bedrooms = 3 WHERE property_id = ?", (property_id,))
+        self.assertEqual(self.rooms(property_id), (2, 1))
+        self.db.query("DELETE FROM leases WHERE lease_id = ?", (first,))     # Already terminated, so no room comes back
+        self.assertEqual(self.rooms(property_id), (2, 1))
+
+    def test_moving_a_lease(self):
+        homeowner = self.add_user("owner", "homeowner")
+        old, new = self.add_property(homeowner, bedrooms=1), self.add_property(homeowner, bedrooms=1)
+        lease = self.add_lease(old, self.add_user("ann"))
+        self.db.query("UPDATE leases SET property_id = ? WHERE lease_id = ?", (new, lease))
+        self.assertEqual((self.rooms(old), self.rooms(new)), ((1, 1), (0, 0)))
+
+
+class ParticipantCountTest(DatabaseTestCase):
+    def test_follows_participant_status(self):
+        organizer = self.add_user("organizer")
+        self.db.query("""
+            INSERT INTO community_events (organizer_id, name, location, date, time, max_participants, event_type)
+            VALUES (?, 'Picnic', 'Park', '2026-11-01', '12:00', 10, 'social')
+        """, (organizer,))
+        event_id = self.last_id("community_events", "event_id")
+
+        def counts():
+            return self.db.fetch("SELECT accepted_participants, pending_participants FROM community_events "
+                                 "WHERE event_id = ?", (event_id,))[0]
+
+        for name in ("ann", "bob", "cat"):
+            self.db.query("INSERT INTO event_participants (event_id, student_id) VALUES (?, ?)",
+                          (event_id, self.add_user(name)))
+        self.assertEqual(counts(), (0, 3))
+        self.db.query("UPDATE event_participants SET status = 'accepted' WHERE event_id = ? AND participant_id < ?",
+                      (event_id, self.last_id("event_participants", "participant_id")))
+        self.assertEqual(counts(), (2, 1))
+        self.db.query("UPDATE event_participants SET status = 'rejected' WHERE status = 'pending'")
+        self.assertEqual(counts(), (2, 0))
+        self.db.query("DELETE FROM event_participants WHERE participant_id = (SELECT min(participant_id) "
+                      "FROM event_participants)")
+        self.assertEqual(counts(), (1, 0))
@@ -0,0 +1,36 @@
+import queries
+from loaders import BatchLoader, assert_query_count, tenants_by_property
+from support import DatabaseTestCase
+
+
+class BatchLoaderTest(DatabaseTestCase):
+    def test_view_properties_loads_tenants_in_two_queries(self):
+        homeowner = self.add_user("owner", "homeowner")
+        for n in range(4):
+            property_id = self.add_property(homeowner, bedrooms=3)
+            for tenant in range(n):
+                self.add_lease(property_id, self.add_user(f"tenant{n}_{tenant}"))
+
+        with assert_query_count(2):
+            properties = queries.MY_PROPERTIES.fetch_page(self.db, (homeowner,))
+            tenants = tenants_by_property(self.db).load_many(row.property_id for row in properties.rows)
+        self.assertEqual(sorted(len(rows) for rows in tenants.values()), [0, 1, 2, 3])
+        self.assertEqual(sorted(tenant.username for rows in tenants.values() for tenant in rows if len(rows) == 2),
+                         ["tenant2_0", "tenant2_1"])
+
+    def test_loads_are_cached_and_chunked(self):
+        for n in range(5):
+            self.add_user(f"user{n}")
+        loader = BatchLoader("SELECT user_id, username FROM users WHERE user_id IN ({keys})", db=self.db)
+        loader.CHUNK_SIZE = 2
+        with assert_query_count(3):
+            users = loader.load_many(range(1, 6))
+        with assert_query_count(0):
+            self.assertEqual(loader.load(3), users[3])
+        self.assertEqual(users[1], [("user0",)])
+
+    def test_assert_query_count_fails_on_a_different_count(self):
+        with self.assertRaises(AssertionError):
+            with assert_query_count(1):
+                self.db.fetch("SELECT 1")
+                self.db.fetch("SELECT 2")
@@ -0,0 +1,89 @@
+import sqlite3
+
+from db_connection import DatabaseConnection
+from db_worker import DatabaseWorker
+from notification_feed import NotificationFeed
+from observer import NotificationBus, mark_all_read, timestamp
+from support import DatabaseTestCase, FakeRoot, Owner
+
+
+class NotificationFeedTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.add_user("ann")
+        self.root = FakeRoot()
+        self.owner = Owner()
+        self.bus = NotificationBus(linger=0)
+        self.shown = []     # Lists of Notifications, one per on_notifications call
+        self.unread = []
+
+    def start(self):
+        feed = NotificationFeed(self.root, self.bus, self.user, self.owner, self.shown.append, self.unread.append)
+        self.root.run_until(lambda: self.unread)     # The first check has finished
+        return feed
+
+    def messages(self):
+        return [(notification.message, notification.count) for batch in self.shown for notification in batch]
+
+    def other_process(self, sql, parameters=()):
+        connection = sqlite3.connect(self.path)
+        connection.execute(sql, parameters)
+        connection.commit()
+        connection.close()
+
+    def test_existing_notifications_are_counted_not_shown(self):
+        self.add_notification(self.user, "Before")
+        self.start()
+        self.assertEqual(self.unread, [1])
+        self.root.run(5000)
+        self.assertEqual(self.shown, [])
+
+    def test_bus_notifications_show_once(self):
+        self.start()
+        self.bus.notify(self.user, "Hello", subject="greeting")
+        self.bus.flush(5)
+        self.root.run_until(lambda: self.unread[-1] == 1)
+        self.root.run(5000)     # The check that follows reads the same row back from the table
+        self.assertEqual(self.messages(), [("Hello", 1)])
+
+        self.bus.notify(self.user, "Hello again", subject="greeting")     # Coalesced into the same digest
+        self.bus.flush(5)
+        self.root.run(5000)
+        self.assertEqual(self.messages(), [("Hello", 1), ("Hello again", 2)])
+        self.assertEqual(self.unread[-1], 1)
+
+    def test_writes_from_another_process_are_noticed(self):
+        self.start()
+        self.other_process("INSERT INTO notifications (user_id, message, subject, created_at) VALUES (?, 'Elsewhere', 'x', ?)",
+                           (self.user, timestamp()))
+        self.root.run(NotificationFeed.WATCH_MS + 500)
+        self.assertEqual(self.messages(), [("Elsewhere", 1)])
+        self.assertEqual(self.unread[-1], 1)
+
+        self.other_process("UPDATE notifications SET status = 'read' WHERE user_id = ?", (self.user,))
+        self.root.run(NotificationFeed.WATCH_MS + 500)
+        self.assertEqual(self.unread[-1], 0)
+
+    def test_own_writes_force_the_next_check(self):
+        self.add_notification(self.user, "Before")
+        self.start()
+        # On the worker's own connection, whose data_version doesn't change for its own commits
+        DatabaseWorker.for_root(self.root).submit(lambda db: mark_all_read(db, self.user), lambda _: None)
+        self.root.run(NotificationFeed.WATCH_MS + 500)
+        self.assertEqual(self.unread[-1], 0)
+
+    def test_idle_checks_only_read_data_version(self):
+        self.start()
+        self.root.run(500)
+        self.db.stats.reset()
+        self.root.run(NotificationFeed.WATCH_MS * 5)
+        self.assertEqual(list(self.db.stats.statements), ["PRAGMA data_version"])
+        self.assertEqual(self.db.stats.statements["PRAGMA data_version"]["count"], 5)
+
+    def test_stops_when_the_owner_is_destroyed(self):
+        feed = self.start()
+        self.owner.destroy()
+        self.root.run(NotificationFeed.WATCH_MS * 2)
+        self.assertEqual(self.bus.subscribers[self.user], [])
+        self.assertNotIn(feed._table_written, DatabaseConnection().write_listeners)
+        self.assertEqual([entry for entry in self.root.pending if entry[1] not in self.root.cancelled], [])
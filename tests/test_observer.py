@@ -0,0 +1,175 @@
+import sqlite3
+import time
+
+import queries
+from observer import NotificationBus, mark_read, mark_all_read, unread_count, timestamp
+from support import DatabaseTestCase
+
+
+class FlakyBus(NotificationBus):
+    """A bus whose next `failures` batch writes raise, counting every write it attempts."""
+
+    def __init__(self, **options):
+        super().__init__(retry_delay=0.01, **options)
+        self.failures = 0
+        self.writes = 0
+
+    def _write_digests(self, db, digests):
+        self.writes += 1
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return super()._write_digests(db, digests)
+
+
+class InboxTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.add_user("ann")
+
+    def test_unread_counter_follows_read_state(self):
+        ids = [self.add_notification(self.user, f"Message {n}") for n in range(3)]
+        self.assertEqual(unread_count(self.db, self.user), 3)
+
+        mark_read(self.db, self.user, ids[:1])
+        self.assertEqual(unread_count(self.db, self.user), 2)
+        self.db.query("DELETE FROM notifications WHERE notification_id = ?", (ids[1],))
+        self.assertEqual(unread_count(self.db, self.user), 1)
+        mark_all_read(self.db, self.user)
+        self.assertEqual(unread_count(self.db, self.user), 0)
+
+    def test_unread_first_then_newest_first(self):
+        ids = [self.add_notification(self.user, f"Message {n}") for n in range(6)]
+        mark_read(self.db, self.user, ids[3:5])
+        page = queries.NOTIFICATIONS.fetch_page(self.db, (self.user,), page_size=3)
+        rest = queries.NOTIFICATIONS.fetch_page(self.db, (self.user,), after=page.after, page_size=3)
+        self.assertEqual([row[0] for row in page.rows + rest.rows], [ids[5], ids[2], ids[1], ids[0], ids[4], ids[3]])
+        self.assertFalse(rest.has_more)
+
+    def test_updated_digest_moves_to_the_top(self):
+        now = time.time()
+        digest = self.add_notification(self.user, "Event moved", created_at=timestamp(now - 300))
+        self.db.query("UPDATE notifications SET subject = 'event:1' WHERE notification_id = ?", (digest,))
+        newer = self.add_notification(self.user, "Carpool full", created_at=timestamp(now - 60))
+
+        bus = NotificationBus()
+        bus.notify(self.user, "Event moved again", subject="event:1")
+        self.assertTrue(bus.flush(5))
+        rows = queries.NOTIFICATIONS.fetch_page(self.db, (self.user,)).rows
+        self.assertEqual([(row.notification_id, row.count) for row in rows], [(digest, 2), (newer, 1)])
+
+    def test_deep_pages_seek(self):
+        sql = queries.NOTIFICATIONS.page_sql()
+        plan = [row[3] for row in self.db.fetch("EXPLAIN QUERY PLAN " + sql, (None,) * sql.count("?"))]
+        self.assertFalse([line for line in plan if "TEMP B-TREE" in line])
+        self.assertTrue([line for line in plan if "created_at=? AND notification_id<?" in line])
+
+        # A page at the end of the read notifications must cost about what the first page does
+        start = time.time() - 20000
+        self.db.query_many("INSERT INTO notifications (user_id, message, subject, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                           [(self.user, f"Message {n}", f"Message {n}", "unread" if n % 10 == 0 else "read", timestamp(start + n))
+                            for n in range(20000)])
+        first = queries.NOTIFICATIONS.fetch_page(self.db, (self.user,))
+        deep = self.db.fetch("""
+            SELECT status, created_at, notification_id FROM notifications
+            WHERE status = 'read' ORDER BY notification_id LIMIT 1 OFFSET 60
+        """)[0]
+
+        def timed(after):
+            started = time.perf_counter()
+            for _ in range(20):
+                page = queries.NOTIFICATIONS.fetch_page(self.db, (self.user,), after=after)
+            return time.perf_counter() - started, page
+
+        shallow_time, _ = timed(first.after)
+        deep_time, page = timed(deep)
+        self.assertEqual(len(page.rows), 50)
+        self.assertLess(deep_time, shallow_time * 5 + 0.02)
+
+
+class NotificationBusTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = [self.add_user(f"user{n}") for n in range(3)]
+
+    def stored(self):
+        return self.db.fetch("SELECT user_id, message, count FROM notifications ORDER BY notification_id")
+
+    def test_one_write_per_batch_with_digests(self):
+        bus = FlakyBus(linger=0.2)
+        received = []
+        bus.subscribe(self.users[0], received.append)
+        bus.notify_many(self.users, "Event moved", subject="event:1")
+        bus.notify(self.users[0], "Event moved again", subject="event:1")
+        self.assertTrue(bus.flush(5))
+
+        self.assertEqual(bus.writes, 1)
+        self.assertEqual(self.stored(), [(self.users[0], "Event moved again", 2), (self.users[1], "Event moved", 1),
+                                         (self.users[2], "Event moved", 1)])
+        self.assertEqual([(n.message, n.count) for n in received], [("Event moved again", 2)])
+
+    def test_queued_only_when_the_transaction_commits(self):
+        bus = FlakyBus(max_pending=2)
+        with self.assertRaises(ValueError):
+            with self.db.transaction():
+                bus.notify_many(self.users[:2], "Rolled back")
+                raise ValueError
+        with self.db.transaction():
+            bus.notify_many(self.users[:2], "Committed")     # The rolled back notifications gave their places back
+            self.assertEqual(bus._queue.qsize(), 0)
+        self.assertTrue(bus.flush(5))
+        self.assertEqual([row[1] for row in self.stored()], ["Committed", "Committed"])
+
+    def test_full_queue_fails_the_write_before_it_commits(self):
+        bus = FlakyBus(max_pending=2, put_timeout=0.1)
+        bus.failures = 10 ** 6     # The dispatcher can't store anything, so the queue stays full
+        bus.notify_many(self.users[:2], "Queued")
+        with self.assertRaises(TimeoutError):
+            with self.db.transaction():
+                self.db.query("UPDATE users SET phone_number = '555-0199' WHERE user_id = ?", (self.users[2],))
+                bus.notify(self.users[2], "No room")
+        self.assertEqual(self.db.fetch("SELECT phone_number FROM users WHERE user_id = ?", (self.users[2],)), [("555-0100",)])
+
+        bus.failures = 0
+        self.assertTrue(bus.flush(5))
+        self.assertEqual([row[1] for row in self.stored()], ["Queued", "Queued"])
+
+    def test_failed_writes_are_retried_until_stored(self):
+        bus = FlakyBus(max_retry_delay=0.02)
+        bus.failures = 8     # More than any fixed number of attempts would allow
+        bus.notify(self.users[0], "Eventually")
+        self.assertTrue(bus.flush(5))
+        self.assertEqual(bus.writes, 9)
+        self.assertEqual([row[1] for row in self.stored()], ["Eventually"])
+
+    def test_callbacks_are_retried_until_they_succeed(self):
+        bus = FlakyBus(max_retry_delay=0.02)
+        calls = []
+
+        def flaky(notification):
+            calls.append(notification.notification_id)
+            if len(calls) < 4:
+                raise RuntimeError("screen busy")
+        bus.subscribe(self.users[0], flaky)
+        bus.notify(self.users[0], "Hello")
+        deadline = time.monotonic() + 5
+        while len(calls) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        self.assertEqual(len(calls), 4)     # Called again until it returned, then never again
+        self.assertEqual(set(calls), {self.last_id("notifications", "notification_id")})     # The same notification each time
+        self.assertEqual(bus._retries, [])
+
+    def test_unsubscribed_callbacks_are_not_retried(self):
+        bus = FlakyBus(max_retry_delay=0.05)
+        calls = []
+
+        def failing(notification):
+            calls.append(notification)
+            raise RuntimeError("closed")
+        bus.subscribe(self.users[0], failing)
+        bus.notify(self.users[0], "Hello")
+        self.assertTrue(bus.flush(5))
+        bus.unsubscribe(self.users[0], failing)
+        time.sleep(0.2)
+        self.assertEqual(len(calls), 1)
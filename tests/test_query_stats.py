@@ -0,0 +1,39 @@
+import os
+
+import queries
+from loaders import TENANTS_BY_PROPERTY, tenants_by_property
+from query_stats import normalize_sql
+from support import DatabaseTestCase
+
+
+class QueryStatsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.stats.reset()
+        self.user = self.add_user("ann")
+
+    def callers(self, sql):
+        return self.db.stats.statements[normalize_sql(sql)]["callers"]
+
+    def test_paged_query_is_recorded_for_the_screen_method(self):
+        queries.NOTIFICATIONS.fetch_page(self.db, (self.user,))
+        sql = queries.NOTIFICATIONS.page_sql(first=True)
+        self.assertEqual(self.callers(sql), {
+            "QueryStatsTest.test_paged_query_is_recorded_for_the_screen_method": 1})
+
+    def test_loader_query_is_recorded_for_the_screen_method(self):
+        tenants_by_property(self.db).load_many([1, 2])
+        self.assertEqual(self.callers(TENANTS_BY_PROPERTY.format(keys="?, ?")),
+                         {"QueryStatsTest.test_loader_query_is_recorded_for_the_screen_method": 1})
+
+    def test_histogram_and_slow_log(self):
+        self.db.stats.slow_threshold_ms = 0
+        self.db.stats.slow_log_path = os.path.join(self.directory, "slow.log")
+        try:
+            self.db.fetch("SELECT * FROM users WHERE user_id IN (?, ?, ?)", (1, 2, 3))
+        finally:
+            self.db.stats.slow_threshold_ms = 100
+        entry = self.db.stats.statements["SELECT * FROM users WHERE user_id IN (?...)"]
+        self.assertEqual((entry["count"], entry["rows"], sum(entry["histogram"])), (1, 1, 1))
+        with open(self.db.stats.slow_log_path) as log:
+            self.assertIn("SEARCH users USING INTEGER PRIMARY KEY", log.read())
@@ -0,0 +1,60 @@
+import io
+import os
+import sqlite3
+import time
+from contextlib import redirect_stderr
+
+from observer import timestamp, unread_count
+from retention import NotificationCompactor, DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_PER_USER
+from support import DatabaseTestCase
+
+
+class NotificationCompactorTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.add_user("ann")
+
+    def remaining(self):
+        return [row[0] for row in self.db.fetch("SELECT message FROM notifications ORDER BY notification_id")]
+
+    def test_expires_old_notifications(self):
+        now = time.time()
+        self.add_notification(self.user, "Old", created_at=timestamp(now - 200 * 86400))
+        self.add_notification(self.user, "Recent", created_at=timestamp(now - 86400))
+
+        compactor = NotificationCompactor(max_per_user=None, pause=0)
+        self.assertEqual(compactor.run_pass(), (1, 0))
+        self.assertEqual(self.remaining(), ["Recent"])
+        self.assertEqual(unread_count(self.db, self.user), 1)     # The trigger kept the counter right
+
+    def test_keeps_each_users_newest_and_archives_the_rest(self):
+        other = self.add_user("bob")
+        for n in range(4):
+            self.add_notification(self.user, f"Message {n}")
+        self.add_notification(other, "Only one")
+        archive = os.path.join(self.directory, "archive.db")
+
+        compactor = NotificationCompactor(max_age_days=None, max_per_user=2, archive=archive, pause=0)
+        self.assertEqual(compactor.run_pass(), (0, 2))
+        self.assertEqual(self.remaining(), ["Message 2", "Message 3", "Only one"])
+
+        connection = sqlite3.connect(archive)
+        archived = connection.execute("SELECT message, archived_at IS NOT NULL FROM notifications ORDER BY notification_id").fetchall()
+        connection.close()
+        self.assertEqual(archived, [("Message 0", 1), ("Message 1", 1)])
+        self.assertEqual(compactor.run_pass(), (0, 0))     # Nothing more is due
+
+    def test_from_environment(self):
+        self.assertIsNone(NotificationCompactor.from_environment({"HOUSING_APP_NOTIFICATION_RETENTION": "off"}))
+        compactor = NotificationCompactor.from_environment({"HOUSING_APP_NOTIFICATION_MAX_AGE_DAYS": "30",
+                                                            "HOUSING_APP_NOTIFICATION_MAX_PER_USER": "0"})
+        self.assertEqual((compactor.max_age_days, compactor.max_per_user), (30, None))
+
+    def test_bad_environment_values_fall_back_to_the_defaults(self):
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            compactor = NotificationCompactor.from_environment({"HOUSING_APP_NOTIFICATION_MAX_AGE_DAYS": "six months",
+                                                                "HOUSING_APP_NOTIFICATION_MAX_PER_USER": "-5"})
+        self.assertEqual((compactor.max_age_days, compactor.max_per_user), (DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_PER_USER))
+        self.assertIn("HOUSING_APP_NOTIFICATION_MAX_AGE_DAYS='six months'", errors.getvalue())
+        self.assertIn("HOUSING_APP_NOTIFICATION_MAX_PER_USER='-5'", errors.getvalue())
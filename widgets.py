@@ -0,0 +1,123 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from db_connection import Page
+
+
+class VirtualList(tk.Frame):
+    """A scrollable Treeview that pulls rows from the database a page at a time.
+
+    Treeview only draws the rows in view, and pages are fetched on the database worker as the
+    user scrolls towards the end, so a result set of any size costs one widget and one page of
+    rows up front instead of a Label per field per row.
+
+    `columns` is a list of (heading, width, format) where format(row) returns the cell text.
+    `fetch_page(db, after, page_size)` runs on the worker and returns the next Page, usually from
+    db.fetch_page; `after` is the previous page's key (None for the first page). Lists built with
+    the same `tag` supersede each other, so a new search stops the page an older one is loading.
+    """
+
+    def __init__(self, parent, screen, columns, fetch_page, page_size=50, height=15, empty_text="No results.", tag=None):
+        super().__init__(parent)
+        self.screen = screen
+        self.fetch_page = fetch_page
+        self.tag = self if tag is None else tag
+        self.page_size = page_size
+        self.formats = [column[2] for column in columns]
+        self.empty_text = empty_text
+        self.rows = []     # Loaded rows; a row's index is its Treeview item id
+        self.has_more = True
+        self.after = None     # Key of the last row loaded
+        self.loading = False
+
+        self.tree = ttk.Treeview(self, columns=[str(i) for i in range(len(columns))], show="headings",
+                                 height=height, selectmode="browse")
+        for i, (heading, width, _) in enumerate(columns):
+            self.tree.heading(str(i), text=heading)
+            self.tree.column(str(i), width=width, stretch=True)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.status = tk.Label(self, text="Loading...")
+        self.status.pack(side=tk.BOTTOM)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        screen.screens.on_refresh(self, self.refresh)     # Reload when a write makes its cached screen stale
+        self.load_more()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9:     # Near the bottom (or everything fits): fetch the next page
+            self.load_more()
+
+    def load_more(self):
+        if self.loading or not self.has_more:
+            return
+        self.loading = True
+        after, page_size = self.after, self.page_size
+        # Tagged, so the page a refresh() (or a newer list with the same tag) replaces is skipped or dropped
+        self.screen.run_async(lambda db: self.fetch_page(db, after, page_size), self._append, owner=self, tag=self.tag)
+
+    def _append(self, page):
+        self.loading = False
+        self.has_more = page.has_more
+        self.after = page.after
+        for row in page.rows:
+            self.tree.insert("", tk.END, iid=str(len(self.rows)), values=[fmt(row) for fmt in self.formats])
+            self.rows.append(row)
+
+        if not self.rows:
+            self.status.config(text=self.empty_text)
+        else:
+            self.status.config(text=f"{len(self.rows)}{'+' if self.has_more else ''} results")
+
+    def selected(self):
+        """The row selected in the list, or None."""
+        selection = self.tree.selection()
+        return self.rows[int(selection[0])] if selection else None
+
+    def refresh(self):
+        """Drop everything loaded and start again from the first page."""
+        self.tree.delete(*self.tree.get_children())
+        self.rows = []
+        self.has_more = True
+        self.after = None
+        self.loading = False
+        self.status.config(text="Loading...")
+        self.load_more()
+
+    def command(self, action, message="Select a row first."):
+        """A button command that calls action(row) with the selected row."""
+        def run():
+            row = self.selected()
+            if row is None:
+                messagebox.showerror("Error", message)
+                return
+            action(row)
+        return run
+
+
+def fixed_rows(rows):
+    """A fetch_page over rows that are already in memory; the key is the position in the list."""
+    rows = list(rows)
+
+    def fetch_page(db, after, page_size):
+        start = after or 0
+        end = start + page_size
+        return Page(rows[start:end], end < len(rows), min(end, len(rows)))
+    return fetch_page
+
+
+def show_toast(root, text, duration_ms=4000):
+    """Show a message over the bottom of the window for a few seconds, on whichever screen is up.
+
+    A new toast replaces the one still showing.
+    """
+    previous = getattr(root, "_toast", None)
+    if previous is not None and previous.winfo_exists():
+        previous.destroy()
+    toast = root._toast = tk.Label(root, text=text, bg="#333333", fg="white", padx=10, pady=5, wraplength=400)
+    toast.place(relx=0.5, rely=1.0, y=-10, anchor="s")
+    toast.lift()
+    root.after(duration_ms, toast.destroy)
+    return toast